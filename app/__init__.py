@@ -94,14 +94,14 @@ def create_app(config_class=Config):
     except Exception as e:
         logger.error(f"Error creating upload directories: {str(e)}")
     
-    # Initialize database schemas
+    # Apply pending schema migrations (a single version read when up to date)
     if db is not None:
-        from app.models.student import initialize_db_schemas
+        from app.models.migrations import run_migrations
         try:
-            initialize_db_schemas()
-            logger.info("Successfully initialized database schemas")
+            schema_version = run_migrations()
+            logger.info(f"Database schema version: {schema_version}")
         except Exception as e:
-            logger.error(f"Error initializing database schemas: {str(e)}")
+            logger.error(f"Error applying schema migrations: {str(e)}")
     
     # Import and register blueprints
     # NOTE: Blueprint names have been standardized to avoid conflicts
@@ -2,7 +2,7 @@ from functools import wraps
 from flask import jsonify
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
 
-from app import db
+from app.auth.utils import get_user_role
 
 def role_required(allowed_roles):
     """
@@ -29,25 +29,9 @@ def role_required(allowed_roles):
             # Get the identity from JWT
             identity = get_jwt_identity()
             
-            # Determine the user's role
-            user_role = None
-            
-            # Check if user is in students collection
-            student = db.students.find_one({'registration_no': identity})
-            if student:
-                user_role = 'student'
-            
-            # Check if user is in faculty collection
-            if not user_role:
-                faculty = db.faculty.find_one({'faculty_id': identity})
-                if faculty:
-                    user_role = 'faculty'
-            
-            # Check if user is in admin collection
-            if not user_role:
-                admin = db.admin.find_one({'admin_id': identity})
-                if admin:
-                    user_role = 'admin'
+            # Determine the user's role from the token claim, falling back
+            # to the role cache and database for older tokens
+            user_role = get_user_role(identity)
             
             # Check if user role is in allowed roles
             if not user_role or user_role not in allowed_roles:
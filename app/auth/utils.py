@@ -1,9 +1,11 @@
 import re
 import bcrypt
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity
 
 from app import db
+from app.config import Config
+from app.utils.cache import TTLCache
 
 def hash_password(password):
     """Hash a password for storing."""
@@ -23,31 +25,88 @@ def validate_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return bool(re.match(pattern, email))
 
+# Roles that can be stamped into an access token
+ROLES = ('student', 'faculty', 'admin')
+
+# Collection and identity field for each role
+ROLE_COLLECTIONS = {
+    'student': ('students', 'registration_no'),
+    'faculty': ('faculty', 'faculty_id'),
+    'admin': ('admin', 'admin_id')
+}
+
+# identity -> role, for tokens issued before the role claim existed. Entries
+# are per worker: a write in one worker cannot drop them in the others, so a
+# deleted or moved user keeps their cached role for up to ROLE_CACHE_TTL
+# seconds there (tokens with a role claim never read the cache)
+role_cache = TTLCache(max_size=Config.ROLE_CACHE_SIZE, ttl=Config.ROLE_CACHE_TTL)
+
+def create_user_token(identity, role, **claims):
+    """Create an access token with the user's role stamped in as a claim."""
+    return create_access_token(identity=identity, additional_claims={'role': role, **claims})
+
+def get_token_role(identity):
+    """
+    Get the role claim from the current JWT.
+    
+    Returns:
+        str: The role, or None if there is no verified token for ``identity``
+        or the token predates the role claim
+    """
+    try:
+        if get_jwt_identity() != identity:
+            return None
+        claims = get_jwt()
+    except RuntimeError:
+        # No JWT has been verified in this context
+        return None
+    
+    role = claims.get('role')
+    if role in ROLES:
+        return role
+    if claims.get('is_admin'):
+        return 'admin'
+    return None
+
+def invalidate_user_role(identity):
+    """
+    Drop a cached role in this worker.
+
+    Call it whenever a user is created, deleted or moved to another role's
+    collection; other workers catch up within ROLE_CACHE_TTL seconds.
+    """
+    role_cache.delete(identity)
+
+def lookup_user_role(identity):
+    """Find the user's role in the database, checking students, then faculty, then admin."""
+    for role in ROLES:
+        collection, field = ROLE_COLLECTIONS[role]
+        if db[collection].find_one({field: identity}, {'_id': 1}):
+            return role
+    return None
+
 def get_current_user():
     """Get the current user from JWT identity."""
     identity = get_jwt_identity()
+    role = get_user_role(identity)
+    if role is None:
+        return None, None
     
-    # First check if user is a student
-    user = db.students.find_one({'registration_no': identity})
-    if user:
-        return user, 'student'
-    
-    # Check if user is faculty
-    user = db.faculty.find_one({'faculty_id': identity})
-    if user:
-        return user, 'faculty'
+    collection, field = ROLE_COLLECTIONS[role]
+    user = db[collection].find_one({field: identity})
+    if user is None:
+        invalidate_user_role(identity)
+        return None, None
     
-    # Check if user is admin
-    user = db.admin.find_one({'admin_id': identity})
-    if user:
-        return user, 'admin'
-    
-    return None, None
+    return user, role
 
 def get_user_role(identity=None):
     """
     Get the role of a user based on their identity.
     
+    The role claim of the current token is used when present; older tokens
+    fall back to a per-process TTL cache and finally to the database.
+    
     Args:
         identity: The user's identity (registration_no, faculty_id, admin_id)
                  If None, uses the JWT identity.
@@ -58,22 +117,103 @@ def get_user_role(identity=None):
     if identity is None:
         identity = get_jwt_identity()
     
-    # Check if user is a student
-    student = db.students.find_one({'registration_no': identity})
-    if student:
-        return 'student'
+    role = get_token_role(identity)
+    if role:
+        return role
     
-    # Check if user is faculty
-    faculty = db.faculty.find_one({'faculty_id': identity})
-    if faculty:
-        return 'faculty'
+    role = role_cache.get(identity)
+    if role:
+        return role
     
-    # Check if user is admin
-    admin = db.admin.find_one({'admin_id': identity})
-    if admin:
-        return 'admin'
+    role = lookup_user_role(identity)
+    if role:
+        role_cache.set(identity, role)
     
-    return None
+    return role
+
+def student_fields(*fields):
+    """
+    Declare the student document fields a view needs.
+    
+    The request-scoped loader fetches the union of the declared fields and any
+    fields passed to get_current_student(), so one query serves every caller.
+    Must be the innermost decorator so outer wrappers copy the declaration.
+    
+    Usage:
+        @student_bp.route('/skills')
+        @jwt_required()
+        @student_fields('skills', 'interests')
+        def skills_route():
+            student = get_current_student()
+    """
+    def decorator(fn):
+        fn.student_fields = tuple(getattr(fn, 'student_fields', ())) + fields
+        return fn
+    
+    return decorator
+
+def _declared_student_fields():
+    """Fields declared with @student_fields on the view serving this request."""
+    view = current_app.view_functions.get(request.endpoint) if request.endpoint else None
+    return getattr(view, 'student_fields', ())
+
+def _merge_documents(target, source):
+    """Recursively merge a partial document into an already loaded one."""
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_documents(target[key], value)
+        else:
+            target[key] = value
+
+def get_current_student(*fields):
+    """
+    Get the current student's document, fetching it at most once per request.
+    
+    Args:
+        *fields: Fields the caller needs. The view's @student_fields
+                 declaration is added to them. With no fields on either side
+                 the whole document except the password hash is loaded.
+    
+    Returns:
+        dict: The (possibly partial) student document, or None if not found
+    """
+    identity = get_jwt_identity()
+    cached = g.get('_current_student')
+    
+    if cached is None or cached['identity'] != identity:
+        wanted = set(fields) | set(_declared_student_fields())
+        projection = {field: 1 for field in wanted} if wanted else {'password': 0}
+        student = db.students.find_one({'registration_no': identity}, projection)
+        g._current_student = {
+            'identity': identity,
+            'doc': student,
+            'fields': wanted or None
+        }
+        return student
+    
+    student = cached['doc']
+    loaded = cached['fields']
+    if student is None or loaded is None:
+        return student
+    
+    wanted = set(fields) | set(_declared_student_fields())
+    if not wanted:
+        # An earlier caller loaded part of the document; this one wants all of it
+        full = db.students.find_one({'registration_no': identity}, {'password': 0})
+        if full:
+            _merge_documents(student, full)
+        cached['fields'] = None
+        return student
+    
+    missing = wanted - loaded
+    if missing:
+        # Only the fields no earlier caller asked for
+        extra = db.students.find_one({'registration_no': identity}, {field: 1 for field in missing})
+        if extra:
+            _merge_documents(student, extra)
+        loaded.update(missing)
+    
+    return student
 
 def user_to_json(user):
     """Convert a user document to JSON-serializable format."""
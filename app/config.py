@@ -13,6 +13,39 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'app/uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max file size for uploads
+    ROLE_CACHE_SIZE = int(os.environ.get('ROLE_CACHE_SIZE', 10000))  # identities cached per worker
+    ROLE_CACHE_TTL = int(os.environ.get('ROLE_CACHE_TTL', 300))  # seconds
+    COUNT_CACHE_SIZE = int(os.environ.get('COUNT_CACHE_SIZE', 2048))  # cached list totals per worker
+    COUNT_CACHE_TTL = int(os.environ.get('COUNT_CACHE_TTL', 60))  # seconds, for include_total=estimated
+    SEARCH_MAX_WORKERS = int(os.environ.get('SEARCH_MAX_WORKERS', 8))  # global search threads per worker
+    SUGGEST_TOP_K = int(os.environ.get('SUGGEST_TOP_K', 10))  # suggestions cached per prefix
+    SUGGEST_INDEX_TTL = int(os.environ.get('SUGGEST_INDEX_TTL', 600))  # seconds between rebuilds
+    FUZZY_THRESHOLD = float(os.environ.get('FUZZY_THRESHOLD', 0.3))  # minimum trigram similarity
+    FUZZY_MAX_CANDIDATES = int(os.environ.get('FUZZY_MAX_CANDIDATES', 500))  # companies read per fuzzy search
+    FUZZY_INDEX_TTL = int(os.environ.get('FUZZY_INDEX_TTL', 600))  # seconds between rebuilds
+    RECOMMENDER_INDEX_TTL = int(os.environ.get('RECOMMENDER_INDEX_TTL', 600))  # seconds between rebuilds
+    RECOMMENDATION_TOP_K = int(os.environ.get('RECOMMENDATION_TOP_K', 50))  # companies stored per student
+    SIMILARITY_NUM_PERM = int(os.environ.get('SIMILARITY_NUM_PERM', 64))  # MinHash functions
+    SIMILARITY_BANDS = int(os.environ.get('SIMILARITY_BANDS', 16))  # LSH bands; must divide SIMILARITY_NUM_PERM
+    SIMILARITY_INDEX_TTL = int(os.environ.get('SIMILARITY_INDEX_TTL', 600))  # seconds between rebuilds
+    TRENDING_WINDOW_DAYS = int(os.environ.get('TRENDING_WINDOW_DAYS', 30))  # hourly buckets kept
+    TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 72))  # score decay
+    TRENDING_TOP_N = int(os.environ.get('TRENDING_TOP_N', 50))  # companies kept in memory
+    TRENDING_REFRESH_INTERVAL = int(os.environ.get('TRENDING_REFRESH_INTERVAL', 60))  # seconds
+    ALSO_APPLIED_TOP_K = int(os.environ.get('ALSO_APPLIED_TOP_K', 20))  # neighbours kept per company
+    BLEND_COLLABORATIVE_WEIGHT = float(os.environ.get('BLEND_COLLABORATIVE_WEIGHT', 0.5))  # 0 = content only
+    SKILL_TAXONOMY_TTL = int(os.environ.get('SKILL_TAXONOMY_TTL', 600))  # seconds between reloads
+    ANALYTICS_EXACT_MAX_DAYS = int(os.environ.get('ANALYTICS_EXACT_MAX_DAYS', 7))  # longer windows use sketches
+    STATS_TTL = int(os.environ.get('STATS_TTL', 5))  # seconds dashboard counts are reused
+    SEARCH_CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE', 2048))  # cached search responses per worker
+    SEARCH_CACHE_MAX_BYTES = int(os.environ.get('SEARCH_CACHE_MAX_BYTES', 32 * 1024 * 1024))  # per worker
+    SEARCH_CACHE_TTL = int(os.environ.get('SEARCH_CACHE_TTL', 120))  # seconds
+    GENERATION_CACHE_TTL = int(os.environ.get('GENERATION_CACHE_TTL', 2))  # seconds
+    SEARCH_MAX_TIME_MS = int(os.environ.get('SEARCH_MAX_TIME_MS', 1000))  # server-side budget per search query
+    SEARCH_MAX_QUERY_LENGTH = int(os.environ.get('SEARCH_MAX_QUERY_LENGTH', 256))  # characters
+    SEARCH_MAX_TERMS = int(os.environ.get('SEARCH_MAX_TERMS', 10))  # tokens kept from a query
+    SEARCH_MAX_TERM_LENGTH = int(os.environ.get('SEARCH_MAX_TERM_LENGTH', 50))  # characters per token
+    SEARCH_REGEX_MAX_LENGTH = int(os.environ.get('SEARCH_REGEX_MAX_LENGTH', 64))  # admin regex mode
 
 class TestConfig(Config):
     """Test configuration."""
@@ -0,0 +1,216 @@
+"""
+Index registry for MongoDB collections.
+
+INDEXES lists every index the application relies on, per collection.
+CANONICAL_QUERIES lists the hot-path query of each route so the query plans
+can be checked against the registry with verify_query_plans().
+
+Adding an index here requires a new step in app.models.migrations.MIGRATIONS
+that calls ensure_indexes(), otherwise existing deployments never build it.
+Indexes replaced by a wider one, or no longer queried, go to
+RETIRED_INDEXES, so the same step drops them.
+"""
+from datetime import datetime
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+from app import db
+
+# Text indexes name their language override field explicitly so a document
+# field called ``language`` can never be read as the stemming language.
+INDEXES = {
+    'students': [
+        # Sparse so legacy documents without the field do not collide on null
+        IndexModel([('registration_no', ASCENDING)], name='registration_no_unique',
+                   unique=True, sparse=True, background=True),
+        IndexModel([('email_id', ASCENDING)], name='email_id_unique',
+                   unique=True, sparse=True, background=True),
+        # Admin student search
+        IndexModel([('registration_no', TEXT), ('email_id', TEXT), ('name', TEXT),
+                    ('specialization', TEXT)],
+                   name='students_text', background=True, language_override='text_language',
+                   weights={'registration_no': 10, 'email_id': 10, 'name': 5, 'specialization': 2}),
+        # Multikey: students with a given canonical skill
+        IndexModel([('skill_ids', ASCENDING)], name='skill_ids', background=True),
+        # Keyset pagination of the student listing, one per allowed sort_by
+        IndexModel([('name.first', ASCENDING), ('_id', ASCENDING)], name='name_first_id', background=True),
+        IndexModel([('registration_no', ASCENDING), ('_id', ASCENDING)], name='registration_no_id',
+                   background=True)
+    ],
+    'applications': [
+        IndexModel([('student_id', ASCENDING), ('company_id', ASCENDING)],
+                   name='student_company', background=True),
+        IndexModel([('company_id', ASCENDING)], name='company', background=True),
+        # Keyset pagination of the admin listing filtered by status
+        IndexModel([('status', ASCENDING), ('_id', ASCENDING)], name='status_id', background=True),
+        # Exact active students: window scan on applied_date that never reads the documents
+        IndexModel([('applied_date', ASCENDING), ('student_id', ASCENDING)],
+                   name='applied_date_student', background=True)
+    ],
+    'notifications': [
+        # Keyset pagination: (timestamp, _id) newest first, optionally by read status
+        IndexModel([('recipient_id', ASCENDING), ('timestamp', DESCENDING), ('_id', DESCENDING)],
+                   name='recipient_timestamp_id', background=True),
+        IndexModel([('recipient_id', ASCENDING), ('read', ASCENDING), ('timestamp', DESCENDING),
+                    ('_id', DESCENDING)],
+                   name='recipient_read_timestamp_id', background=True)
+    ],
+    'messages': [
+        IndexModel([('recipient_id', ASCENDING), ('read', ASCENDING)],
+                   name='recipient_read', background=True),
+        IndexModel([('sender_id', ASCENDING), ('timestamp', DESCENDING)],
+                   name='sender_timestamp', background=True)
+    ],
+    'announcements': [
+        # Keyset pagination: (date, _id) newest first, optionally important only
+        IndexModel([('date', DESCENDING), ('_id', DESCENDING)], name='date_id', background=True),
+        IndexModel([('important', ASCENDING), ('date', DESCENDING), ('_id', DESCENDING)],
+                   name='important_date_id', background=True),
+        IndexModel([('title', TEXT), ('content', TEXT)],
+                   name='announcements_text', background=True, language_override='text_language',
+                   weights={'title': 5, 'content': 1})
+    ],
+    'companies': [
+        IndexModel([('active', ASCENDING), ('posted_date', DESCENDING)],
+                   name='active_posted_date', background=True),
+        IndexModel([('active', ASCENDING), ('deadline', ASCENDING)],
+                   name='active_deadline', background=True),
+        # Keyset pagination of active listings in insertion order
+        IndexModel([('active', ASCENDING), ('_id', ASCENDING)], name='active_id', background=True),
+        # Multikey: skill filters and eligibility match canonical skill IDs
+        IndexModel([('skill_ids', ASCENDING), ('active', ASCENDING)], name='skill_ids_active',
+                   background=True),
+        # Relevance-ranked company search, title and name matches count most
+        IndexModel([('name', TEXT), ('job_title', TEXT), ('requirements', TEXT),
+                    ('location', TEXT), ('job_description', TEXT)],
+                   name='companies_text', background=True, language_override='text_language',
+                   weights={'name': 10, 'job_title': 10, 'requirements': 5,
+                            'location': 3, 'job_description': 1})
+    ],
+    'interviews': [
+        IndexModel([('student_id', ASCENDING), ('status', ASCENDING)],
+                   name='student_status', background=True)
+    ],
+    'recommendations': [
+        # Students whose materialized top-K lists a given company
+        IndexModel([('companies.company_id', ASCENDING)], name='companies_company_id', background=True),
+        # Stale documents removed after a full rebuild
+        IndexModel([('updated_at', ASCENDING)], name='updated_at', background=True)
+    ],
+    'trending_buckets': [
+        IndexModel([('company_id', ASCENDING), ('hour', ASCENDING)], name='company_hour',
+                   unique=True, background=True),
+        # Window scan when the trending board is refreshed
+        IndexModel([('hour', ASCENDING)], name='hour', background=True),
+        # Buckets older than the trending window expire on their own
+        IndexModel([('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0,
+                   background=True)
+    ],
+    'co_applications': [
+        IndexModel([('company_id', ASCENDING), ('other_id', ASCENDING)], name='company_other',
+                   unique=True, background=True),
+        # Pairs left over after a full rebuild
+        IndexModel([('rebuilt_at', ASCENDING)], name='rebuilt_at', background=True)
+    ],
+    'also_applied': [
+        # Neighbour lists left over after a compaction
+        IndexModel([('computed_at', ASCENDING)], name='computed_at', background=True)
+    ]
+}
+
+# Indexes replaced in INDEXES or no longer queried, dropped by ensure_indexes()
+RETIRED_INDEXES = {
+    'applications': ['applied_date_status'],
+    'notifications': ['recipient_timestamp', 'recipient_read_timestamp'],
+    'announcements': ['date', 'important_date']
+}
+
+# (name, collection, filter, sort) for the canonical query of each hot route.
+# Sample values only need the right types; explain() does not need matches.
+CANONICAL_QUERIES = [
+    ('auth.login', 'students', {'email_id': 'student@example.com'}, None),
+    ('auth.role_required', 'students', {'registration_no': '221300001'}, None),
+    ('company.list', 'companies', {'active': True}, [('_id', ASCENDING)]),
+    ('company.skills', 'companies', {'active': True, 'skill_ids': {'$all': ['python', 'docker']}}, None),
+    ('company.eligible', 'companies', {'active': True, '$and': [
+        {'skill_ids': {'$in': ['python', 'docker']}},
+        {'skill_ids': {'$not': {'$elemMatch': {'$nin': ['python', 'docker']}}}}
+    ]}, None),
+    ('company.applications', 'applications', {'student_id': '221300001'}, None),
+    ('company.application_status', 'applications',
+     {'company_id': ObjectId(), 'student_id': '221300001'}, None),
+    ('dashboard.upcoming_deadlines', 'companies',
+     {'active': True, 'deadline': {'$gt': 0}}, [('deadline', ASCENDING)]),
+    ('dashboard.upcoming_interviews', 'interviews',
+     {'student_id': '221300001', 'status': 'scheduled'}, None),
+    ('dashboard.unread_messages', 'messages', {'recipient_id': '221300001', 'read': False}, None),
+    ('notifications.list', 'notifications', {'recipient_id': '221300001'},
+     [('timestamp', DESCENDING), ('_id', DESCENDING)]),
+    ('notifications.unread_count', 'notifications', {'recipient_id': '221300001', 'read': False}, None),
+    ('announcements.recent', 'announcements', {}, [('date', DESCENDING), ('_id', DESCENDING)]),
+    ('announcements.important', 'announcements', {'important': True},
+     [('date', DESCENDING), ('_id', DESCENDING)]),
+    ('student.list', 'students', {}, [('name.first', ASCENDING), ('_id', ASCENDING)]),
+    ('admin.applications', 'applications', {'status': 'pending'}, [('_id', ASCENDING)]),
+    ('analytics.active_students', 'applications',
+     {'applied_date': {'$gte': datetime(2024, 1, 1), '$lte': datetime(2024, 1, 7)}}, None),
+    ('analytics.daily', 'analytics_daily', {'_id': {'$gte': '2024-01-01', '$lte': '2024-01-31'}}, None),
+    ('search.companies', 'companies', {'$text': {'$search': 'python'}, 'active': True}, None),
+    ('search.announcements', 'announcements', {'$text': {'$search': 'placement'}}, None),
+    ('search.students', 'students', {'$text': {'$search': 'computer'}}, None),
+    ('admin.users_by_skill', 'students', {'skill_ids': {'$all': ['python']}}, None),
+    ('recommendations.company', 'recommendations', {'companies.company_id': ObjectId()}, None)
+]
+
+def ensure_indexes():
+    """
+    Create every index in the registry, then drop the retired ones.
+
+    Existing identical indexes are left untouched.
+    """
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        created[collection_name] = db[collection_name].create_indexes(indexes)
+    for collection_name, names in RETIRED_INDEXES.items():
+        existing = db[collection_name].index_information()
+        for name in names:
+            if name in existing:
+                db[collection_name].drop_index(name)
+    return created
+
+def _plan_stages(plan):
+    """Collect every stage name in an explain() plan tree."""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+def verify_query_plans():
+    """
+    Run explain() on each canonical query.
+
+    Returns:
+        list: One dict per query with its winning plan stages and whether it
+        avoided a collection scan
+    """
+    results = []
+    for name, collection_name, query_filter, sort in CANONICAL_QUERIES:
+        cursor = db[collection_name].find(query_filter).limit(10)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = cursor.explain()
+        stages = _plan_stages(explain.get('queryPlanner', {}).get('winningPlan', {}))
+        results.append({
+            'name': name,
+            'collection': collection_name,
+            'stages': stages,
+            'ok': 'COLLSCAN' not in stages
+        })
+    return results
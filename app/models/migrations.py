@@ -0,0 +1,166 @@
+"""
+Versioned schema migrations for MongoDB.
+
+The current schema version is stored in the ``schema_migrations`` collection.
+Each worker reads it once at startup; only a worker that finds pending steps
+takes the migration lock and applies them, so DDL runs once per deploy.
+
+Steps run while a gunicorn worker boots, so they are limited to DDL
+(validators and indexes). Data backfills are scripts run as deploy steps
+instead: scripts/sync_skill_taxonomy.py, scripts/rebuild_trending.py and
+scripts/rebuild_analytics.py.
+"""
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from app import db
+from app.models.student import (
+    create_student_schema_validator,
+    create_announcement_schema,
+    create_message_schema,
+    create_interview_schema
+)
+from app.models.indexes import ensure_indexes
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = 'schema_migrations'
+VERSION_DOC_ID = 'schema_version'
+LOCK_DOC_ID = 'migration_lock'
+
+# How long a lock holder may run before another worker is allowed to take over
+LOCK_TTL = timedelta(minutes=5)
+
+def apply_schema_validators():
+    """Create the validated collections, or update their validators via collMod."""
+    create_student_schema_validator()
+    create_announcement_schema()
+    create_message_schema()
+    create_interview_schema()
+
+# Ordered list of (version, description, step). Steps must be idempotent so a
+# step interrupted by a crash can safely be re-run by the next lock holder.
+MIGRATIONS = [
+    (1, 'Apply collection schema validators', apply_schema_validators),
+    (2, 'Create registry indexes', ensure_indexes),
+    (3, 'Create keyset pagination indexes', ensure_indexes),
+    (4, 'Create weighted text indexes for search', ensure_indexes),
+    (5, 'Create materialized recommendation indexes', ensure_indexes),
+    (6, 'Create trending bucket indexes', ensure_indexes),
+    (7, 'Create co-application indexes', ensure_indexes),
+    (8, 'Create skill ID indexes', ensure_indexes),
+    (9, 'Create analytics timeline index', ensure_indexes),
+    (10, 'Create keyset tiebreaker indexes', ensure_indexes),
+    (11, 'Replace the applications timeline index with the active students index', ensure_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version():
+    """Return the schema version recorded in the database (0 if none)."""
+    version_doc = db[MIGRATIONS_COLLECTION].find_one({'_id': VERSION_DOC_ID}, {'version': 1})
+    return version_doc.get('version', 0) if version_doc else 0
+
+def _lock_owner():
+    """Identify this process as a lock owner."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def acquire_migration_lock(owner):
+    """
+    Try to take the migration lock.
+
+    Returns:
+        bool: True if the lock is now held by ``owner``
+    """
+    now = datetime.utcnow()
+    try:
+        # Matches only a free, expired or already-owned lock; otherwise the
+        # upsert collides with the existing lock document.
+        db[MIGRATIONS_COLLECTION].find_one_and_update(
+            {
+                '_id': LOCK_DOC_ID,
+                '$or': [
+                    {'expires_at': {'$lt': now}},
+                    {'owner': owner}
+                ]
+            },
+            {'$set': {'owner': owner, 'acquired_at': now, 'expires_at': now + LOCK_TTL}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+def renew_migration_lock(owner):
+    """
+    Extend the migration lock held by ``owner`` by another LOCK_TTL.
+
+    Returns:
+        bool: False if the lock expired and another worker took it over
+    """
+    result = db[MIGRATIONS_COLLECTION].update_one(
+        {'_id': LOCK_DOC_ID, 'owner': owner},
+        {'$set': {'expires_at': datetime.utcnow() + LOCK_TTL}}
+    )
+    return result.matched_count == 1
+
+def release_migration_lock(owner):
+    """Release the migration lock if it is held by ``owner``."""
+    db[MIGRATIONS_COLLECTION].delete_one({'_id': LOCK_DOC_ID, 'owner': owner})
+
+def _record_version(version, description):
+    """Persist the version of the step that was just applied."""
+    now = datetime.utcnow()
+    db[MIGRATIONS_COLLECTION].update_one(
+        {'_id': VERSION_DOC_ID},
+        {
+            '$set': {'version': version, 'updated_at': now},
+            '$push': {'history': {'version': version, 'description': description, 'applied_at': now}}
+        },
+        upsert=True
+    )
+
+def run_migrations():
+    """
+    Apply any pending migration steps.
+
+    The lock is renewed after every step. A worker that finds it held does
+    not wait: the holder applies every pending step, and if it dies, the
+    lock expires after LOCK_TTL and the next worker to boot resumes after
+    the last recorded step.
+
+    Returns:
+        int: The schema version after the run. If another worker holds the
+        lock, the version read at startup is returned and no DDL is issued.
+    """
+    current_version = get_schema_version()
+    if current_version >= LATEST_VERSION:
+        logger.info(f"Database schema is up to date (version {current_version})")
+        return current_version
+
+    owner = _lock_owner()
+    if not acquire_migration_lock(owner):
+        logger.info("Schema migration is running in another worker, skipping")
+        return current_version
+
+    try:
+        # Another worker may have finished between the first read and the lock
+        current_version = get_schema_version()
+        for version, description, step in MIGRATIONS:
+            if version <= current_version:
+                continue
+            logger.info(f"Applying schema migration {version}: {description}")
+            step()
+            _record_version(version, description)
+            current_version = version
+            if not renew_migration_lock(owner):
+                logger.warning("Migration lock was taken over by another worker, stopping")
+                return current_version
+        logger.info(f"Database schema migrated to version {current_version}")
+        return current_version
+    finally:
+        release_migration_lock(owner)
@@ -500,23 +500,15 @@ def create_interview_schema():
         # Don't raise error to allow application to continue
 
 def initialize_db_schemas():
-    """Initialize all database collection schemas."""
+    """
+    Initialize all database collection schemas.
+
+    Kept for backward compatibility; schema changes are applied through the
+    versioned runner in app.models.migrations so existing data is preserved.
+    """
+    from app.models.migrations import run_migrations
     try:
-        # Drop existing collections
-        collections = ["students", "announcements", "messages", "interviews"]
-        for collection in collections:
-            try:
-                db[collection].drop()
-                print(f"Dropped existing {collection} collection")
-            except Exception as e:
-                print(f"Warning: Could not drop {collection} collection: {e}")
-        
-        # Create collections with new schemas
-        create_student_schema_validator()
-        create_announcement_schema()
-        create_message_schema()
-        create_interview_schema()
-        print("Database schema initialization complete")
+        run_migrations()
     except Exception as e:
         print(f"Warning: Error during schema initialization: {e}")
-        print("The application will continue, but some database validations may not be in effect.")
\ No newline at end of file
+        print("The application will continue, but some database validations may not be in effect.")
@@ -3,13 +3,21 @@ from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identi
 from functools import wraps
 import hmac
 import hashlib
+import os
 import time
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime  # Added for application status updates
 
 from app import db
 from app.models.admin import Admin
-from app.auth.utils import hash_password, check_password
+from app.auth.utils import hash_password, check_password, role_cache
+from app.utils.pagination import paginate, page_count, PaginationError, count_cache
+from app.utils.analytics import rollup_company, rollup_status_change
+from app.utils.company_hooks import company_saved
+from app.utils.skills import InvalidSkillFilter, company_skill_ids, get_skill_filter_args
+from app.utils.stats import collection_stats, get_stats
+from app.utils.search_cache import bump_generation, get_generations, search_cache
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -57,7 +65,7 @@ def admin_login():
     if username == 'savi@admin' and password == 'admin@savi':
         access_token = create_access_token(
             identity='admin',
-            additional_claims={'is_admin': True}
+            additional_claims={'is_admin': True, 'role': 'admin'}
         )
         
         return jsonify({
@@ -75,7 +83,7 @@ def admin_login():
     
     access_token = create_access_token(
         identity=str(admin['_id']),
-        additional_claims={'is_admin': True}
+        additional_claims={'is_admin': True, 'role': 'admin'}
     )
     
     if admin.get('_id'):
@@ -104,11 +112,12 @@ def admin_required(f):
 @admin_required
 def admin_dashboard():
     """Protected admin dashboard route."""
-    # Get counts for dashboard stats
-    students_count = db.students.count_documents({})
-    companies_count = db.companies.count_documents({})
-    applications_count = db.applications.count_documents({})
-    pending_applications = db.applications.count_documents({'status': 'pending'})
+    # Get counts for dashboard stats, shared with the analytics overview
+    stats = get_stats('students', 'companies', 'applications')
+    students_count = stats['students']['total']
+    companies_count = stats['companies']['total']
+    applications_count = stats['applications']['total']
+    pending_applications = stats['applications']['by_status'].get('pending', 0)
     
     return jsonify({
         'message': 'Welcome to admin dashboard',
@@ -121,25 +130,38 @@ def admin_dashboard():
         }
     }), 200
 
+@admin_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+@admin_required
+def cache_stats():
+    """Hit/miss statistics of the in-process caches (protected admin route)."""
+    # Every worker process has its own caches; pid tells which one answered
+    return jsonify({
+        'pid': os.getpid(),
+        'caches': {
+            'search': search_cache.stats(),
+            'count': count_cache.stats(),
+            'role': role_cache.stats()
+        },
+        'stats': {name: memo.stats() for name, memo in collection_stats.items()},
+        'generations': get_generations('companies', 'announcements')
+    }), 200
+
 @admin_bp.route('/users', methods=['GET'])
 @jwt_required()
 @admin_required
 def list_users():
     """List all users (protected admin route)."""
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 20))
-    skip = (page - 1) * per_page
-    
-    # Get total count
-    total = db.students.count_documents({})
-    
-    # Get paginated users
-    users = list(db.students.find({}, {
-        'password': 0,  # Exclude password field
-        'aadhar_no': 0,  # Exclude sensitive information
-        'parivar_pehchan_patra_id': 0
-    }).skip(skip).limit(per_page))
+    # Get paginated users (page number or keyset cursor), optionally by skill
+    try:
+        users, pagination = paginate(db.students, get_skill_filter_args(), projection={
+            'password': 0,  # Exclude password field
+            'aadhar_no': 0,  # Exclude sensitive information
+            'parivar_pehchan_patra_id': 0
+        }, default_per_page=20)
+    except (PaginationError, InvalidSkillFilter) as e:
+        return jsonify({'error': str(e)}), 400
+    page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
     
     # Convert ObjectId to string for JSON serialization
     for user in users:
@@ -150,7 +172,9 @@ def list_users():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': page_count(total, per_page),
+        'has_more': pagination['has_more'],
+        'next_cursor': pagination['next_cursor']
     }), 200
 
 @admin_bp.route('/users/<user_id>', methods=['GET'])
@@ -179,16 +203,12 @@ def get_user(user_id):
 @admin_required
 def list_companies():
     """List all companies (protected admin route)."""
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 20))
-    skip = (page - 1) * per_page
-    
-    # Get total count
-    total = db.companies.count_documents({})
-    
-    # Get paginated companies
-    companies = list(db.companies.find({}).skip(skip).limit(per_page))
+    # Get paginated companies (page number or keyset cursor)
+    try:
+        companies, pagination = paginate(db.companies, {}, default_per_page=20)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
     
     # Convert ObjectId to string for JSON serialization
     for company in companies:
@@ -199,7 +219,9 @@ def list_companies():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': page_count(total, per_page),
+        'has_more': pagination['has_more'],
+        'next_cursor': pagination['next_cursor']
     }), 200
 
 @admin_bp.route('/companies/create', methods=['POST'])
@@ -224,13 +246,17 @@ def create_company():
         'requirements': data.get('requirements', []),
         'deadline': data.get('deadline', int(time.time()) + 604800),  # Default 1 week from now
         'created_at': int(time.time()),
+        'posted_date': datetime.now(),
         'active': data.get('active', True)
     }
+    company['skill_ids'] = company_skill_ids(company)
     
     # Insert the company
     result = db.companies.insert_one(company)
     
     if result.inserted_id:
+        company_saved(company)
+        rollup_company(company)
         company['_id'] = str(result.inserted_id)
         return jsonify({
             'message': 'Company created successfully',
@@ -261,8 +287,10 @@ def update_company(company_id):
     # Update company fields
     update_data = {}
     for key, value in data.items():
-        if key != '_id':  # Prevent updating the ID
+        if key not in ('_id', 'skill_ids'):  # Prevent updating the ID and derived fields
             update_data[key] = value
+    if 'requirements' in update_data:
+        update_data['skill_ids'] = company_skill_ids(update_data)
     
     # Update the company
     result = db.companies.update_one(
@@ -271,6 +299,7 @@ def update_company(company_id):
     )
     
     if result.modified_count:
+        company_saved(db.companies.find_one({'_id': ObjectId(company_id)}), previous=company)
         return jsonify({
             'message': 'Company updated successfully'
         }), 200
@@ -301,6 +330,7 @@ def create_announcement():
     result = db.announcements.insert_one(announcement)
     
     if result.inserted_id:
+        bump_generation('announcements')
         announcement['_id'] = str(result.inserted_id)
         return jsonify({
             'message': 'Announcement created successfully',
@@ -314,17 +344,16 @@ def create_announcement():
 @admin_required
 def list_applications():
     """List all applications (protected admin route)."""
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 20))
-    skip = (page - 1) * per_page
-
     status = request.args.get('status')
     query = {}
     if status:
         query['status'] = status
 
-    total = db.applications.count_documents(query)
-    applications = list(db.applications.find(query).skip(skip).limit(per_page))
+    try:
+        applications, pagination = paginate(db.applications, query, default_per_page=20)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
 
     for application in applications:
         application['_id'] = str(application['_id'])
@@ -336,7 +365,9 @@ def list_applications():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': page_count(total, per_page),
+        'has_more': pagination['has_more'],
+        'next_cursor': pagination['next_cursor']
     }), 200
 
 @admin_bp.route('/applications/<application_id>/status', methods=['PUT'])
@@ -355,13 +386,17 @@ def update_application_status(application_id):
     if not ObjectId.is_valid(application_id):
         return jsonify({'error': 'Invalid application ID format'}), 400
 
-    # Update the application status
-    result = db.applications.update_one(
-        {'_id': ObjectId(application_id)},
-        {'$set': {'status': status_val}}
+    # Update the application status, reading the previous one for the analytics rollups
+    changed_at = datetime.now()
+    previous = db.applications.find_one_and_update(
+        {'_id': ObjectId(application_id), 'status': {'$ne': status_val}},
+        {'$set': {'status': status_val, 'status_updated_date': changed_at}},
+        projection={'status': 1, 'applied_date': 1, 'status_updated_date': 1},
+        return_document=ReturnDocument.BEFORE
     )
 
-    if result.modified_count:
+    if previous:
+        rollup_status_change(previous, status_val, changed_at)
         return jsonify({
             'message': 'Application status updated successfully'
         }), 200
@@ -5,7 +5,11 @@ from bson.objectid import ObjectId
 import calendar
 
 from app import db
+from app.config import Config
 from app.routes.api.admin.admin_routes import admin_required
+from app.utils.analytics import company_totals, count_active_students, day_keys, monthly_totals, rollup_days, window_totals
+from app.utils.batch_loader import get_loader
+from app.utils.stats import get_stats
 
 analytics_bp = Blueprint('analytics', __name__)
 
@@ -15,18 +19,20 @@ analytics_bp = Blueprint('analytics', __name__)
 def get_analytics_overview():
     """Get overview analytics for the admin dashboard."""
     try:
-        # Get total counts
-        total_students = db.students.count_documents({})
-        total_companies = db.companies.count_documents({})
-        total_applications = db.applications.count_documents({})
+        # One memoized aggregation per collection
+        stats = get_stats('students', 'companies', 'applications')
+        total_students = stats['students']['total']
+        total_companies = stats['companies']['total']
+        total_applications = stats['applications']['total']
         
         # Get active counts
-        active_companies = db.companies.count_documents({'active': True})
+        active_companies = stats['companies']['active']
         
         # Get application statistics
-        pending_applications = db.applications.count_documents({'status': 'pending'})
-        approved_applications = db.applications.count_documents({'status': 'approved'})
-        rejected_applications = db.applications.count_documents({'status': 'rejected'})
+        by_status = stats['applications']['by_status']
+        pending_applications = by_status.get('pending', 0)
+        approved_applications = by_status.get('approved', 0)
+        rejected_applications = by_status.get('rejected', 0)
         
         # Calculate application success rate
         if total_applications > 0:
@@ -62,11 +68,7 @@ def get_application_timeline():
         start_date = end_date - timedelta(days=days)
         
         # Create date range for the timeline
-        date_range = []
-        current_date = start_date
-        while current_date <= end_date:
-            date_range.append(current_date.strftime('%Y-%m-%d'))
-            current_date += timedelta(days=1)
+        date_range = day_keys(start_date, end_date)
         
         # Initialize data structure for timeline
         timeline_data = {
@@ -76,27 +78,14 @@ def get_application_timeline():
             'rejections': [0] * len(date_range)
         }
         
-        # Get applications within the date range
-        applications = list(db.applications.find({
-            'applied_date': {'$gte': start_date, '$lte': end_date}
-        }))
-        
-        # Process applications
-        for app in applications:
-            applied_date = app['applied_date'].strftime('%Y-%m-%d')
-            if applied_date in date_range:
-                index = date_range.index(applied_date)
-                timeline_data['applications'][index] += 1
-                
-                # Check status updates
-                if app.get('status_updated_date') and app['status_updated_date'] >= start_date:
-                    status_date = app['status_updated_date'].strftime('%Y-%m-%d')
-                    if status_date in date_range:
-                        status_index = date_range.index(status_date)
-                        if app['status'] == 'approved':
-                            timeline_data['approvals'][status_index] += 1
-                        elif app['status'] == 'rejected':
-                            timeline_data['rejections'][status_index] += 1
+        # One small rollup document per day with activity; other days stay 0
+        rollups = rollup_days(start_date, end_date, ('applications', 'status_changes'))
+        for index, date in enumerate(date_range):
+            day = rollups.get(date)
+            if day:
+                timeline_data['applications'][index] = day.get('applications', 0)
+                timeline_data['approvals'][index] = day.get('status_changes', {}).get('approved', 0)
+                timeline_data['rejections'][index] = day.get('status_changes', {}).get('rejected', 0)
         
         return jsonify(timeline_data), 200
     
@@ -112,26 +101,17 @@ def get_popular_companies():
         # Get limit from query parameters
         limit = int(request.args.get('limit', 10))
         
-        # Aggregate applications by company
-        pipeline = [
-            {'$group': {
-                '_id': '$company_id',
-                'application_count': {'$sum': 1}
-            }},
-            {'$sort': {'application_count': -1}},
-            {'$limit': limit}
-        ]
-        
-        popular_companies = list(db.applications.aggregate(pipeline))
+        # Per-company counts from the daily rollups, not the applications
+        popular_companies = [item for item in company_totals(limit) if ObjectId.is_valid(item['company_id'])]
         
-        # Get company details
+        # Get company details, in one query for all of them
+        companies = get_loader('companies').load_many(ObjectId(item['company_id']) for item in popular_companies)
         result = []
         for item in popular_companies:
-            company_id = item['_id']
-            company = db.companies.find_one({'_id': company_id})
+            company = companies.get(ObjectId(item['company_id']))
             if company:
                 result.append({
-                    'company_id': str(company_id),
+                    'company_id': item['company_id'],
                     'name': company.get('name', 'Unknown'),
                     'job_title': company.get('job_title', 'Unknown'),
                     'logo': company.get('logo', ''),
@@ -156,38 +136,33 @@ def get_student_activity():
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
-        # Get new student registrations
-        new_students = db.students.count_documents({
-            'registration_date': {'$gte': start_date, '$lte': end_date}
-        })
+        # Distinct applicants are counted exactly on short windows and
+        # estimated from the daily HyperLogLog sketches on longer ones
+        exact = request.args.get('exact')
+        exact = exact.lower() == 'true' if exact else days <= Config.ANALYTICS_EXACT_MAX_DAYS
         
-        # Get active students (those who have applied to at least one company)
-        active_students = db.applications.distinct('student_id', {
-            'applied_date': {'$gte': start_date, '$lte': end_date}
-        })
-        active_count = len(active_students)
+        # Registrations, applications and distinct applicants from the daily rollups
+        totals = window_totals(start_date, end_date)
+        new_students = totals['new_students']
+        active_count = count_active_students(start_date, end_date) if exact else totals['active_students']
         
         # Get total students
-        total_students = db.students.count_documents({})
+        total_students = db.students.estimated_document_count()
         
         # Calculate engagement rate
         engagement_rate = (active_count / total_students) * 100 if total_students > 0 else 0
         
         # Get average applications per active student
-        if active_count > 0:
-            total_applications = db.applications.count_documents({
-                'applied_date': {'$gte': start_date, '$lte': end_date}
-            })
-            avg_applications = total_applications / active_count
-        else:
-            avg_applications = 0
+        avg_applications = totals['applications'] / active_count if active_count > 0 else 0
         
         return jsonify({
             'new_students': new_students,
             'active_students': active_count,
             'total_students': total_students,
             'engagement_rate': round(engagement_rate, 2),
-            'avg_applications_per_student': round(avg_applications, 2)
+            'avg_applications_per_student': round(avg_applications, 2),
+            'active_students_exact': exact,
+            'applications_by_department': totals['departments']
         }), 200
     
     except Exception as e:
@@ -212,82 +187,11 @@ def get_monthly_report():
             'approvals': [0] * 12
         }
         
-        # Get student registrations by month
-        student_pipeline = [
-            {'$match': {
-                'registration_date': {
-                    '$gte': datetime(year, 1, 1),
-                    '$lt': datetime(year + 1, 1, 1)
-                }
-            }},
-            {'$group': {
-                '_id': {'$month': '$registration_date'},
-                'count': {'$sum': 1}
-            }}
-        ]
-        
-        student_results = list(db.students.aggregate(student_pipeline))
-        for result in student_results:
-            month_index = result['_id'] - 1  # MongoDB months are 1-indexed
-            monthly_data['new_students'][month_index] = result['count']
-        
-        # Get company registrations by month
-        company_pipeline = [
-            {'$match': {
-                'posted_date': {
-                    '$gte': datetime(year, 1, 1),
-                    '$lt': datetime(year + 1, 1, 1)
-                }
-            }},
-            {'$group': {
-                '_id': {'$month': '$posted_date'},
-                'count': {'$sum': 1}
-            }}
-        ]
-        
-        company_results = list(db.companies.aggregate(company_pipeline))
-        for result in company_results:
-            month_index = result['_id'] - 1
-            monthly_data['new_companies'][month_index] = result['count']
-        
-        # Get applications by month
-        application_pipeline = [
-            {'$match': {
-                'applied_date': {
-                    '$gte': datetime(year, 1, 1),
-                    '$lt': datetime(year + 1, 1, 1)
-                }
-            }},
-            {'$group': {
-                '_id': {'$month': '$applied_date'},
-                'count': {'$sum': 1}
-            }}
-        ]
-        
-        application_results = list(db.applications.aggregate(application_pipeline))
-        for result in application_results:
-            month_index = result['_id'] - 1
-            monthly_data['applications'][month_index] = result['count']
-        
-        # Get approvals by month
-        approval_pipeline = [
-            {'$match': {
-                'status': 'approved',
-                'status_updated_date': {
-                    '$gte': datetime(year, 1, 1),
-                    '$lt': datetime(year + 1, 1, 1)
-                }
-            }},
-            {'$group': {
-                '_id': {'$month': '$status_updated_date'},
-                'count': {'$sum': 1}
-            }}
-        ]
-        
-        approval_results = list(db.applications.aggregate(approval_pipeline))
-        for result in approval_results:
-            month_index = result['_id'] - 1
-            monthly_data['approvals'][month_index] = result['count']
+        # Sum the daily rollups of the year per month
+        for result in monthly_totals(year):
+            month_index = result['month'] - 1
+            for field in ('new_students', 'new_companies', 'applications', 'approvals'):
+                monthly_data[field][month_index] = result[field]
         
         return jsonify(monthly_data), 200
     
@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity
 import re
 from datetime import datetime
 
 from app import db
-from app.auth.utils import hash_password, check_password, validate_registration_number, validate_email
+from app.auth.utils import (
+    hash_password, check_password, validate_registration_number, validate_email,
+    create_user_token, invalidate_user_role
+)
+from app.utils.analytics import rollup_signup
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -84,6 +88,7 @@ def signup():
             'technical': [],
             'non_technical': []
         },
+        'skill_ids': [],
         'projects': [],
         'education': {
             'tenth': 0.0,
@@ -98,15 +103,19 @@ def signup():
             'interviews_not_attended': []
         },
         'certifications': [],
-        'messages': ''
+        'messages': '',
+        'registration_date': datetime.now()
     }
     
     # Insert the new student
     result = db.students.insert_one(new_student)
     
     if result.inserted_id:
-        # Generate access token
-        access_token = create_access_token(identity=registration_no)
+        invalidate_user_role(registration_no)
+        rollup_signup(new_student)
+        
+        # Generate access token with the role claim
+        access_token = create_user_token(registration_no, 'student')
         return jsonify({
             'message': 'User registered successfully',
             'access_token': access_token
@@ -135,8 +144,8 @@ def login():
     if not check_password(user['password'], password):
         return jsonify({'error': 'Invalid credentials'}), 401
     
-    # Generate access token
-    access_token = create_access_token(identity=user['registration_no'])
+    # Generate access token with the role claim
+    access_token = create_user_token(user['registration_no'], 'student')
     
     return jsonify({
         'message': 'Login successful',
@@ -2,8 +2,17 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument
 
 from app import db
+from app.auth.utils import get_current_student
+from app.utils.facets import format_facets, get_facet_args, InvalidFacet
+from app.utils.pagination import paginate, page_count, PaginationError
+from app.utils.analytics import rollup_application
+from app.utils.batch_loader import get_loader
+from app.utils.co_applications import record_co_application
+from app.utils.skills import InvalidSkillFilter, eligibility_filter, get_skill_filter_args, student_skill_ids
+from app.utils.trending import record_application
 
 company_bp = Blueprint('company', __name__)
 
@@ -41,15 +50,25 @@ def get_companies():
         except ValueError:
             pass
     
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
-    
-    # Get total count for pagination
-    total = db.companies.count_documents(query)
+    # Skill filters match canonical skill IDs through the multikey index
+    try:
+        query.update(get_skill_filter_args())
+    except InvalidSkillFilter as e:
+        return jsonify({'error': str(e)}), 400
+    if request.args.get('eligible', 'false').lower() == 'true':
+        student = get_current_student('skill_ids', 'skills', 'experience')
+        if not student:
+            return jsonify({'error': 'User not found'}), 404
+        skill_ids = student.get('skill_ids')
+        query.update(eligibility_filter(skill_ids if isinstance(skill_ids, list) else student_skill_ids(student)))
     
-    # Apply pagination
-    companies = list(db.companies.find(query).skip((page-1)*per_page).limit(per_page))
+    # Apply pagination (page number or keyset cursor), with optional facet counts
+    try:
+        facets = get_facet_args()
+        companies, pagination = paginate(db.companies, query, facets=facets)
+    except (PaginationError, InvalidFacet) as e:
+        return jsonify({'error': str(e)}), 400
+    page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
     
     # Convert ObjectId to string for JSON serialization
     for company in companies:
@@ -60,7 +79,10 @@ def get_companies():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': page_count(total, per_page),
+        'has_more': pagination['has_more'],
+        'next_cursor': pagination['next_cursor'],
+        'facets': format_facets(pagination.get('facets'))
     }), 200
 
 @company_bp.route('/<company_id>', methods=['GET'])
@@ -106,7 +128,7 @@ def apply_to_company(company_id):
             return jsonify({'error': 'Company not found'}), 404
         
         # Check if user exists and initialize companies field if needed
-        user = db.students.find_one({'registration_no': current_user})
+        user = get_current_student('companies', 'department', 'specialization')
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -140,11 +162,18 @@ def apply_to_company(company_id):
         result = db.applications.insert_one(application)
         
         if result.inserted_id:
-            # Update student's applied companies
-            db.students.update_one(
+            # Update student's applied companies, reading the ones applied to before
+            before = db.students.find_one_and_update(
                 {'registration_no': current_user},
-                {'$push': {'companies.applied': ObjectId(company_id)}}
-            )
+                {'$push': {'companies.applied': ObjectId(company_id)}},
+                projection={'companies.applied': 1},
+                return_document=ReturnDocument.BEFORE
+            ) or {}
+            companies = before.get('companies')
+            applied_before = (companies.get('applied') or []) if isinstance(companies, dict) else []
+            record_application(application['company_id'], application['applied_date'])
+            record_co_application(application['company_id'], applied_before)
+            rollup_application(application, user)
             
             return jsonify({
                 'message': 'Application submitted successfully',
@@ -165,13 +194,15 @@ def get_applications():
     # Get all applications for the user
     applications = list(db.applications.find({'student_id': current_user}))
     
+    # Get the company details of every application in one query
+    companies = get_loader('companies').load_many(ObjectId(application['company_id']) for application in applications)
+    
     # Convert ObjectId to string for JSON serialization and add company details
     for application in applications:
         application['_id'] = str(application['_id'])
         application['company_id'] = str(application['company_id'])
         
-        # Get company details
-        company = db.companies.find_one({'_id': ObjectId(application['company_id'])})
+        company = companies.get(ObjectId(application['company_id']))
         if company:
             application['company'] = {
                 'name': company.get('name', ''),
@@ -1,8 +1,8 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from app import db
 from app.auth.role_required import role_required
+from app.utils.stats import get_stats
 
 # Change the URL prefix to avoid conflict with root route
 faculty_dashboard_bp = Blueprint('faculty_dashboard_module', __name__, url_prefix='/api/faculty/dashboard')
@@ -33,8 +33,9 @@ def get_faculty_stats():
     This is a placeholder for future implementation.
     """
     # Example of what might be implemented in the future
-    student_count = db.students.count_documents({})
-    placed_count = db.students.count_documents({'placed': True})
+    students = get_stats('students')['students']
+    student_count = students['total']
+    placed_count = students['placed']
     
     return jsonify({
         'status': 'success',
@@ -1,51 +1,77 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson.objectid import ObjectId
+from pymongo.errors import ExecutionTimeout
 
 from app import db
+from app.config import Config
 from app.routes.api.admin.admin_routes import admin_required
+from app.auth.utils import get_user_role
+from app.utils.facets import format_facets, get_facet_args, InvalidFacet
+from app.utils.pagination import page_count, get_pagination_args, PaginationError
+from app.utils.search import (
+    GLOBAL_SEARCH_TARGETS, InvalidSearch, company_fuzzy_index, fuzzy_search, regex_search, search,
+    search_targets
+)
+from app.utils.search_cache import cached_search
+from app.utils.skills import InvalidSkillFilter, get_skill_filter_args
+from app.utils.suggestions import suggest
 
 search_bp = Blueprint('search', __name__)
 
+SEARCH_TIMEOUT_ERROR = 'Search took too long, please use more specific terms'
+
+def regex_requested():
+    """Whether the request asks for the admin-only regex mode."""
+    return request.args.get('regex', 'false').lower() == 'true'
+
 @search_bp.route('/companies', methods=['GET'])
 @jwt_required()
+@cached_search('companies', 'skills')
 def search_companies():
-    """Search companies by keyword across multiple fields."""
+    """Search companies by keyword, most relevant first."""
     # Get search query
     query = request.args.get('q', '')
     if not query:
         return jsonify({'error': 'Search query is required'}), 400
     
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
-    
-    # Build search query
-    search_query = {
-        '$or': [
-            {'name': {'$regex': query, '$options': 'i'}},
-            {'job_title': {'$regex': query, '$options': 'i'}},
-            {'job_description': {'$regex': query, '$options': 'i'}},
-            {'requirements': {'$regex': query, '$options': 'i'}},
-            {'location': {'$regex': query, '$options': 'i'}}
-        ],
-        'active': True
-    }
+    # Filters applied alongside the text match
+    filters = {'active': True}
     
     # Apply additional filters if provided
     job_type = request.args.get('job_type')
     if job_type:
-        search_query['job_type'] = job_type
+        filters['job_type'] = job_type
         
     work_place = request.args.get('work_place')
     if work_place:
-        search_query['work_place'] = work_place
-    
-    # Get total count for pagination
-    total = db.companies.count_documents(search_query)
-    
-    # Apply pagination
-    companies = list(db.companies.find(search_query).skip((page-1)*per_page).limit(per_page))
+        filters['work_place'] = work_place
+    
+    try:
+        filters.update(get_skill_filter_args())
+    except InvalidSkillFilter as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Rank by relevance (page number or keyset cursor on score); fuzzy mode
+    # tolerates misspellings by matching trigrams instead of stemmed words
+    fuzzy = request.args.get('fuzzy', 'false').lower() == 'true'
+    regex = regex_requested()
+    if regex and get_user_role(get_jwt_identity()) != 'admin':
+        return jsonify({'error': 'Regex search requires admin privileges'}), 403
+    try:
+        facets = get_facet_args()
+        if regex:
+            companies, pagination = regex_search(db.companies, query, filters, facets=facets)
+        elif fuzzy:
+            companies, pagination = fuzzy_search(db.companies, company_fuzzy_index, query, filters,
+                                                 facets=facets)
+        else:
+            companies, pagination = search(db.companies, query, filters, facets=facets)
+    except (PaginationError, InvalidFacet, InvalidSearch) as e:
+        return jsonify({'error': str(e)}), 400
+    except ExecutionTimeout:
+        return jsonify({'error': SEARCH_TIMEOUT_ERROR}), 503
+    page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
     
     # Convert ObjectId to string for JSON serialization
     for company in companies:
@@ -56,7 +82,12 @@ def search_companies():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page,
+        'pages': page_count(total, per_page),
+        'has_more': pagination['has_more'],
+        'next_cursor': pagination['next_cursor'],
+        'facets': format_facets(pagination.get('facets')),
+        'fuzzy': fuzzy,
+        'regex': regex,
         'query': query
     }), 200
 
@@ -70,25 +101,18 @@ def search_students():
     if not query:
         return jsonify({'error': 'Search query is required'}), 400
     
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
-    
-    # Build search query
-    search_query = {
-        '$or': [
-            {'registration_no': {'$regex': query, '$options': 'i'}},
-            {'name': {'$regex': query, '$options': 'i'}},
-            {'email_id': {'$regex': query, '$options': 'i'}},
-            {'specialization': {'$regex': query, '$options': 'i'}}
-        ]
-    }
-    
-    # Get total count for pagination
-    total = db.students.count_documents(search_query)
-    
-    # Apply pagination
-    students = list(db.students.find(search_query).skip((page-1)*per_page).limit(per_page))
+    # Rank by relevance (page number or keyset cursor on score)
+    regex = regex_requested()
+    try:
+        if regex:
+            students, pagination = regex_search(db.students, query, projection={'password': 0})
+        else:
+            students, pagination = search(db.students, query, projection={'password': 0})
+    except (PaginationError, InvalidSearch) as e:
+        return jsonify({'error': str(e)}), 400
+    except ExecutionTimeout:
+        return jsonify({'error': SEARCH_TIMEOUT_ERROR}), 503
+    page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
     
     # Convert ObjectId to string for JSON serialization and remove sensitive data
     for student in students:
@@ -101,12 +125,16 @@ def search_students():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page,
+        'pages': page_count(total, per_page),
+        'has_more': pagination['has_more'],
+        'next_cursor': pagination['next_cursor'],
+        'regex': regex,
         'query': query
     }), 200
 
 @search_bp.route('/announcements', methods=['GET'])
 @jwt_required()
+@cached_search('announcements')
 def search_announcements():
     """Search announcements by keyword."""
     # Get search query
@@ -114,23 +142,20 @@ def search_announcements():
     if not query:
         return jsonify({'error': 'Search query is required'}), 400
     
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
-    
-    # Build search query
-    search_query = {
-        '$or': [
-            {'title': {'$regex': query, '$options': 'i'}},
-            {'content': {'$regex': query, '$options': 'i'}}
-        ]
-    }
-    
-    # Get total count for pagination
-    total = db.announcements.count_documents(search_query)
-    
-    # Apply pagination
-    announcements = list(db.announcements.find(search_query).sort('date', -1).skip((page-1)*per_page).limit(per_page))
+    # Rank by relevance (page number or keyset cursor on score)
+    regex = regex_requested()
+    if regex and get_user_role(get_jwt_identity()) != 'admin':
+        return jsonify({'error': 'Regex search requires admin privileges'}), 403
+    try:
+        if regex:
+            announcements, pagination = regex_search(db.announcements, query)
+        else:
+            announcements, pagination = search(db.announcements, query)
+    except (PaginationError, InvalidSearch) as e:
+        return jsonify({'error': str(e)}), 400
+    except ExecutionTimeout:
+        return jsonify({'error': SEARCH_TIMEOUT_ERROR}), 503
+    page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
     
     # Convert ObjectId to string for JSON serialization
     for announcement in announcements:
@@ -141,67 +166,74 @@ def search_announcements():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page,
+        'pages': page_count(total, per_page),
+        'has_more': pagination['has_more'],
+        'next_cursor': pagination['next_cursor'],
+        'regex': regex,
         'query': query
     }), 200
 
 @search_bp.route('/global', methods=['GET'])
 @jwt_required()
+@cached_search('companies', 'announcements', per_role=True)
 def global_search():
-    """Global search across multiple collections."""
+    """Global search across multiple collections, merged by relevance."""
     # Get search query
     query = request.args.get('q', '')
     if not query:
         return jsonify({'error': 'Search query is required'}), 400
     
     # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
+    try:
+        page, per_page, _, include_total = get_pagination_args()
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Resolve the searchable collections here; the pool threads have no request context
+    role = get_user_role(get_jwt_identity())
+    targets = [target for target in GLOBAL_SEARCH_TARGETS if target.allows(role)]
+    
+    # Query every collection concurrently and merge by score
+    fuzzy = request.args.get('fuzzy', 'false').lower() == 'true'
+    try:
+        documents, pagination = search_targets(query, targets, page, per_page, include_total, fuzzy)
+    except InvalidSearch as e:
+        return jsonify({'error': str(e)}), 400
+    except ExecutionTimeout:
+        return jsonify({'error': SEARCH_TIMEOUT_ERROR}), 503
     
-    results = {
-        'companies': [],
-        'announcements': [],
-        'total': 0
-    }
+    # Convert ObjectId to string for JSON serialization
+    for document in documents:
+        document['_id'] = str(document['_id'])
     
-    # Search in companies
-    company_query = {
-        '$or': [
-            {'name': {'$regex': query, '$options': 'i'}},
-            {'job_title': {'$regex': query, '$options': 'i'}},
-            {'job_description': {'$regex': query, '$options': 'i'}}
-        ],
-        'active': True
-    }
-    companies = list(db.companies.find(company_query).limit(5))
-    for company in companies:
-        company['_id'] = str(company['_id'])
-        company['type'] = 'company'
-    results['companies'] = companies
-    
-    # Search in announcements
-    announcement_query = {
-        '$or': [
-            {'title': {'$regex': query, '$options': 'i'}},
-            {'content': {'$regex': query, '$options': 'i'}}
-        ]
+    results = {
+        'results': documents,
+        'counts': pagination['counts'],
+        'total': pagination['total'],
+        'page': page,
+        'per_page': per_page,
+        'pages': page_count(pagination['total'], per_page),
+        'has_more': pagination['has_more'],
+        'fuzzy': fuzzy,
+        'query': query
     }
-    announcements = list(db.announcements.find(announcement_query).sort('date', -1).limit(5))
-    for announcement in announcements:
-        announcement['_id'] = str(announcement['_id'])
-        announcement['type'] = 'announcement'
-    results['announcements'] = announcements
-    
-    # Combine results for pagination
-    all_results = companies + announcements
-    all_results.sort(key=lambda x: x.get('date', x.get('posted_date', '')), reverse=True)
+    # Per-type lists of the same page, as returned before results were merged
+    for target in targets:
+        results[target.name] = [document for document in documents if document['type'] == target.label]
     
-    # Calculate total
-    total_companies = db.companies.count_documents(company_query)
-    total_announcements = db.announcements.count_documents(announcement_query)
-    total = total_companies + total_announcements
+    return jsonify(results), 200
+
+@search_bp.route('/suggest', methods=['GET'])
+@jwt_required()
+def suggest_terms():
+    """Typeahead suggestions for company names, job titles, locations and skills."""
+    prefix = request.args.get('q', '').strip()
+    if not prefix:
+        return jsonify({'suggestions': [], 'query': prefix}), 200
     
-    results['total'] = total
-    results['query'] = query
+    limit = min(max(int(request.args.get('limit', Config.SUGGEST_TOP_K)), 1), Config.SUGGEST_TOP_K)
     
-    return jsonify(results), 200
+    return jsonify({
+        'suggestions': suggest(prefix, limit),
+        'query': prefix
+    }), 200
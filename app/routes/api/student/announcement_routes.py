@@ -4,6 +4,7 @@ from bson.objectid import ObjectId
 import time
 
 from app import db
+from app.utils.pagination import paginate, page_count, PaginationError
 
 # Create blueprint with unique name and consistent URL prefix
 student_announcements_bp = Blueprint('student_announcements', __name__, url_prefix='/api/student/announcements')
@@ -12,11 +13,6 @@ student_announcements_bp = Blueprint('student_announcements', __name__, url_pref
 @jwt_required()
 def get_all_announcements():
     """Get all announcements with optional filtering and pagination."""
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
-    skip = (page - 1) * per_page
-    
     # Get filter parameters
     important_only = request.args.get('important', '').lower() == 'true'
     date_after = request.args.get('date_after')
@@ -32,11 +28,12 @@ def get_all_announcements():
         except ValueError:
             pass
     
-    # Get total count
-    total = db.announcements.count_documents(query)
-    
-    # Get announcements
-    announcements = list(db.announcements.find(query).sort('date', -1).skip(skip).limit(per_page))
+    # Get announcements, newest first (page number or keyset cursor)
+    try:
+        announcements, pagination = paginate(db.announcements, query, sort_field='date', direction=-1)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
     
     # Convert ObjectId to string for JSON serialization
     for announcement in announcements:
@@ -47,7 +44,9 @@ def get_all_announcements():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': page_count(total, per_page),
+        'has_more': pagination['has_more'],
+        'next_cursor': pagination['next_cursor']
     }), 200
 
 @student_announcements_bp.route('/<announcement_id>', methods=['GET'])
@@ -3,7 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 import time
 
 from app import db
-from app.auth.utils import user_to_json
+from app.auth.utils import user_to_json, get_current_student, student_fields
 
 # Create blueprint with unique name and consistent URL prefix
 student_dashboard_bp = Blueprint('student_dashboard', __name__, url_prefix='/api/student/dashboard')
@@ -15,7 +15,7 @@ def get_dashboard_data():
     current_user = get_jwt_identity()
     
     # Get user data
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -60,12 +60,13 @@ def get_dashboard_data():
 
 @student_dashboard_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@student_fields('companies')
 def get_dashboard_stats():
     """Get only the dashboard statistics."""
     current_user = get_jwt_identity()
     
     # Get user data
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -4,6 +4,7 @@ from bson.objectid import ObjectId
 import time
 
 from app import db
+from app.utils.pagination import paginate, page_count, PaginationError
 
 # Create blueprint with unique name and consistent URL prefix
 student_notifications_bp = Blueprint('student_notifications', __name__, url_prefix='/api/student/notifications')
@@ -14,11 +15,6 @@ def get_all_notifications():
     """Get all notifications for the current user with pagination."""
     current_user = get_jwt_identity()
     
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
-    skip = (page - 1) * per_page
-    
     # Get filter parameters
     read_status = request.args.get('read')
     if read_status == 'true':
@@ -33,11 +29,12 @@ def get_all_notifications():
     if read_filter is not None:
         query['read'] = read_filter
     
-    # Get total count
-    total = db.notifications.count_documents(query)
-    
-    # Get notifications
-    notifications = list(db.notifications.find(query).sort('timestamp', -1).skip(skip).limit(per_page))
+    # Get notifications, newest first (page number or keyset cursor)
+    try:
+        notifications, pagination = paginate(db.notifications, query, sort_field='timestamp', direction=-1)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
     
     # Convert ObjectId to string for JSON serialization
     for notification in notifications:
@@ -48,7 +45,9 @@ def get_all_notifications():
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': page_count(total, per_page),
+        'has_more': pagination['has_more'],
+        'next_cursor': pagination['next_cursor']
     }), 200
 
 @student_notifications_bp.route('/<notification_id>', methods=['GET'])
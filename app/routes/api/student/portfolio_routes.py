@@ -3,7 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 import os
 
 from app import db
-from app.auth.utils import user_to_json
+from app.auth.utils import user_to_json, get_current_student, student_fields
 from app.utils.file_utils import get_file
 
 # Create blueprint with unique name and consistent URL prefix
@@ -11,12 +11,12 @@ student_portfolio_bp = Blueprint('student_portfolio', __name__, url_prefix='/api
 
 @student_portfolio_bp.route('/', methods=['GET'])
 @jwt_required()
+@student_fields('name', 'roll_number', 'registration_no', 'email_id', 'mobile_no', 'specialization',
+                'skills', 'experience', 'projects', 'education', 'certifications', 'cv')
 def get_portfolio():
     """Get the portfolio data of the current user."""
-    current_user = get_jwt_identity()
-    
     # Get user data
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -44,10 +44,8 @@ def get_portfolio():
 @jwt_required()
 def download_cv():
     """Download the CV of the current user."""
-    current_user = get_jwt_identity()
-    
     # Get user data to check CV path
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student('cv')
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -71,15 +69,13 @@ def download_cv():
 @jwt_required()
 def download_certification(certification_index):
     """Download a certification file."""
-    current_user = get_jwt_identity()
-    
     try:
         certification_index = int(certification_index)
     except ValueError:
         return jsonify({'error': 'Invalid certification index'}), 400
     
     # Get user data to check certification path
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student('certifications')
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -108,8 +104,11 @@ def download_certification(certification_index):
 @student_portfolio_bp.route('/public/<registration_no>', methods=['GET'])
 def get_public_portfolio(registration_no):
     """Get the public portfolio of a specific user."""
-    # Get user data
-    user = db.students.find_one({'registration_no': registration_no})
+    # Get only the public fields
+    user = db.students.find_one({'registration_no': registration_no}, {
+        'name': 1, 'registration_no': 1, 'specialization': 1,
+        'skills': 1, 'projects': 1, 'certifications': 1
+    })
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
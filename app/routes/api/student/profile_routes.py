@@ -6,20 +6,25 @@ from bson.objectid import ObjectId
 from werkzeug.utils import secure_filename
 
 from app import db
-from app.auth.utils import user_to_json
+from app.auth.utils import user_to_json, get_current_student
 from app.utils.file_utils import save_uploaded_file, delete_file
+from app.utils.recommendation_store import student_changed
+from app.utils.skills import canonical_names, store_student_skill_ids
 
 # Create blueprint with unique name and consistent URL prefix
 student_profile_bp = Blueprint('student_profile', __name__, url_prefix='/api/student/profile')
 
+def skills_changed(registration_no):
+    """Re-derive a student's skill IDs, then their recommendations, after a skill write."""
+    store_student_skill_ids(registration_no)
+    student_changed(registration_no)
+
 @student_profile_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_profile():
     """Get the profile of the current user."""
-    current_user = get_jwt_identity()
-    
     # Get user data
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -40,17 +45,23 @@ def update_profile():
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    # Get user data
-    user = db.students.find_one({'registration_no': current_user})
+    # Check that the user exists
+    user = get_current_student('_id')
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
     # Fields that cannot be updated by the user
-    protected_fields = ['_id', 'registration_no', 'password', 'registered', 'cv']
+    protected_fields = ['_id', 'registration_no', 'password', 'registered', 'cv', 'skill_ids']
     
     # Remove protected fields from update data
     update_data = {k: v for k, v in data.items() if k not in protected_fields}
     
+    # Store technical skills under their canonical names
+    if isinstance(update_data.get('skills'), dict) and 'technical' in update_data['skills']:
+        update_data['skills']['technical'] = canonical_names(update_data['skills']['technical'])
+    if 'skills.technical' in update_data:
+        update_data['skills.technical'] = canonical_names(update_data['skills.technical'])
+    
     # Update user data
     result = db.students.update_one(
         {'registration_no': current_user},
@@ -58,6 +69,12 @@ def update_profile():
     )
     
     if result.modified_count:
+        # Keep the skill IDs and materialized recommendations in step with the profile
+        changed = {key.split('.')[0] for key in update_data}
+        if changed & {'skills', 'experience'}:
+            skills_changed(current_user)
+        elif 'interests' in changed:
+            student_changed(current_user)
         return jsonify({
             'message': 'Profile updated successfully'
         }), 200
@@ -105,10 +122,8 @@ def upload_cv():
 @jwt_required()
 def download_cv():
     """Download the user's CV."""
-    current_user = get_jwt_identity()
-    
     # Get user data to check CV path
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student('cv')
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -145,7 +160,7 @@ def add_experience():
         'start_date': data['start_date'],
         'end_date': data['end_date'],
         'description': data['description'],
-        'skills_used': data.get('skills_used', [])
+        'skills_used': canonical_names(data.get('skills_used', []))
     }
     
     # Add experience to user profile
@@ -155,6 +170,7 @@ def add_experience():
     )
     
     if result.modified_count:
+        skills_changed(current_user)
         return jsonify({
             'message': 'Experience added successfully',
             'experience': experience
@@ -178,7 +194,7 @@ def update_experience(index):
         return jsonify({'error': 'No data provided'}), 400
     
     # Get user data to check if the experience exists
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student('experience')
     if not user or 'experience' not in user:
         return jsonify({'error': 'User has no experiences'}), 404
     
@@ -188,7 +204,7 @@ def update_experience(index):
     
     # Update the experience fields
     for key, value in data.items():
-        experiences[index][key] = value
+        experiences[index][key] = canonical_names(value) if key == 'skills_used' else value
     
     # Update the user's experiences array
     result = db.students.update_one(
@@ -197,6 +213,8 @@ def update_experience(index):
     )
     
     if result.modified_count:
+        if 'skills_used' in data:
+            skills_changed(current_user)
         return jsonify({
             'message': 'Experience updated successfully',
             'experience': experiences[index]
@@ -216,7 +234,7 @@ def delete_experience(index):
         return jsonify({'error': 'Invalid experience index'}), 400
     
     # Get user data to check if the experience exists
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student('experience')
     if not user or 'experience' not in user:
         return jsonify({'error': 'User has no experiences'}), 404
     
@@ -234,6 +252,7 @@ def delete_experience(index):
     )
     
     if result.modified_count:
+        skills_changed(current_user)
         return jsonify({
             'message': 'Experience deleted successfully'
         }), 200
@@ -367,7 +386,7 @@ def upload_certification_file(certification_index):
     file = request.files['file']
     
     # Get user data to check if the certification exists
-    user = db.students.find_one({'registration_no': current_user})
+    user = get_current_student('certifications')
     if not user or 'certifications' not in user:
         return jsonify({'error': 'User has no certifications'}), 404
     
@@ -424,7 +443,7 @@ def update_skills():
     
     update_fields = {}
     if 'technical' in data:
-        update_fields['skills.technical'] = data['technical']
+        update_fields['skills.technical'] = canonical_names(data['technical'])
     if 'non_technical' in data:
         update_fields['skills.non_technical'] = data['non_technical']
     
@@ -435,6 +454,8 @@ def update_skills():
     )
     
     if result.modified_count:
+        if 'skills.technical' in update_fields:
+            skills_changed(current_user)
         return jsonify({
             'message': 'Skills updated successfully'
         }), 200
@@ -1,37 +1,47 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson.objectid import ObjectId
-import re
 
 from app import db
+from app.config import Config
+from app.auth.utils import get_current_student
+from app.utils.pagination import get_pagination_args, paginate, page_count, page_ranked, PaginationError
+from app.utils.co_applications import also_applied, blend, collaborative_scores
+from app.utils.recommendation_store import SUMMARY_FIELDS, get_recommendations
+from app.utils.similarity import nearest_companies
+from app.utils.trending import trending_companies
 
 # Create blueprint with unique name and consistent URL prefix
 student_recommendations_bp = Blueprint('student_recommendations', __name__, url_prefix='/api/student/recommendations')
 
+# Upper bound of the similar-companies limit parameter
+MAX_SIMILAR_COMPANIES = 50
+
+SUMMARY_PROJECTION = {field: 1 for field in SUMMARY_FIELDS}
+
 @student_recommendations_bp.route('/companies', methods=['GET'])
 @jwt_required()
 def get_recommended_companies():
     """Get recommended companies based on user skills and interests."""
-    current_user = get_jwt_identity()
-    
-    # Get user data
-    user = db.students.find_one({'registration_no': current_user})
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    
-    # Get user skills and interests
-    technical_skills = user.get('skills', {}).get('technical', [])
-    interests = user.get('interests', [])
+    try:
+        page, per_page, cursor, include_total = get_pagination_args()
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
+    # Materialized top-K list, computed on first use and kept current by profile and company writes
+    recommendations = get_recommendations(get_jwt_identity())
     
     # If user has no skills or interests, return active companies
-    if not technical_skills and not interests:
+    if recommendations is None:
+        if not get_current_student('_id'):
+            return jsonify({'error': 'User not found'}), 404
+        
         query = {'active': True}
-        total = db.companies.count_documents(query)
-        companies = list(db.companies.find(query).skip((page-1)*per_page).limit(per_page))
+        try:
+            companies, pagination = paginate(db.companies, query)
+        except PaginationError as e:
+            return jsonify({'error': str(e)}), 400
+        page, per_page, total = pagination['page'], pagination['per_page'], pagination['total']
         
         # Convert ObjectId to string for JSON serialization
         for company in companies:
@@ -42,74 +52,137 @@ def get_recommended_companies():
             'total': total,
             'page': page,
             'per_page': per_page,
-            'pages': (total + per_page - 1) // per_page,
+            'pages': page_count(total, per_page),
+            'has_more': pagination['has_more'],
+            'next_cursor': pagination['next_cursor'],
             'recommendation_type': 'general'
         }), 200
     
-    # Build query to find companies that match user skills or interests
-    skill_queries = []
-    for skill in technical_skills:
-        skill_queries.append({'requirements': {'$regex': re.escape(skill), '$options': 'i'}})
+    # Entries are stored in ranked order with a company summary each
+    entries = {entry['company_id']: entry for entry in recommendations['companies']}
+    try:
+        page_items, has_more, next_cursor = page_ranked(
+            [(entry['company_id'], entry['score']) for entry in recommendations['companies']],
+            page, per_page, cursor
+        )
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    total = None if include_total == 'none' else len(entries)
     
-    interest_queries = []
-    for interest in interests:
-        interest_queries.append({'job_description': {'$regex': re.escape(interest), '$options': 'i'}})
-        interest_queries.append({'job_title': {'$regex': re.escape(interest), '$options': 'i'}})
+    companies = []
+    for company_id, score in page_items:
+        company = {key: value for key, value in entries[company_id].items() if key != 'company_id'}
+        company['_id'] = str(company_id)
+        company['match_percentage'] = min(100, int(round(score * 100)))
+        companies.append(company)
     
-    # Combine queries
-    combined_queries = skill_queries + interest_queries
+    return jsonify({
+        'companies': companies,
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': page_count(total, per_page),
+        'has_more': has_more,
+        'next_cursor': next_cursor,
+        'recommendation_type': 'personalized'
+    }), 200
+
+@student_recommendations_bp.route('/blended', methods=['GET'])
+@jwt_required()
+def get_blended_recommendations():
+    """Recommend companies by blending skill matches with what similar applicants applied to."""
+    try:
+        page, per_page, cursor, include_total = get_pagination_args()
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     
-    if combined_queries:
-        query = {
-            '$or': combined_queries,
-            'active': True
-        }
-    else:
-        query = {'active': True}
+    current_user = get_jwt_identity()
+    if not get_current_student('_id'):
+        return jsonify({'error': 'User not found'}), 404
     
-    # Get total count for pagination
-    total = db.companies.count_documents(query)
+    # Content scores from the materialized list, collaborative scores from the compacted neighbours
+    recommendations = get_recommendations(current_user)
+    entries = {entry['company_id']: entry for entry in recommendations['companies']} if recommendations else {}
+    content = {company_id: entry['score'] for company_id, entry in entries.items()}
+    applied_ids = db.applications.distinct('company_id', {'student_id': current_user})
+    collaborative = collaborative_scores(applied_ids)
     
-    # Apply pagination
-    companies = list(db.companies.find(query).skip((page-1)*per_page).limit(per_page))
+    applied = set(applied_ids)
     
-    # Calculate match score for each company
-    for company in companies:
-        company['_id'] = str(company['_id'])
-        
-        # Calculate match score based on how many skills and interests match
-        match_count = 0
-        requirements = company.get('requirements', '').lower()
-        job_description = company.get('job_description', '').lower()
-        job_title = company.get('job_title', '').lower()
-        
-        for skill in technical_skills:
-            if skill.lower() in requirements:
-                match_count += 2  # Skills are weighted more heavily
-        
-        for interest in interests:
-            if interest.lower() in job_description or interest.lower() in job_title:
-                match_count += 1
-        
-        # Calculate match percentage
-        total_factors = len(technical_skills) * 2 + len(interests)
-        if total_factors > 0:
-            company['match_percentage'] = min(100, int((match_count / total_factors) * 100))
-        else:
-            company['match_percentage'] = 0
+    # Summaries come with the materialized entries; read the other candidates
+    # in one query, so inactive and deleted companies are dropped before paging
+    missing = [company_id for company_id in collaborative if company_id not in entries and company_id not in applied]
+    if missing:
+        for company in db.companies.find({'_id': {'$in': missing}, 'active': True}, SUMMARY_PROJECTION):
+            entries[company['_id']] = company
     
-    # Sort by match percentage
-    companies.sort(key=lambda x: x.get('match_percentage', 0), reverse=True)
+    ranked = [pair for pair in blend(content, collaborative) if pair[0] in entries and pair[0] not in applied]
+    try:
+        page_items, has_more, next_cursor = page_ranked(ranked, page, per_page, cursor)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    total = None if include_total == 'none' else len(ranked)
+    
+    companies = []
+    for company_id, score in page_items:
+        company = {key: value for key, value in entries[company_id].items()
+                   if key in SUMMARY_FIELDS or key == 'matched_skills'}
+        company['_id'] = str(company_id)
+        company['score'] = score
+        company['content_score'] = content.get(company_id, 0.0)
+        company['collaborative_score'] = round(collaborative.get(company_id, 0.0), 4)
+        companies.append(company)
     
     return jsonify({
         'companies': companies,
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page,
-        'recommendation_type': 'personalized'
+        'pages': page_count(total, per_page),
+        'has_more': has_more,
+        'next_cursor': next_cursor,
+        'recommendation_type': 'blended'
     }), 200
 
+@student_recommendations_bp.route('/also-applied/<company_id>', methods=['GET'])
+@jwt_required()
+def get_also_applied(company_id):
+    """Companies that students who applied to the specified company also applied to."""
+    try:
+        # Validate the ObjectId format
+        if not ObjectId.is_valid(company_id):
+            return jsonify({'error': 'Invalid company ID format'}), 400
+        
+        # Get limit parameter
+        limit = min(max(int(request.args.get('limit', 5)), 1), Config.ALSO_APPLIED_TOP_K)
+        
+        # Precomputed neighbour list, most similar applicant sets first
+        neighbours = also_applied(ObjectId(company_id))
+        found = {company['_id']: company for company in db.companies.find(
+            {'_id': {'$in': [neighbour['company_id'] for neighbour in neighbours]}, 'active': True},
+            SUMMARY_PROJECTION
+        )}
+        
+        companies = []
+        for neighbour in neighbours:
+            company = found.get(neighbour['company_id'])
+            if company is None:
+                continue
+            company['_id'] = str(company['_id'])
+            company['co_applications'] = neighbour['count']
+            company['score'] = neighbour['score']
+            companies.append(company)
+            if len(companies) == limit:
+                break
+        
+        return jsonify({
+            'companies': companies,
+            'count': len(companies)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @student_recommendations_bp.route('/similar-companies/<company_id>', methods=['GET'])
 @jwt_required()
 def get_similar_companies(company_id):
@@ -124,31 +197,22 @@ def get_similar_companies(company_id):
         if not company:
             return jsonify({'error': 'Company not found'}), 404
         
-        # Extract key features for similarity matching
-        job_title = company.get('job_title', '')
-        job_type = company.get('job_type', '')
-        requirements = company.get('requirements', '')
-        
-        # Build query to find similar companies
-        query = {
-            '_id': {'$ne': ObjectId(company_id)},  # Exclude the current company
-            'active': True,
-            '$or': [
-                {'job_title': {'$regex': job_title.split(' ')[0] if job_title else '', '$options': 'i'}},
-                {'job_type': job_type},
-                {'requirements': {'$regex': '|'.join(requirements.split(',')[:3]) if requirements else '', '$options': 'i'}}
-            ]
-        }
-        
         # Get limit parameter
-        limit = int(request.args.get('limit', 5))
-        
-        # Find similar companies
-        similar_companies = list(db.companies.find(query).limit(limit))
-        
-        # Convert ObjectId to string for JSON serialization
-        for similar in similar_companies:
+        limit = min(max(int(request.args.get('limit', 5)), 1), MAX_SIMILAR_COMPANIES)
+        
+        # Nearest postings by Jaccard similarity of requirement and title tokens
+        ranked = nearest_companies(company, limit)
+        found = {similar['_id']: similar for similar in db.companies.find(
+            {'_id': {'$in': [similar_id for similar_id, _ in ranked]}, 'active': True}
+        )}
+        similar_companies = []
+        for similar_id, similarity in ranked:
+            similar = found.get(similar_id)
+            if similar is None:
+                continue
             similar['_id'] = str(similar['_id'])
+            similar['similarity'] = round(similarity, 4)
+            similar_companies.append(similar)
         
         return jsonify({
             'similar_companies': similar_companies,
@@ -164,71 +228,14 @@ def get_trending_companies():
     """Get trending companies based on application count and recency."""
     try:
         # Get limit parameter
-        limit = int(request.args.get('limit', 10))
-        
-        # Aggregate applications by company with recency factor
-        pipeline = [
-            # Match only recent applications (last 30 days)
-            {'$match': {
-                'applied_date': {'$gte': {'$subtract': [{'$now': {}}, {'$multiply': [30, 24, 60, 60, 1000]}]}}
-            }},
-            # Group by company
-            {'$group': {
-                '_id': '$company_id',
-                'application_count': {'$sum': 1},
-                'latest_application': {'$max': '$applied_date'}
-            }},
-            # Calculate trending score (application count * recency factor)
-            {'$addFields': {
-                'days_ago': {
-                    '$divide': [
-                        {'$subtract': [{'$now': {}}, '$latest_application']},
-                        {'$multiply': [24, 60, 60, 1000]}  # Convert ms to days
-                    ]
-                }
-            }},
-            {'$addFields': {
-                'recency_factor': {'$divide': [1, {'$add': [1, '$days_ago']}]},
-                'trending_score': {
-                    '$multiply': [
-                        '$application_count',
-                        {'$divide': [1, {'$add': [1, '$days_ago']}]}
-                    ]
-                }
-            }},
-            # Sort by trending score
-            {'$sort': {'trending_score': -1}},
-            # Limit results
-            {'$limit': limit},
-            # Lookup company details
-            {'$lookup': {
-                'from': 'companies',
-                'localField': '_id',
-                'foreignField': '_id',
-                'as': 'company_details'
-            }},
-            # Unwind company details
-            {'$unwind': {
-                'path': '$company_details',
-                'preserveNullAndEmptyArrays': False
-            }},
-            # Project final results
-            {'$project': {
-                '_id': 0,
-                'company_id': '$_id',
-                'company_name': '$company_details.company_name',
-                'job_title': '$company_details.job_title',
-                'logo': '$company_details.logo',
-                'application_count': 1,
-                'trending_score': 1
-            }}
-        ]
+        limit = min(max(int(request.args.get('limit', 10)), 1), Config.TRENDING_TOP_N)
         
-        trending_companies = list(db.applications.aggregate(pipeline))
+        # Served from this worker's in-memory board, refreshed from hourly counters
+        trending = trending_companies(limit)
         
         return jsonify({
-            'trending_companies': trending_companies,
-            'count': len(trending_companies)
+            'trending_companies': trending,
+            'count': len(trending)
         }), 200
     
     except Exception as e:
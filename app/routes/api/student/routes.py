@@ -6,36 +6,43 @@ from bson.objectid import ObjectId
 import time
 
 from app import db
-from app.auth.utils import user_to_json
+from app.auth.utils import user_to_json, get_user_role, get_current_student
 from app.auth.role_required import role_required
+from app.utils.pagination import paginate, page_count, PaginationError
 
 # Create blueprint with unique name and consistent URL prefix
 student_bp = Blueprint('student_api', __name__, url_prefix='/api/student')
 
+# sort_by values of the student listing; each has a (field, _id) index
+STUDENT_SORT_FIELDS = ('name.first', 'registration_no', '_id')
+
 @student_bp.route('/', methods=['GET'])
 @jwt_required()
 @role_required(['admin', 'faculty'])
 def get_all_students():
     """Get all students (admin/faculty only)."""
     # Get query parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 20))
     sort_by = request.args.get('sort_by', 'name.first')
+    if sort_by not in STUDENT_SORT_FIELDS:
+        return jsonify({'error': f"sort_by must be one of: {', '.join(STUDENT_SORT_FIELDS)}"}), 400
     sort_order = int(request.args.get('sort_order', 1))  # 1 for ascending, -1 for descending
+    if sort_order not in (1, -1):
+        return jsonify({'error': 'sort_order must be 1 or -1'}), 400
     
-    # Calculate skip
-    skip = (page - 1) * per_page
-    
-    # Get students with pagination
-    students_cursor = db.students.find().sort(sort_by, sort_order).skip(skip).limit(per_page)
-    students = list(students_cursor)
+    # Get students with pagination (page number or keyset cursor on sort_by + _id)
+    try:
+        students, pagination = paginate(db.students, {}, sort_field=sort_by, direction=sort_order,
+                                        projection={'password': 0}, default_per_page=20)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    page, per_page = pagination['page'], pagination['per_page']
     
     # Convert to JSON-serializable format
     student_list = [user_to_json(student) for student in students]
     
-    # Get total count
-    total_students = db.students.count_documents({})
-    total_pages = (total_students + per_page - 1) // per_page
+    # Exact total from a separate count aggregation (estimated, or omitted with include_total=none)
+    total_students = pagination['total']
+    total_pages = page_count(total_students, per_page)
     
     return jsonify({
         'students': student_list,
@@ -43,7 +50,9 @@ def get_all_students():
             'current_page': page,
             'per_page': per_page,
             'total_items': total_students,
-            'total_pages': total_pages
+            'total_pages': total_pages,
+            'has_more': pagination['has_more'],
+            'next_cursor': pagination['next_cursor']
         }
     }), 200
 
@@ -54,14 +63,16 @@ def get_student(student_id):
     """Get a specific student by ID."""
     # Check if the requesting user is allowed to access this student
     identity = get_jwt_identity()
-    role = db.students.find_one({'registration_no': identity})
     
     # If student is requesting and not their own profile, reject
-    if role and role.get('role') == 'student' and identity != student_id:
+    if identity != student_id and get_user_role(identity) == 'student':
         return jsonify({'error': 'You can only view your own profile'}), 403
     
-    # Get the student
-    student = db.students.find_one({'registration_no': student_id})
+    # Get the student, reusing the request-scoped document for their own profile
+    if identity == student_id:
+        student = get_current_student()
+    else:
+        student = db.students.find_one({'registration_no': student_id}, {'password': 0})
     if not student:
         return jsonify({'error': 'Student not found'}), 404
     
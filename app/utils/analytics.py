@@ -0,0 +1,281 @@
+"""
+Daily rollups for the admin analytics.
+
+``analytics_daily`` holds one small document per day, keyed by its
+YYYY-MM-DD date, so day ranges are _id index range scans:
+
+    applications      applications made that day
+    status            current status of the applications made that day
+    status_changes    applications whose current status was set that day, by status
+    companies         applications made that day, by company _id
+    departments       applications made that day, by applicant department
+    students          HyperLogLog sketch of the students who applied that day
+    new_students      students who registered that day
+    new_companies     companies posted that day
+
+Application, status-update, signup and company-creation writes update the
+documents in place with ``$inc``; rebuild_rollups() recomputes all of them
+from the raw collections (scripts/rebuild_analytics.py).
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from pymongo import ReplaceOne, UpdateOne
+
+from app import db
+from app.utils.hyperloglog import HyperLogLog, register_of
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLLECTION = 'analytics_daily'
+
+BATCH_SIZE = 500
+
+DAY_FORMAT = '%Y-%m-%d'
+
+def day_key(moment):
+    """Rollup _id of the day ``moment`` falls on."""
+    return moment.strftime(DAY_FORMAT)
+
+def day_keys(start, end):
+    """Rollup _ids of every day from ``start`` to ``end``, inclusive."""
+    keys = []
+    day = datetime(start.year, start.month, start.day)
+    while day <= end:
+        keys.append(day_key(day))
+        day += timedelta(days=1)
+    return keys
+
+def day_of(field):
+    """Aggregation expression for the rollup _id of a date field."""
+    return {'$dateToString': {'format': DAY_FORMAT, 'date': field}}
+
+def _field(value):
+    # Map keys are document field names, which cannot contain '.' or '$'
+    return str(value).replace('.', '_').replace('$', '_')
+
+def department_of(student):
+    """Rollup key of a student's department."""
+    student = student or {}
+    department = student.get('department') or student.get('specialization')
+    return _field(department) if department else 'unknown'
+
+def _apply(operations):
+    try:
+        db[ROLLUP_COLLECTION].bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.error(f"Error updating analytics rollups: {str(e)}")
+
+def rollup_application(application, student):
+    """
+    Count a new application in the rollup of the day it was made.
+
+    Errors are logged, not raised: the application itself already succeeded.
+    """
+    index, rank = register_of(application['student_id'])
+    _apply([UpdateOne({'_id': day_key(application['applied_date'])}, {
+        '$inc': {
+            'applications': 1,
+            f"status.{application['status']}": 1,
+            f"companies.{application['company_id']}": 1,
+            f"departments.{department_of(student)}": 1
+        },
+        '$max': {f'students.{index}': rank}
+    }, upsert=True)])
+
+def rollup_status_change(previous, status, changed_at):
+    """
+    Move an application from its previous status to ``status``.
+
+    The status counts of the day it was made are adjusted. ``status_changes``
+    only counts each application's current status, as rebuild_rollups()
+    does: the application moves from its previous status on the day that
+    was set to ``status`` on the day of this change. An application approved
+    and later rejected therefore ends up as one rejection.
+
+    Args:
+        previous (dict): The application before the change, with its
+            ``status``, ``applied_date`` and ``status_updated_date``
+        status (str): The new status
+        changed_at (datetime): When the status changed
+    """
+    operations = [UpdateOne({'_id': day_key(changed_at)}, {'$inc': {f'status_changes.{status}': 1}}, upsert=True)]
+    if previous.get('status_updated_date'):
+        operations.append(UpdateOne({'_id': day_key(previous['status_updated_date'])},
+                                    {'$inc': {f"status_changes.{previous.get('status', 'pending')}": -1}},
+                                    upsert=True))
+    if previous.get('applied_date'):
+        operations.append(UpdateOne({'_id': day_key(previous['applied_date'])}, {'$inc': {
+            f"status.{previous.get('status', 'pending')}": -1,
+            f'status.{status}': 1
+        }}, upsert=True))
+    _apply(operations)
+
+def rollup_signup(student):
+    """Count a new student on the day they registered."""
+    _apply([UpdateOne({'_id': day_key(student['registration_date'])}, {'$inc': {'new_students': 1}}, upsert=True)])
+
+def rollup_company(company):
+    """Count a new company on the day it was posted."""
+    _apply([UpdateOne({'_id': day_key(company['posted_date'])}, {'$inc': {'new_companies': 1}}, upsert=True)])
+
+def _grouped(collection, match, key, extra=None):
+    """(day, value) -> count rows of ``collection``, grouped in MongoDB."""
+    group_id = {'day': key}
+    group_id.update(extra or {})
+    pipeline = [{'$match': match}, {'$group': {'_id': group_id, 'count': {'$sum': 1}}}]
+    return list(collection.aggregate(pipeline, allowDiskUse=True))
+
+def rebuild_rollups():
+    """
+    Recompute every daily rollup from the raw collections.
+
+    Increments made while the rebuild runs may be lost, so run it when few
+    writes are expected. Companies without ``posted_date`` are counted on
+    their ``created_at`` timestamp.
+
+    Returns:
+        int: Number of days stored
+    """
+    departments = {student.get('registration_no'): department_of(student)
+                   for student in db.students.find({}, {'registration_no': 1, 'department': 1, 'specialization': 1})}
+    days = defaultdict(lambda: {
+        'applications': 0, 'status': Counter(), 'status_changes': Counter(), 'companies': Counter(),
+        'departments': Counter(), 'students': HyperLogLog(), 'new_students': 0, 'new_companies': 0
+    })
+
+    for row in _grouped(db.applications, {'applied_date': {'$type': 'date'}}, day_of('$applied_date'),
+                        {'student_id': '$student_id'}):
+        day = days[row['_id']['day']]
+        day['applications'] += row['count']
+        day['students'].add(row['_id']['student_id'])
+        day['departments'][departments.get(row['_id']['student_id'], 'unknown')] += row['count']
+    for row in _grouped(db.applications, {'applied_date': {'$type': 'date'}}, day_of('$applied_date'),
+                        {'company_id': '$company_id'}):
+        days[row['_id']['day']]['companies'][_field(row['_id']['company_id'])] += row['count']
+    for row in _grouped(db.applications, {'applied_date': {'$type': 'date'}}, day_of('$applied_date'),
+                        {'status': '$status'}):
+        days[row['_id']['day']]['status'][_field(row['_id']['status'])] += row['count']
+    for row in _grouped(db.applications, {'status_updated_date': {'$type': 'date'}}, day_of('$status_updated_date'),
+                        {'status': '$status'}):
+        days[row['_id']['day']]['status_changes'][_field(row['_id']['status'])] += row['count']
+    for row in _grouped(db.students, {'registration_date': {'$type': 'date'}}, day_of('$registration_date')):
+        days[row['_id']['day']]['new_students'] += row['count']
+    posted = {'$ifNull': ['$posted_date', {'$toDate': {'$multiply': ['$created_at', 1000]}}]}
+    for row in _grouped(db.companies, {'$or': [{'posted_date': {'$type': 'date'}}, {'created_at': {'$type': 'number'}}]},
+                        day_of(posted)):
+        days[row['_id']['day']]['new_companies'] += row['count']
+
+    collection = db[ROLLUP_COLLECTION]
+    operations = []
+    for key, day in days.items():
+        document = {field: dict(value) if isinstance(value, Counter) else value for field, value in day.items()}
+        document['students'] = day['students'].registers
+        operations.append(ReplaceOne({'_id': key}, document, upsert=True))
+        if len(operations) >= BATCH_SIZE:
+            collection.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+    collection.delete_many({'_id': {'$nin': list(days)}})
+    return len(days)
+
+def rollup_days(start, end, fields):
+    """
+    Read the rollups of the days from ``start`` to ``end``, inclusive.
+
+    Returns:
+        dict: Day key -> rollup document with ``fields``; days without any
+        activity are missing
+    """
+    query = {'_id': {'$gte': day_key(start), '$lte': day_key(end)}}
+    return {document['_id']: document
+            for document in db[ROLLUP_COLLECTION].find(query, {field: 1 for field in fields})}
+
+def window_totals(start, end):
+    """
+    Sum the rollups of the days from ``start`` to ``end``.
+
+    Returns:
+        dict: ``applications``, ``new_students``, ``active_students``
+        (distinct applicants, estimated from the merged daily sketches; see
+        app.utils.hyperloglog for the error) and ``departments``
+        (applications by department)
+    """
+    totals = {'applications': 0, 'new_students': 0, 'departments': Counter()}
+    students = HyperLogLog()
+    for document in rollup_days(start, end, ('applications', 'new_students', 'departments', 'students')).values():
+        totals['applications'] += document.get('applications', 0)
+        totals['new_students'] += document.get('new_students', 0)
+        totals['departments'].update(document.get('departments', {}))
+        students.merge(document.get('students', {}))
+    totals['active_students'] = students.count()
+    totals['departments'] = dict(totals['departments'])
+    return totals
+
+def monthly_totals(year):
+    """
+    Sum the rollups of ``year`` per month, in MongoDB.
+
+    Returns:
+        list: Dicts with ``month`` (1-12), ``new_students``, ``new_companies``,
+        ``applications`` and ``approvals`` (applications currently approved,
+        by the month they were approved); months without activity are missing
+    """
+    pipeline = [
+        {'$match': {'_id': {'$gte': f'{year:04d}-01-01', '$lte': f'{year:04d}-12-31'}}},
+        {'$group': {
+            '_id': {'$substrBytes': ['$_id', 5, 2]},
+            'new_students': {'$sum': '$new_students'},
+            'new_companies': {'$sum': '$new_companies'},
+            'applications': {'$sum': '$applications'},
+            'approvals': {'$sum': '$status_changes.approved'}
+        }}
+    ]
+    results = []
+    for result in db[ROLLUP_COLLECTION].aggregate(pipeline):
+        result['month'] = int(result.pop('_id'))
+        results.append(result)
+    return results
+
+def company_totals(limit):
+    """
+    The companies with the most applications, summed over every rollup.
+
+    One aggregation over the daily documents, so the cost grows with the
+    number of days and companies, not with the number of applications.
+
+    Returns:
+        list: Dicts with ``company_id`` (as stored in the rollup keys) and
+        ``application_count``, most applications first
+    """
+    pipeline = [
+        {'$match': {'companies': {'$type': 'object'}}},
+        {'$project': {'companies': {'$objectToArray': '$companies'}}},
+        {'$unwind': '$companies'},
+        {'$group': {'_id': '$companies.k', 'application_count': {'$sum': '$companies.v'}}},
+        {'$sort': {'application_count': -1, '_id': 1}},
+        {'$limit': limit}
+    ]
+    return [{'company_id': row['_id'], 'application_count': row['application_count']}
+            for row in db[ROLLUP_COLLECTION].aggregate(pipeline)]
+
+def count_active_students(start, end):
+    """
+    Exact number of distinct students who applied from ``start`` to ``end``.
+
+    Counted over the whole days of the window, like the rollups, with a
+    ``$group`` instead of ``distinct()`` so the result never has to fit in
+    one document. The cost grows with the number of applications in the
+    window, so this is meant for short windows.
+    """
+    first_day = datetime(start.year, start.month, start.day)
+    pipeline = [
+        {'$match': {'applied_date': {'$gte': first_day, '$lte': end}}},
+        {'$group': {'_id': '$student_id'}},
+        {'$count': 'students'}
+    ]
+    result = next(db.applications.aggregate(pipeline, allowDiskUse=True), None)
+    return result['students'] if result else 0
@@ -0,0 +1,83 @@
+"""
+Request-scoped batch loading of documents by key.
+
+Routes that show a related document for every row of a list (the company
+of each application, say) would otherwise run one ``find_one`` per row. A
+BatchLoader collects the keys first and resolves them with a single ``$in``
+query, fetching only the fields the views display. Loaded documents are
+memoized for the rest of the request, so later lookups of the same keys,
+from any view or helper, cost nothing:
+
+    companies = get_loader('companies')
+    found = companies.load_many(application['company_id'] for application in applications)
+
+Documents are shared between callers within a request: treat them as
+read-only.
+"""
+from flask import g
+
+from app import db
+
+# Company fields shown next to applications and in company rankings
+COMPANY_SUMMARY_FIELDS = ('name', 'logo', 'job_title')
+
+# Loader name -> (collection, fields)
+LOADERS = {
+    'companies': ('companies', COMPANY_SUMMARY_FIELDS)
+}
+
+class BatchLoader:
+    """Loads documents of ``collection`` by ``key`` in batches, memoizing them."""
+
+    def __init__(self, collection, fields, key='_id'):
+        self.collection = collection
+        self.key = key
+        self.projection = {field: 1 for field in (*fields, key)}
+        self._loaded = {}
+        self._pending = set()
+        self.queries = 0
+
+    def want(self, keys):
+        """Queue ``keys`` for the next query, without running it."""
+        for key in keys:
+            if key not in self._loaded:
+                self._pending.add(key)
+
+    def load(self, key):
+        """Return the document with ``key``, or None if there is none."""
+        return self.load_many([key]).get(key)
+
+    def load_many(self, keys):
+        """
+        Return the documents with ``keys``, fetching every queued key in one query.
+
+        Returns:
+            dict: Key -> document, for the keys that exist
+        """
+        keys = list(keys)
+        self.want(keys)
+        if self._pending:
+            self._fetch()
+        return {key: self._loaded[key] for key in keys if self._loaded.get(key) is not None}
+
+    def _fetch(self):
+        pending = list(self._pending)
+        self._pending.clear()
+        # Missing keys are memoized as None so they are not queried again
+        self._loaded.update(dict.fromkeys(pending))
+        self.queries += 1
+        for document in db[self.collection].find({self.key: {'$in': pending}}, self.projection):
+            self._loaded[document[self.key]] = document
+
+def get_loader(name):
+    """
+    The current request's loader ``name`` (a key of LOADERS), created on first use.
+
+    Raises:
+        KeyError: If there is no loader called ``name``
+    """
+    loaders = g.setdefault('_batch_loaders', {})
+    if name not in loaders:
+        collection, fields = LOADERS[name]
+        loaders[name] = BatchLoader(collection, fields)
+    return loaders[name]
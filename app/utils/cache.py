@@ -0,0 +1,144 @@
+"""
+In-process caching utilities.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after a TTL.
+
+    Each gunicorn worker holds its own instance, so cached values must be
+    safe to serve for up to ``ttl`` seconds after the underlying data changed
+    unless the writer invalidates them explicitly.
+
+    With ``max_bytes`` set, ``sizeof(value)`` is recorded for every entry and
+    least recently used entries are also evicted to keep the total under it.
+    """
+
+    def __init__(self, max_size=1024, ttl=60, max_bytes=None, sizeof=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key``, or ``default`` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, size = entry
+            if expires_at < time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store ``value`` under ``key``, evicting the least recently used entries if full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        size = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            # Would evict everything else and still not fit
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (value, expires_at, size)
+            self.bytes += size
+            while len(self._entries) > self.max_size or (self.max_bytes and self.bytes > self.max_bytes):
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, key):
+        """Remove ``key`` and its size; the caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def delete(self, key):
+        """Remove ``key`` from the cache if present."""
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Return size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+class Memo:
+    """
+    A value computed by ``builder`` and reused for ``ttl`` seconds.
+
+    Computation is single-flight: when the value is missing or expired, one
+    caller computes it while concurrent callers wait for that result instead
+    of computing it again. Errors raised by ``builder`` reach the caller that
+    computed and nothing is stored, so the next caller retries.
+    """
+
+    def __init__(self, builder, ttl=5):
+        self.builder = builder
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self):
+        """Return the memoized value, computing it if missing or expired."""
+        if self._expires_at > time.monotonic():
+            self.hits += 1
+            return self._value
+        with self._lock:
+            # Another caller may have computed it while this one waited
+            if self._expires_at > time.monotonic():
+                self.hits += 1
+                return self._value
+            self.misses += 1
+            value = self.builder()
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+            return value
+
+    def invalidate(self):
+        """Drop the value so the next call computes it again."""
+        self._expires_at = 0
+
+    def stats(self):
+        """Return TTL and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,240 @@
+"""
+Item-to-item recommendations from co-applications.
+
+``co_applications`` is a sparse company x company matrix: one document per
+ordered pair of companies with the number of students who applied to both.
+Applying increments the pairs of the new company with every company the
+student applied to before. A periodic compaction
+(scripts/compact_co_applications.py) folds the matrix into one
+``also_applied`` document per company holding its top ALSO_APPLIED_TOP_K
+neighbours, so serving them is a single _id lookup.
+
+Neighbours are scored by cosine similarity of the two companies' applicant
+sets, count(a, b) / sqrt(applicants(a) * applicants(b)), so popular
+companies do not top every list.
+"""
+import logging
+import math
+from collections import Counter
+from datetime import datetime
+
+from bson.objectid import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+
+from app import db
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+PAIRS_COLLECTION = 'co_applications'
+NEIGHBOURS_COLLECTION = 'also_applied'
+
+BATCH_SIZE = 1000
+
+def _pair_updates(company_id, other_id, update):
+    """The two symmetric entries of a pair."""
+    return [
+        UpdateOne({'company_id': company_id, 'other_id': other_id}, update, upsert=True),
+        UpdateOne({'company_id': other_id, 'other_id': company_id}, update, upsert=True)
+    ]
+
+def count_pairs(company_sets):
+    """
+    Count co-applications.
+
+    Args:
+        company_sets (iterable): The distinct companies each student applied to
+
+    Returns:
+        Counter: (company _id, other _id) -> number of students, both orders
+    """
+    pairs = Counter()
+    for companies in company_sets:
+        for company_id in companies:
+            for other_id in companies:
+                if company_id != other_id:
+                    pairs[(company_id, other_id)] += 1
+    return pairs
+
+def rank_neighbours(company_id, others, applicants, top_k):
+    """
+    Score and rank the co-applied companies of one company.
+
+    Args:
+        company_id: The company
+        others (iterable): (other _id, co-application count) pairs
+        applicants (dict): company _id -> number of applications
+        top_k (int): Number of neighbours to keep
+
+    Returns:
+        list: Dicts with company_id, count and score, best first
+    """
+    neighbours = []
+    for other_id, count in others:
+        norm = math.sqrt(applicants.get(company_id, 0) * applicants.get(other_id, 0))
+        if count > 0 and norm:
+            neighbours.append({'company_id': other_id, 'count': count, 'score': round(min(count / norm, 1.0), 4)})
+    neighbours.sort(key=lambda neighbour: (neighbour['score'], neighbour['count']), reverse=True)
+    return neighbours[:top_k]
+
+def combine_neighbours(neighbour_lists, applied_ids):
+    """
+    Score companies by their co-applications with ``applied_ids``.
+
+    Each neighbour scores the sum of its similarities with the companies
+    applied to, normalized so the best one scores 1.
+
+    Args:
+        neighbour_lists (iterable): Neighbour lists of the companies applied to
+        applied_ids (iterable): The companies applied to, left out of the result
+
+    Returns:
+        dict: company _id -> score in (0, 1]
+    """
+    scores = Counter()
+    for neighbours in neighbour_lists:
+        for neighbour in neighbours:
+            scores[neighbour['company_id']] += neighbour['score']
+    for company_id in applied_ids:
+        scores.pop(company_id, None)
+    best = max(scores.values(), default=0)
+    return {company_id: score / best for company_id, score in scores.items()} if best else {}
+
+def record_co_application(company_id, applied_before):
+    """
+    Count a new application against every company the student applied to before.
+
+    Args:
+        company_id: The company just applied to
+        applied_before (iterable): The student's ``companies.applied`` as it
+            was right before this application was pushed to it. The push
+            returns it atomically, so of two concurrent applications by one
+            student the later one sees the earlier, and their pair is
+            counted once.
+
+    Errors are logged, not raised: the application itself already succeeded.
+    """
+    try:
+        # Older routes stored the IDs as strings
+        others = {ObjectId(other) if isinstance(other, str) and ObjectId.is_valid(other) else other
+                  for other in applied_before} - {company_id}
+        operations = []
+        for other_id in others:
+            operations += _pair_updates(company_id, other_id, {'$inc': {'count': 1}})
+        if operations:
+            db[PAIRS_COLLECTION].bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.error(f"Error recording co-applications for company {company_id}: {str(e)}")
+
+def rebuild_pairs():
+    """
+    Recompute every pair count from the applications.
+
+    Pairs no longer backed by any application are removed, and pairs first
+    created while the rebuild runs are kept. Increments to existing pairs
+    made after the applications were read are overwritten, though, so run it
+    when few applications are expected; the next rebuild recovers them.
+
+    Returns:
+        int: Number of ordered pairs written
+    """
+    pipeline = [{'$group': {'_id': '$student_id', 'companies': {'$addToSet': '$company_id'}}}]
+    pairs = count_pairs(student['companies'] for student in db.applications.aggregate(pipeline, allowDiskUse=True))
+
+    started = datetime.utcnow()
+    collection = db[PAIRS_COLLECTION]
+    operations = []
+    for (company_id, other_id), count in pairs.items():
+        operations.append(UpdateOne({'company_id': company_id, 'other_id': other_id},
+                                    {'$set': {'count': count, 'rebuilt_at': started}}, upsert=True))
+        if len(operations) >= BATCH_SIZE:
+            collection.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+    collection.delete_many({'rebuilt_at': {'$lt': started}})
+    return len(pairs)
+
+def compact():
+    """
+    Fold the pair counts into per-company neighbour lists.
+
+    Returns:
+        int: Number of companies with a neighbour list
+    """
+    applicants = {doc['_id']: doc['count'] for doc in db.applications.aggregate([
+        {'$group': {'_id': '$company_id', 'count': {'$sum': 1}}}
+    ], allowDiskUse=True)}
+
+    pipeline = [
+        {'$group': {
+            '_id': '$company_id',
+            'others': {'$push': {'company_id': '$other_id', 'count': '$count'}}
+        }}
+    ]
+    computed_at = datetime.utcnow()
+    collection = db[NEIGHBOURS_COLLECTION]
+    operations = []
+    written = 0
+    for company in db[PAIRS_COLLECTION].aggregate(pipeline, allowDiskUse=True):
+        others = [(other['company_id'], other['count']) for other in company['others']]
+        neighbours = rank_neighbours(company['_id'], others, applicants, Config.ALSO_APPLIED_TOP_K)
+        if not neighbours:
+            continue
+        operations.append(ReplaceOne(
+            {'_id': company['_id']},
+            {'neighbours': neighbours, 'computed_at': computed_at},
+            upsert=True
+        ))
+        written += 1
+        if len(operations) >= BATCH_SIZE:
+            collection.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+    collection.delete_many({'computed_at': {'$lt': computed_at}})
+    return written
+
+def also_applied(company_id):
+    """
+    Return the compacted neighbours of a company.
+
+    Returns:
+        list: Dicts with company_id, count and score, best first
+    """
+    document = db[NEIGHBOURS_COLLECTION].find_one({'_id': company_id})
+    return document['neighbours'] if document else []
+
+def collaborative_scores(applied_ids):
+    """
+    Score companies by their co-applications with ``applied_ids``, read
+    from the compacted neighbour lists (see combine_neighbours()).
+
+    Returns:
+        dict: company _id -> score in (0, 1]; applied companies left out
+    """
+    documents = db[NEIGHBOURS_COLLECTION].find({'_id': {'$in': list(applied_ids)}}, {'neighbours': 1})
+    return combine_neighbours((document['neighbours'] for document in documents), applied_ids)
+
+def blend(content, collaborative, weight=None):
+    """
+    Combine content-based and collaborative scores.
+
+    Args:
+        content (dict): company _id -> content score (0 to 1)
+        collaborative (dict): company _id -> collaborative score (0 to 1)
+        weight (float, optional): Share of the collaborative score,
+            BLEND_COLLABORATIVE_WEIGHT by default
+
+    Returns:
+        list: (company _id, score) pairs by score then _id descending
+    """
+    weight = Config.BLEND_COLLABORATIVE_WEIGHT if weight is None else weight
+    ranked = [
+        (company_id, round((1 - weight) * content.get(company_id, 0.0) + weight * collaborative.get(company_id, 0.0), 4))
+        for company_id in set(content) | set(collaborative)
+    ]
+    ranked.sort(key=lambda pair: (pair[1], pair[0]), reverse=True)
+    return ranked
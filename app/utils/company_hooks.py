@@ -0,0 +1,52 @@
+"""
+Hooks run after a company is created or updated.
+
+Routes that write companies call company_saved() once the write succeeded,
+so every derived, in-process structure is updated in one place.
+"""
+import logging
+
+from app.utils import recommendation_store, recommender, search, similarity, suggestions
+from app.utils.search_cache import bump_generation
+
+logger = logging.getLogger(__name__)
+
+# (description, hook, index) triples; each hook takes (company, previous).
+# ``index`` is the LazyIndex the hook keeps current itself, if any: updated
+# in place, or rebuilt once by the hook's background work. Its version is
+# moved past the write, so requests to this worker do not rebuild it too.
+COMPANY_HOOKS = [
+    ('suggestions', suggestions.update_company, suggestions.suggest_index),
+    ('fuzzy index', search.update_company_fuzzy, search.company_fuzzy_index),
+    ('similarity index', similarity.update_company_similarity, similarity.company_similarity_index),
+    ('materialized recommendations', recommendation_store.company_changed, recommender.company_matrix)
+]
+
+def company_saved(company, previous=None):
+    """
+    Propagate a company write to derived indexes.
+
+    The ``companies`` generation is bumped first, which makes cached search
+    results unreachable and tells other workers to rebuild their indexes;
+    this worker's indexes are updated in place instead.
+
+    Failures are logged, not raised: the write itself already succeeded and
+    the derived structures are rebuilt periodically anyway.
+
+    Args:
+        company (dict): The company as stored after the write
+        previous (dict, optional): The company before the write, None when created
+    """
+    try:
+        generation = bump_generation('companies')
+    except Exception as e:
+        logger.error(f"Error invalidating the search cache for company {company.get('_id')}: {str(e)}")
+        generation = None
+
+    for description, hook, index in COMPANY_HOOKS:
+        try:
+            hook(company, previous)
+            if index is not None and generation is not None:
+                index.acknowledge(generation - 1, generation)
+        except Exception as e:
+            logger.error(f"Error updating {description} for company {company.get('_id')}: {str(e)}")
@@ -5,6 +5,8 @@ import datetime
 from bson.objectid import ObjectId
 from werkzeug.security import generate_password_hash
 from app import db
+from app.auth.utils import role_cache
+from app.utils.skills import company_skill_ids, default_taxonomy, student_skill_ids
 import logging
 
 def clear_database():
@@ -16,6 +18,8 @@ def clear_database():
         # Drop each collection
         for collection in collections:
             db[collection].drop()
+        # Every user is gone; other workers expire their roles within ROLE_CACHE_TTL
+        role_cache.clear()
         
         logging.info(f"Successfully cleared {len(collections)} collections from the database")
         return True, f"Successfully cleared {len(collections)} collections from the database"
@@ -23,6 +27,114 @@ def clear_database():
         logging.error(f"Error clearing database: {str(e)}")
         return False, f"Error clearing database: {str(e)}"
 
+# Skill sets students and companies are drawn from; each is one career track
+SKILL_TRACKS = [
+    ["Python", "JavaScript", "React", "Node.js", "MongoDB"],
+    ["Java", "Spring Boot", "MySQL", "Docker", "Kubernetes"],
+    ["C++", "Data Structures", "Algorithms", "Machine Learning"],
+    ["HTML", "CSS", "UI/UX Design", "Figma", "Adobe XD"],
+    ["AWS", "Azure", "DevOps", "CI/CD", "Jenkins"]
+]
+SOFT_SKILLS = ["Communication", "Teamwork", "Leadership", "Problem Solving", "Time Management"]
+INTERESTS = ["Web Development", "Mobile Development", "Data Science",
+             "Machine Learning", "Cloud Computing", "Cybersecurity"]
+DEPARTMENTS = ["Computer Science", "Electrical Engineering", "Mechanical Engineering",
+               "Civil Engineering", "Chemical Engineering", "Business Administration"]
+JOB_TYPES = ["Full-time", "Part-time", "Contract", "Internship"]
+WORK_PLACES = ["Remote", "On-site", "Hybrid"]
+LOCATIONS = ["New York", "San Francisco", "Boston", "Austin", "Seattle", "Chicago"]
+APPLICATION_STATUSES = ["pending", "approved", "rejected", "interview"]
+# Skills company requirements are drawn from, across tracks
+REQUIREMENT_SKILLS = ["Python", "JavaScript", "React", "Node.js", "MongoDB", "Java",
+                      "Spring Boot", "MySQL", "Docker", "Kubernetes", "C++", "AWS"]
+
+def build_test_students(count):
+    """
+    Build ``count`` test student documents without inserting them.
+    
+    All students share one password hash ("password123"), so building
+    thousands of them stays fast.
+    """
+    password = generate_password_hash("password123")
+    taxonomy = default_taxonomy()
+    students = []
+    for i in range(1, count + 1):
+        reg_no = f"S{2023000 + i}"
+        track = random.choice(SKILL_TRACKS)
+        students.append({
+            "registration_no": reg_no,
+            "name": f"Student {i}",
+            "email": f"student{i}@university.edu",
+            "password": password,
+            "department": random.choice(DEPARTMENTS),
+            "year": random.randint(1, 4),
+            "skills": {
+                "technical": random.sample(track, k=min(random.randint(2, 5), len(track))),
+                "soft": random.sample(SOFT_SKILLS, k=random.randint(2, 4))
+            },
+            "interests": random.sample(INTERESTS, k=random.randint(2, 4)),
+            "registration_date": datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 365))
+        })
+        students[-1]["skill_ids"] = student_skill_ids(students[-1], taxonomy)
+    return students
+
+def build_test_companies(count, by_track=False):
+    """
+    Build ``count`` test company documents without inserting them.
+
+    Args:
+        count (int): Number of companies
+        by_track (bool): Require 2 to 4 skills of a single career track
+            instead of 3 to 6 skills across tracks, so companies line up with
+            the students of that track (used by the offline evaluation)
+    """
+    taxonomy = default_taxonomy()
+    companies = []
+    for i in range(1, count + 1):
+        if by_track:
+            requirements = random.sample(random.choice(SKILL_TRACKS), k=random.randint(2, 4))
+        else:
+            requirements = random.sample(REQUIREMENT_SKILLS, k=random.randint(3, 6))
+        companies.append({
+            "name": f"Company {i}",
+            "logo": f"https://via.placeholder.com/150?text=Company{i}",
+            "job_title": f"Software Engineer {random.choice(['I', 'II', 'III', 'Senior', 'Lead'])}",
+            "job_description": f"We are looking for a talented software engineer to join our team. You will be responsible for developing and maintaining our software applications.",
+            "requirements": ", ".join(requirements),
+            "job_type": random.choice(JOB_TYPES),
+            "work_place": random.choice(WORK_PLACES),
+            "location": random.choice(LOCATIONS),
+            "stipend": random.randint(1000, 5000) * 100,  # Random stipend between 100k and 500k
+            "duration": f"{random.randint(3, 12)} months",
+            "deadline": datetime.datetime.now() + datetime.timedelta(days=random.randint(7, 30)),
+            "posted_date": datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 30)),
+            "active": random.choice([True, True, True, False]),  # 75% chance of being active
+            "company_size": random.choice(["1-50", "51-200", "201-500", "501-1000", "1000+"])
+        })
+        companies[-1]["skill_ids"] = company_skill_ids(companies[-1], taxonomy)
+    return companies
+
+def build_test_application(student, company_id, applied_date=None):
+    """Build one test application document of ``student`` to ``company_id``."""
+    status = random.choice(APPLICATION_STATUSES)
+    applied_date = applied_date or datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 30))
+    application = {
+        "company_id": company_id,
+        "student_id": student["registration_no"],
+        "cover_letter": f"I am writing to express my interest in the position at your company. I believe my skills and experience make me a strong candidate.",
+        "portfolio_link": f"https://portfolio.{student['registration_no'].lower()}.com",
+        "availability": f"{random.randint(1, 3)} weeks",
+        "notice_period": f"{random.randint(1, 4)} weeks",
+        "status": status,
+        "applied_date": applied_date
+    }
+    
+    # Add status update date if status is not pending
+    if status != "pending":
+        application["status_updated_date"] = applied_date + datetime.timedelta(days=random.randint(1, 7))
+    
+    return application
+
 def seed_database():
     """Seed the database with initial data for testing."""
     try:
@@ -38,99 +150,20 @@ def seed_database():
         logging.info("Admin user created")
         
         # Create test students
-        students = []
-        departments = ["Computer Science", "Electrical Engineering", "Mechanical Engineering", 
-                      "Civil Engineering", "Chemical Engineering", "Business Administration"]
-        skills = [
-            ["Python", "JavaScript", "React", "Node.js", "MongoDB"],
-            ["Java", "Spring Boot", "MySQL", "Docker", "Kubernetes"],
-            ["C++", "Data Structures", "Algorithms", "Machine Learning"],
-            ["HTML", "CSS", "UI/UX Design", "Figma", "Adobe XD"],
-            ["AWS", "Azure", "DevOps", "CI/CD", "Jenkins"]
-        ]
-        
-        for i in range(1, 101):  # Create 100 test students
-            reg_no = f"S{2023000 + i}"
-            student = {
-                "registration_no": reg_no,
-                "name": f"Student {i}",
-                "email": f"student{i}@university.edu",
-                "password": generate_password_hash("password123"),
-                "department": random.choice(departments),
-                "year": random.randint(1, 4),
-                "skills": {
-                    "technical": random.sample(random.choice(skills), k=random.randint(2, 5)),
-                    "soft": random.sample(["Communication", "Teamwork", "Leadership", "Problem Solving", "Time Management"], 
-                                         k=random.randint(2, 4))
-                },
-                "interests": random.sample(["Web Development", "Mobile Development", "Data Science", 
-                                          "Machine Learning", "Cloud Computing", "Cybersecurity"], 
-                                         k=random.randint(2, 4)),
-                "registration_date": datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 365))
-            }
-            students.append(student)
-        
+        students = build_test_students(100)
         db.students.insert_many(students)
         logging.info(f"{len(students)} test students created")
         
         # Create test companies
-        companies = []
-        job_types = ["Full-time", "Part-time", "Contract", "Internship"]
-        work_places = ["Remote", "On-site", "Hybrid"]
-        locations = ["New York", "San Francisco", "Boston", "Austin", "Seattle", "Chicago"]
-        
-        for i in range(1, 51):  # Create 50 test companies
-            company = {
-                "name": f"Company {i}",
-                "logo": f"https://via.placeholder.com/150?text=Company{i}",
-                "job_title": f"Software Engineer {random.choice(['I', 'II', 'III', 'Senior', 'Lead'])}",
-                "job_description": f"We are looking for a talented software engineer to join our team. You will be responsible for developing and maintaining our software applications.",
-                "requirements": ", ".join(random.sample(["Python", "JavaScript", "React", "Node.js", "MongoDB", "Java", 
-                                                       "Spring Boot", "MySQL", "Docker", "Kubernetes", "C++", "AWS"], 
-                                                     k=random.randint(3, 6))),
-                "job_type": random.choice(job_types),
-                "work_place": random.choice(work_places),
-                "location": random.choice(locations),
-                "stipend": random.randint(1000, 5000) * 100,  # Random stipend between 100k and 500k
-                "duration": f"{random.randint(3, 12)} months",
-                "deadline": datetime.datetime.now() + datetime.timedelta(days=random.randint(7, 30)),
-                "posted_date": datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 30)),
-                "active": random.choice([True, True, True, False]),  # 75% chance of being active
-                "company_size": random.choice(["1-50", "51-200", "201-500", "501-1000", "1000+"])
-            }
-            companies.append(company)
-        
+        companies = build_test_companies(50)
         company_ids = db.companies.insert_many(companies).inserted_ids
         logging.info(f"{len(companies)} test companies created")
         
-        # Create test applications
-        applications = []
-        statuses = ["pending", "approved", "rejected", "interview"]
-        
-        for i in range(1, 201):  # Create 200 test applications
-            student_index = random.randint(0, 99)  # Random student from our 100 test students
-            company_index = random.randint(0, 49)  # Random company from our 50 test companies
-            
-            status = random.choice(statuses)
-            applied_date = datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 30))
-            
-            application = {
-                "company_id": company_ids[company_index],
-                "student_id": students[student_index]["registration_no"],
-                "cover_letter": f"I am writing to express my interest in the position at your company. I believe my skills and experience make me a strong candidate.",
-                "portfolio_link": f"https://portfolio.student{student_index+1}.com",
-                "availability": f"{random.randint(1, 3)} weeks",
-                "notice_period": f"{random.randint(1, 4)} weeks",
-                "status": status,
-                "applied_date": applied_date
-            }
-            
-            # Add status update date if status is not pending
-            if status != "pending":
-                application["status_updated_date"] = applied_date + datetime.timedelta(days=random.randint(1, 7))
-            
-            applications.append(application)
-        
+        # Create test applications between random students and companies
+        applications = [
+            build_test_application(random.choice(students), random.choice(company_ids))
+            for _ in range(200)
+        ]
         db.applications.insert_many(applications)
         logging.info(f"{len(applications)} test applications created")
         
@@ -162,7 +195,7 @@ def seed_database():
             
             if notification_type == "application":
                 title = "Application Update"
-                message = f"Your application status has been updated to {random.choice(statuses)}"
+                message = f"Your application status has been updated to {random.choice(APPLICATION_STATUSES)}"
             elif notification_type == "announcement":
                 title = "New Announcement"
                 message = "A new announcement has been posted"
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from bson.objectid import ObjectId
 
 from app import db
+from app.utils.skills import company_skill_ids, default_taxonomy, student_skill_ids
 
 def generate_random_string(length=10):
     """Generate a random string of fixed length."""
@@ -98,6 +99,7 @@ def generate_dummy_students(count=5):
     last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
                 "Patel", "Sharma", "Kumar", "Singh", "Joshi", "Gupta", "Desai", "Shah", "Reddy", "Verma"]
     
+    taxonomy = default_taxonomy()
     student_ids = []
     
     for _ in range(count):
@@ -138,6 +140,8 @@ def generate_dummy_students(count=5):
             }
         }
         
+        student["skill_ids"] = student_skill_ids(student, taxonomy)
+        
         # Insert student into database
         result = db.students.insert_one(student)
         student_ids.append(str(result.inserted_id))
@@ -162,6 +166,7 @@ def generate_dummy_companies(count=3):
         "CyberSphere Solutions", "Future Technologies", "CodeCraft", "Silicon Valley Innovations"
     ]
     
+    taxonomy = default_taxonomy()
     company_ids = []
     
     for _ in range(count):
@@ -193,6 +198,8 @@ def generate_dummy_companies(count=3):
             "updated_at": datetime.now()
         }
         
+        company["skill_ids"] = company_skill_ids(company, taxonomy)
+        
         # Insert company into database
         result = db.companies.insert_one(company)
         company_ids.append(str(result.inserted_id))
@@ -0,0 +1,292 @@
+"""
+Offline evaluation of recommendation strategies.
+
+A synthetic population is built with the seed builders of
+app.utils.db_management; students then apply mostly to companies that
+require one of their skills, with a few very popular companies drawing
+applications from everyone. Each student's most recent applications are
+held out, every strategy is fitted on the rest, and its top-k list for each
+student is compared with the held-out applications.
+
+The generators of app.utils.dummy_data are not used: they insert every
+document as they build it, bcrypt-hash a password per student and draw
+company names from a fixed pool of twelve, so they cannot build a
+population of this size in memory.
+
+Everything runs in memory against the same ranking code the routes use, so
+no query reaches the database and runs are reproducible for a given seed.
+Importing the ``app`` package still creates the Flask app, though: it tries
+to connect to MONGO_URI (waiting up to 30 seconds when no server answers)
+and creates the upload directories.
+"""
+import math
+import random
+import statistics
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+
+from app.utils.co_applications import blend, combine_neighbours, count_pairs, rank_neighbours
+from app.utils.db_management import build_test_application, build_test_companies, build_test_students
+from app.utils.recommendation_store import student_profile
+from app.utils.recommender import TfidfMatrix, company_frequencies, student_frequencies
+
+# Share of applications driven by a matching skill; the rest follow popularity
+SKILL_AFFINITY = 0.75
+
+# Zipf exponent of company popularity
+POPULARITY_SKEW = 0.8
+
+def build_population(students=10000, companies=2000, applications=200000, seed=42):
+    """
+    Build a synthetic population.
+
+    Returns:
+        tuple: (students, companies, applications) as lists of documents;
+        companies carry an ``_id`` and applications are unique per pair
+    """
+    random.seed(seed)
+    student_docs = build_test_students(students)
+    company_docs = build_test_companies(companies, by_track=True)
+    for company in company_docs:
+        company['_id'] = ObjectId()
+
+    # Popularity follows a Zipf law over a random order of the companies
+    order = random.sample(range(len(company_docs)), len(company_docs))
+    popularity = [0.0] * len(company_docs)
+    for rank, index in enumerate(order, start=1):
+        popularity[index] = 1 / rank ** POPULARITY_SKEW
+
+    by_skill = defaultdict(list)
+    for index, company in enumerate(company_docs):
+        for skill in company['skill_ids']:
+            by_skill[skill].append(index)
+    skill_weights = {skill: [popularity[index] for index in indexes] for skill, indexes in by_skill.items()}
+
+    now = datetime.now()
+    pairs = set()
+    application_docs = []
+    attempts = 0
+    while len(application_docs) < applications and attempts < applications * 3:
+        attempts += 1
+        student = random.choice(student_docs)
+        skills = [skill for skill in student_profile(student)[0] if skill in by_skill]
+        if skills and random.random() < SKILL_AFFINITY:
+            skill = random.choice(skills)
+            index = random.choices(by_skill[skill], weights=skill_weights[skill])[0]
+        else:
+            index = random.choices(range(len(company_docs)), weights=popularity)[0]
+
+        pair = (student['registration_no'], index)
+        if pair in pairs:
+            continue
+        pairs.add(pair)
+        applied_date = now - timedelta(minutes=random.randint(1, 60 * 24 * 60))
+        application_docs.append(build_test_application(student, company_docs[index]['_id'], applied_date))
+
+    return student_docs, company_docs, application_docs
+
+def split_holdout(applications, fraction=0.2):
+    """
+    Hold out each student's most recent applications.
+
+    Students with a single application keep it for training.
+
+    Returns:
+        tuple: (training applications, {student_id: set of held-out company _ids})
+    """
+    by_student = defaultdict(list)
+    for application in applications:
+        by_student[application['student_id']].append(application)
+
+    train = []
+    held_out = {}
+    for student_id, student_applications in by_student.items():
+        student_applications.sort(key=lambda application: application['applied_date'])
+        count = len(student_applications)
+        test_count = max(1, int(round(count * fraction))) if count > 1 else 0
+        train.extend(student_applications[:count - test_count])
+        if test_count:
+            held_out[student_id] = {application['company_id'] for application in student_applications[-test_count:]}
+    return train, held_out
+
+class Strategy:
+    """A recommendation strategy: fitted once, then queried per student."""
+
+    name = None
+
+    def fit(self, students, companies, applied):
+        """
+        Args:
+            students (list): Student documents
+            companies (list): Company documents
+            applied (dict): student_id -> set of company _ids applied to (training)
+        """
+        raise NotImplementedError
+
+    def recommend(self, student, applied, k):
+        """Return the ``k`` best company _ids for ``student``, leaving out ``applied``."""
+        raise NotImplementedError
+
+class PopularityStrategy(Strategy):
+    """Most-applied companies first; the baseline every strategy should beat."""
+
+    name = 'popularity'
+
+    def fit(self, students, companies, applied):
+        counts = Counter(company_id for company_ids in applied.values() for company_id in company_ids)
+        self.ranked = [company_id for company_id, _ in counts.most_common()]
+
+    def recommend(self, student, applied, k):
+        recommended = []
+        for company_id in self.ranked:
+            if company_id not in applied:
+                recommended.append(company_id)
+                if len(recommended) == k:
+                    break
+        return recommended
+
+class ContentStrategy(Strategy):
+    """TF-IDF skill match, as in the materialized recommendations."""
+
+    name = 'content'
+
+    def fit(self, students, companies, applied):
+        self.matrix = TfidfMatrix([(company['_id'], company_frequencies(company)) for company in companies])
+
+    def scores(self, student):
+        vector = self.matrix.vector(student_frequencies(*student_profile(student)))
+        return self.matrix.rank(vector)
+
+    def recommend(self, student, applied, k):
+        return [company_id for company_id, _ in self.scores(student) if company_id not in applied][:k]
+
+class CollaborativeStrategy(Strategy):
+    """Co-application neighbours, as in the compacted "also applied" lists."""
+
+    name = 'collaborative'
+
+    def __init__(self, top_k=20):
+        self.top_k = top_k
+
+    def fit(self, students, companies, applied):
+        applicants = Counter(company_id for company_ids in applied.values() for company_id in company_ids)
+        others = defaultdict(list)
+        for (company_id, other_id), count in count_pairs(applied.values()).items():
+            others[company_id].append((other_id, count))
+        self.neighbours = {company_id: rank_neighbours(company_id, pairs, applicants, self.top_k)
+                           for company_id, pairs in others.items()}
+
+    def scores(self, applied):
+        return combine_neighbours((self.neighbours.get(company_id, []) for company_id in applied), applied)
+
+    def recommend(self, student, applied, k):
+        scores = self.scores(applied)
+        return [company_id for company_id, _ in sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]]
+
+class BlendedStrategy(Strategy):
+    """Content and collaborative scores mixed as in the blended endpoint."""
+
+    name = 'blended'
+
+    def __init__(self, weight=0.5, top_k=20):
+        self.weight = weight
+        self.content = ContentStrategy()
+        self.collaborative = CollaborativeStrategy(top_k)
+
+    def fit(self, students, companies, applied):
+        self.content.fit(students, companies, applied)
+        self.collaborative.fit(students, companies, applied)
+
+    def recommend(self, student, applied, k):
+        content = dict(self.content.scores(student))
+        ranked = blend(content, self.collaborative.scores(applied), self.weight)
+        return [company_id for company_id, _ in ranked if company_id not in applied][:k]
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (PopularityStrategy, ContentStrategy, CollaborativeStrategy, BlendedStrategy)
+}
+
+def ranking_metrics(recommended, relevant, k):
+    """
+    Precision, recall and nDCG at ``k`` with binary relevance.
+
+    Returns:
+        tuple: (precision, recall, ndcg)
+    """
+    hits = [1 if company_id in relevant else 0 for company_id in recommended[:k]]
+    dcg = sum(hit / math.log2(position + 2) for position, hit in enumerate(hits))
+    ideal = sum(1 / math.log2(position + 2) for position in range(min(len(relevant), k)))
+    return sum(hits) / k, sum(hits) / len(relevant), dcg / ideal if ideal else 0.0
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+def evaluate(strategy, students, companies, train, held_out, k=10, sample=None, seed=42):
+    """
+    Fit ``strategy`` on ``train`` and score its top-k lists against ``held_out``.
+
+    Args:
+        sample (int, optional): Evaluate this many random held-out students only
+
+    Returns:
+        dict: Quality metrics (means over students), latency percentiles in
+        milliseconds, fit time and peak memory allocated while fitting
+    """
+    applied = defaultdict(set)
+    for application in train:
+        applied[application['student_id']].add(application['company_id'])
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    strategy.fit(students, companies, applied)
+    fit_seconds = time.perf_counter() - started
+    _, fit_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    by_registration = {student['registration_no']: student for student in students}
+    test_ids = sorted(held_out)
+    if sample and sample < len(test_ids):
+        test_ids = random.Random(seed).sample(test_ids, sample)
+
+    precisions, recalls, ndcgs, latencies = [], [], [], []
+    for student_id in test_ids:
+        student_applied = applied.get(student_id, set())
+        started = time.perf_counter()
+        recommended = strategy.recommend(by_registration[student_id], student_applied, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        precision, recall, ndcg = ranking_metrics(recommended, held_out[student_id], k)
+        precisions.append(precision)
+        recalls.append(recall)
+        ndcgs.append(ndcg)
+
+    return {
+        'strategy': strategy.name,
+        'students': len(test_ids),
+        f'precision@{k}': round(statistics.fmean(precisions), 4) if precisions else 0.0,
+        f'recall@{k}': round(statistics.fmean(recalls), 4) if recalls else 0.0,
+        f'ndcg@{k}': round(statistics.fmean(ndcgs), 4) if ndcgs else 0.0,
+        'p50_ms': round(percentile(latencies, 0.5), 3) if latencies else 0.0,
+        'p95_ms': round(percentile(latencies, 0.95), 3) if latencies else 0.0,
+        'fit_s': round(fit_seconds, 2),
+        'fit_peak_mb': round(fit_peak / 2 ** 20, 1)
+    }
+
+def format_report(results):
+    """Render evaluate() results as a fixed-width table."""
+    if not results:
+        return ''
+    columns = list(results[0])
+    widths = [max(len(column), *(len(str(result[column])) for result in results)) for column in columns]
+    lines = ['  '.join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines.append('  '.join('-' * width for width in widths))
+    for result in results:
+        lines.append('  '.join(str(result[column]).ljust(width) for column, width in zip(columns, widths)))
+    return '\n'.join(lines)
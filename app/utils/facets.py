@@ -0,0 +1,84 @@
+"""
+Facet counts for company listings.
+
+Each facet is a small aggregation pipeline. The page itself is a plain
+find(); the requested facets run as branches of one $facet aggregation
+over the current filters, next to the exact total when that is asked for
+too (see app.utils.pagination.paginate). Requesting facets therefore
+costs one extra round trip per listing, whatever the number of facets.
+Counts cover every document matching the current filters, not just the
+current page.
+"""
+from flask import request
+
+# Lower bounds of the stipend bands; the last band is open-ended
+STIPEND_BANDS = [0, 5000, 10000, 20000, 30000, 50000]
+
+def _value_counts(field, limit):
+    return [
+        {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1, '_id': 1}},
+        {'$limit': limit}
+    ]
+
+FACETS = {
+    'job_type': _value_counts('job_type', 20),
+    'work_place': _value_counts('work_place', 20),
+    'location': _value_counts('location', 20),
+    'stipend': [
+        {'$bucket': {
+            'groupBy': '$stipend',
+            'boundaries': STIPEND_BANDS + [float('inf')],
+            # Missing or non-numeric stipends
+            'default': 'unknown',
+            'output': {'count': {'$sum': 1}}
+        }}
+    ]
+}
+
+class InvalidFacet(ValueError):
+    """Raised when an unknown facet is requested."""
+
+def get_facet_args():
+    """
+    Read the ``facets`` query parameter (comma-separated facet names).
+
+    Returns:
+        dict: facet name -> pipeline, empty when no facets were requested
+
+    Raises:
+        InvalidFacet: If a name is not one of FACETS
+    """
+    names = [name.strip() for name in request.args.get('facets', '').split(',') if name.strip()]
+    unknown = [name for name in names if name not in FACETS]
+    if unknown:
+        raise InvalidFacet(f"Unknown facets: {', '.join(unknown)}. Available: {', '.join(FACETS)}")
+    return {name: FACETS[name] for name in names}
+
+def format_facets(raw):
+    """
+    Turn raw $facet output into JSON-friendly histograms.
+
+    Value facets become ``[{'value', 'count'}]``; the stipend facet becomes
+    ``[{'min', 'max', 'count'}]`` with ``max`` None for the open-ended band
+    and both bounds None for documents without a numeric stipend.
+    """
+    formatted = {}
+    for name, buckets in (raw or {}).items():
+        if name == 'stipend':
+            upper_bounds = dict(zip(STIPEND_BANDS, STIPEND_BANDS[1:]))
+            formatted[name] = [
+                {'min': None, 'max': None, 'count': bucket['count']} if bucket['_id'] == 'unknown'
+                else {'min': bucket['_id'], 'max': upper_bounds.get(bucket['_id']), 'count': bucket['count']}
+                for bucket in buckets
+            ]
+        else:
+            formatted[name] = [{'value': bucket['_id'], 'count': bucket['count']} for bucket in buckets]
+    return formatted
+
+def facet_counts(collection, query, facets, max_time_ms=None):
+    """Compute ``facets`` over ``query`` in a single aggregation (for non-$facet readers)."""
+    if not facets:
+        return {}
+    options = {'maxTimeMS': max_time_ms} if max_time_ms else {}
+    return next(collection.aggregate([{'$match': query}, {'$facet': facets}], **options), {})
@@ -0,0 +1,73 @@
+"""
+HyperLogLog sketches for approximate distinct counts.
+
+A sketch of precision ``p`` keeps ``m = 2**p`` registers. Each value is
+hashed to 64 bits; the first ``p`` bits pick a register, which keeps the
+largest rank (position of the first 1 bit) seen among the remaining bits.
+The count is estimated from the registers with a relative standard error
+of ``1.04 / sqrt(m)``: 1.6% at the default precision of 12, whatever the
+number of values, in at most 4096 registers.
+
+Registers are kept sparse, as ``{str(index): rank}`` for the non-zero ones,
+so a stored sketch is small on quiet days, is updated in place with ``$max``
+on a single field, and sketches of any number of days merge by taking the
+per-register maximum.
+"""
+import hashlib
+import math
+
+# Registers = 2 ** PRECISION; stored sketches must all share it
+PRECISION = 12
+
+def standard_error(precision=PRECISION):
+    """Relative standard error of a count estimated at ``precision``."""
+    return 1.04 / math.sqrt(2 ** precision)
+
+def register_of(value, precision=PRECISION):
+    """
+    Register index and rank of ``value``.
+
+    The hash is stable across processes (unlike ``hash()``), so stored
+    sketches stay mergeable.
+
+    Returns:
+        tuple: (index, rank)
+    """
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+    bits = int.from_bytes(digest, 'big')
+    width = 64 - precision
+    rest = bits & ((1 << width) - 1)
+    return bits >> width, width - rest.bit_length() + 1
+
+class HyperLogLog:
+    """A mergeable distinct-count sketch with sparse registers."""
+
+    def __init__(self, registers=None, precision=PRECISION):
+        self.precision = precision
+        self.registers = {}
+        if registers:
+            self.merge(registers)
+
+    def add(self, value):
+        """Count ``value``."""
+        index, rank = register_of(value, self.precision)
+        key = str(index)
+        if rank > self.registers.get(key, 0):
+            self.registers[key] = rank
+
+    def merge(self, registers):
+        """Merge the sparse ``registers`` of another sketch into this one."""
+        for key, rank in registers.items():
+            if rank > self.registers.get(key, 0):
+                self.registers[key] = rank
+
+    def count(self):
+        """Estimated number of distinct values added."""
+        m = 2 ** self.precision
+        zeros = m - len(self.registers)
+        harmonic = zeros + sum(2.0 ** -rank for rank in self.registers.values())
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / harmonic
+        if estimate <= 2.5 * m and zeros:
+            # Small cardinalities: linear counting over the empty registers
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
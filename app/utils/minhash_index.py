@@ -0,0 +1,125 @@
+"""
+MinHash locality-sensitive hashing for near-duplicate lookups.
+
+Every document is reduced to a MinHash signature of its token set; the
+signature is cut into bands and each band is hashed into a bucket. Two
+documents land in a common bucket with a probability that rises steeply
+with their Jaccard similarity, so a lookup only compares the query with the
+documents sharing one of its buckets instead of with the whole collection.
+Candidates are then ranked by their exact Jaccard similarity.
+"""
+import random
+import threading
+import zlib
+from collections import defaultdict
+
+# Mersenne prime larger than any 32-bit token hash
+_PRIME = (1 << 61) - 1
+
+def token_hash(token):
+    """Stable 32-bit hash of a token, identical in every process."""
+    return zlib.crc32(token.encode('utf-8'))
+
+def jaccard(tokens, other):
+    """Jaccard similarity of two sets."""
+    if not tokens and not other:
+        return 0.0
+    return len(tokens & other) / len(tokens | other)
+
+class MinHashLSH:
+    """
+    Banded MinHash index over token sets.
+
+    With ``num_perm`` hash functions split into ``bands`` bands of ``rows``
+    rows, a pair with Jaccard similarity s shares at least one bucket with
+    probability 1 - (1 - s**rows)**bands; the defaults (64 / 16) catch pairs
+    above about 0.5 almost always and pairs below 0.2 rarely. Writers and
+    readers take a lock, since queries iterate over buckets writers mutate.
+    """
+
+    def __init__(self, num_perm=64, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        generator = random.Random(seed)
+        self._permutations = [(generator.randrange(1, _PRIME), generator.randrange(0, _PRIME))
+                              for _ in range(num_perm)]
+        self._hashes = {}                                     # token -> its value under every permutation
+        self._tokens = {}                                     # doc id -> token set
+        self._keys = {}                                       # doc id -> band keys
+        self._buckets = [defaultdict(set) for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def _token_hashes(self, token):
+        # Vocabularies are small and shared across documents, so this is cached
+        hashes = self._hashes.get(token)
+        if hashes is None:
+            value = token_hash(token)
+            hashes = self._hashes[token] = tuple((a * value + b) % _PRIME for a, b in self._permutations)
+        return hashes
+
+    def signature(self, tokens):
+        """MinHash signature of a non-empty token set."""
+        return [min(column) for column in zip(*(self._token_hashes(token) for token in tokens))]
+
+    def _band_keys(self, tokens):
+        signature = self.signature(tokens)
+        return [hash(tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def add(self, doc_id, tokens):
+        """Index ``doc_id`` under ``tokens``, replacing what it had."""
+        tokens = frozenset(tokens)
+        keys = self._band_keys(tokens) if tokens else None
+        with self._lock:
+            self._remove(doc_id)
+            if not tokens:
+                return
+            self._tokens[doc_id] = tokens
+            self._keys[doc_id] = keys
+            for band, key in enumerate(keys):
+                self._buckets[band][key].add(doc_id)
+
+    def remove(self, doc_id):
+        """Drop ``doc_id`` from the index."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        self._tokens.pop(doc_id, None)
+        for band, key in enumerate(self._keys.pop(doc_id, ())):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def query(self, tokens, limit=10, exclude=None):
+        """
+        Find the indexed documents most similar to ``tokens``.
+
+        Args:
+            tokens (iterable): Token set of the query
+            limit (int): Maximum number of results
+            exclude: Document id to leave out, usually the query's own
+
+        Returns:
+            list: (doc id, Jaccard similarity) pairs, most similar first
+        """
+        tokens = frozenset(tokens)
+        if not tokens:
+            return []
+        keys = self._band_keys(tokens)
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(keys):
+                candidates |= self._buckets[band].get(key, set())
+            candidates.discard(exclude)
+            scored = [(doc_id, jaccard(tokens, self._tokens[doc_id])) for doc_id in candidates]
+
+        scored.sort(key=lambda item: (-item[1], str(item[0])))
+        return scored[:limit]
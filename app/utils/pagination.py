@@ -0,0 +1,247 @@
+"""
+Pagination helpers for list endpoints.
+
+Every list endpoint supports two modes:
+- page mode (``page``/``per_page``), kept for compatibility; its cost grows
+  with the page depth because MongoDB has to walk the skipped documents
+- cursor mode (``cursor``), a keyset over the sort key plus ``_id`` as a
+  tiebreaker; every page costs the same as the first one
+
+Responses carry ``next_cursor`` in both modes, so clients can switch to
+cursor mode after the first page.
+
+The ``include_total`` parameter chooses how the total is computed:
+- ``exact`` (default): the count (and any facets) come from one aggregation
+  run next to the page query
+- ``estimated``: the count is served from a per-process cache with a TTL
+- ``none``: no count at all; ``has_more`` comes from fetching per_page + 1
+"""
+import base64
+import binascii
+
+from bson import json_util
+from flask import request
+
+from app.config import Config
+from app.utils.cache import TTLCache
+
+TOTAL_MODES = ('exact', 'estimated', 'none')
+
+# (collection, query) -> document count, for include_total=estimated
+count_cache = TTLCache(max_size=Config.COUNT_CACHE_SIZE, ttl=Config.COUNT_CACHE_TTL)
+
+class PaginationError(ValueError):
+    """Raised when pagination parameters are invalid."""
+
+class InvalidCursor(PaginationError):
+    """Raised when a cursor token is malformed or belongs to another sort order."""
+
+def get_pagination_args(default_per_page=10):
+    """
+    Read the pagination query parameters.
+
+    Returns:
+        tuple: (page, per_page, cursor, include_total)
+
+    Raises:
+        PaginationError: If include_total is not a known mode
+    """
+    page = max(int(request.args.get('page', 1)), 1)
+    per_page = max(int(request.args.get('per_page', default_per_page)), 1)
+    cursor = request.args.get('cursor') or None
+    include_total = request.args.get('include_total', 'exact').lower()
+    if include_total not in TOTAL_MODES:
+        raise PaginationError(f"include_total must be one of: {', '.join(TOTAL_MODES)}")
+    return page, per_page, cursor, include_total
+
+def page_count(total, per_page):
+    """Number of pages for ``total`` items, or None when the total was not computed."""
+    if total is None:
+        return None
+    return (total + per_page - 1) // per_page
+
+def estimated_count(collection, query, max_time_ms=None):
+    """Count documents matching ``query``, served from a short-lived per-process cache."""
+    key = f"{collection.name}:{json_util.dumps(query, sort_keys=True)}"
+    total = count_cache.get(key)
+    if total is None:
+        # An empty filter can be answered from collection metadata
+        options = {'maxTimeMS': max_time_ms} if max_time_ms else {}
+        if query:
+            total = collection.count_documents(query, **options)
+        else:
+            total = collection.estimated_document_count(**options)
+        count_cache.set(key, total)
+    return total
+
+def encode_cursor(sort_field, direction, value, last_id):
+    """Encode the position after a document as an opaque, URL-safe token."""
+    payload = json_util.dumps({'f': sort_field, 'd': direction, 'v': value, 'id': last_id})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token, sort_field, direction):
+    """
+    Decode a cursor token produced by encode_cursor().
+
+    Returns:
+        tuple: (sort value, _id) of the last document of the previous page
+
+    Raises:
+        InvalidCursor: If the token is malformed or was issued for another sort
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise InvalidCursor('Invalid cursor')
+
+    if not isinstance(payload, dict) or 'id' not in payload:
+        raise InvalidCursor('Invalid cursor')
+    if payload.get('f') != sort_field or payload.get('d') != direction:
+        raise InvalidCursor('Cursor does not match the requested sort order')
+
+    return payload.get('v'), payload['id']
+
+def get_sort_value(document, sort_field):
+    """Read a (possibly dotted) sort field from a document."""
+    value = document
+    for part in sort_field.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def keyset_filter(sort_field, direction, value, last_id):
+    """
+    Build the filter selecting documents after (value, last_id) in sort order.
+
+    Missing and null sort values sort first ascending and last descending,
+    which the extra clauses account for. A sort field holding values of
+    several BSON types is only paged correctly within each type.
+    """
+    op = '$gt' if direction == 1 else '$lt'
+    if sort_field == '_id':
+        return {'_id': {op: last_id}}
+
+    same_value = {sort_field: value, '_id': {op: last_id}}
+    if value is None:
+        if direction == 1:
+            return {'$or': [same_value, {sort_field: {'$ne': None}}]}
+        return same_value
+
+    clauses = [{sort_field: {op: value}}, same_value]
+    if direction == -1:
+        clauses.append({sort_field: None})
+    return {'$or': clauses}
+
+def page_ranked(ranked, page, per_page, cursor=None, score_field='score'):
+    """
+    Cut one page out of an in-memory ranking.
+
+    Args:
+        ranked (list): (_id, score) pairs sorted by score, then _id, descending
+        page (int): Page number, used when there is no cursor
+        per_page (int): Items per page
+        cursor (str, optional): Cursor returned with the previous page
+        score_field (str): Sort field name recorded in the cursors
+
+    Returns:
+        tuple: (page of pairs, has_more, next_cursor)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or was issued for another sort
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor, score_field, -1)
+        ranked = [(doc_id, score) for doc_id, score in ranked
+                  if score < value or (score == value and doc_id < last_id)]
+    else:
+        ranked = ranked[(page - 1) * per_page:]
+
+    has_more = len(ranked) > per_page
+    ranked = ranked[:per_page]
+    next_cursor = encode_cursor(score_field, -1, ranked[-1][1], ranked[-1][0]) if has_more else None
+    return ranked, has_more, next_cursor
+
+def sort_spec(sort_field, direction):
+    """Sort specification with ``_id`` as the tiebreaker."""
+    if sort_field == '_id':
+        return [('_id', direction)]
+    return [(sort_field, direction), ('_id', direction)]
+
+def paginate(collection, query, sort_field='_id', direction=1, projection=None, default_per_page=10,
+             facets=None, max_time_ms=None):
+    """
+    Fetch one page of ``query`` in page or cursor mode, depending on the request.
+
+    Args:
+        collection: The pymongo collection
+        query (dict): The filter
+        sort_field (str): Indexed sort key; ``_id`` is always the tiebreaker
+        direction (int): 1 for ascending, -1 for descending
+        projection (dict, optional): Projection, must keep ``sort_field``
+        default_per_page (int): Page size when ``per_page`` is not given
+        facets (dict, optional): Extra $facet branches (name -> pipeline)
+            computed over ``query`` in the same aggregation as the count
+        max_time_ms (int, optional): Server-side time budget of each query
+
+    Returns:
+        tuple: (documents, pagination) where pagination holds page, per_page,
+        total (None with include_total=none), has_more, next_cursor and,
+        when requested, the raw ``facets`` output
+
+    Raises:
+        PaginationError: If the request carries invalid pagination parameters
+        pymongo.errors.ExecutionTimeout: If a query exceeds ``max_time_ms``
+    """
+    page, per_page, cursor, include_total = get_pagination_args(default_per_page)
+
+    page_query = query
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_field, direction)
+        page_query = {'$and': [query, keyset_filter(sort_field, direction, value, last_id)]}
+    skip = 0 if cursor else (page - 1) * per_page
+    sort = sort_spec(sort_field, direction)
+
+    # The page is always a plain find, so the keyset filter, sort and limit
+    # run as one indexed top-k scan; one extra document tells whether
+    # another page exists
+    documents = list(collection.find(page_query, projection, max_time_ms=max_time_ms)
+                     .sort(sort).skip(skip).limit(per_page + 1))
+
+    total = None
+    facet_results = None
+    if include_total == 'exact' or facets:
+        # Count and facets over the whole filter, in one aggregation
+        # without a sort
+        branches = dict(facets or {})
+        if include_total == 'exact':
+            branches['total'] = [{'$count': 'count'}]
+        options = {'maxTimeMS': max_time_ms} if max_time_ms else {}
+        result = next(collection.aggregate([{'$match': query}, {'$facet': branches}],
+                                           allowDiskUse=True, **options), {})
+        if include_total == 'exact':
+            total = result['total'][0]['count'] if result.get('total') else 0
+        if facets:
+            facet_results = {name: result.get(name, []) for name in facets}
+    if include_total == 'estimated':
+        total = estimated_count(collection, query, max_time_ms)
+
+    has_more = len(documents) > per_page
+    documents = documents[:per_page]
+
+    next_cursor = None
+    if has_more:
+        last = documents[-1]
+        next_cursor = encode_cursor(sort_field, direction, get_sort_value(last, sort_field), last['_id'])
+
+    pagination = {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'has_more': has_more,
+        'next_cursor': next_cursor
+    }
+    if facet_results is not None:
+        pagination['facets'] = facet_results
+    return documents, pagination
@@ -0,0 +1,234 @@
+"""
+In-memory prefix index for typeahead suggestions.
+
+PrefixIndex is a character trie whose nodes cache the top-k entries of
+their subtree, so a lookup costs one walk down the prefix and no sorting.
+LazyIndex builds an index on first use in each worker and rebuilds it in
+the background once it is older than its TTL or its data version changed,
+which is how changes made through other workers show up.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def normalize(text):
+    """Lowercase ``text`` and collapse whitespace."""
+    return ' '.join(str(text).lower().split())
+
+class _Node:
+    __slots__ = ('children', 'entries', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = {}   # (term, kind) -> count, for keys ending at this node
+        self.top = ()       # best (-count, term, kind) tuples of the subtree
+
+class PrefixIndex:
+    """
+    A trie of weighted terms with the top-k entries cached on every node.
+
+    A term is reachable from the start of each of its words, so "Google
+    India" is suggested for both "goo" and "ind". Writers take a lock;
+    readers do not, since a node's ``top`` is replaced, never mutated.
+    """
+
+    def __init__(self, top_k=10, max_key_length=64, max_words=6):
+        self.top_k = top_k
+        self.max_key_length = max_key_length
+        self.max_words = max_words
+        self._root = _Node()
+        self._display = {}   # (term, kind) -> text as first seen
+        self._lock = threading.Lock()
+
+    def _keys(self, term):
+        """Keys under which ``term`` is stored: the suffixes starting at each word."""
+        words = term.split(' ')
+        for i in range(min(len(words), self.max_words)):
+            yield ' '.join(words[i:])[:self.max_key_length]
+
+    def add(self, text, kind, delta=1, refresh=True):
+        """
+        Add ``delta`` to the weight of ``text`` (negative to remove it).
+
+        Pass ``refresh=False`` while bulk loading and call finalize() after.
+        """
+        term = normalize(text)
+        if not term:
+            return
+        entry_key = (term, kind)
+        with self._lock:
+            self._display.setdefault(entry_key, ' '.join(str(text).split()))
+            for key in self._keys(term):
+                path = [self._root]
+                node = self._root
+                for char in key:
+                    node = node.children.setdefault(char, _Node())
+                    path.append(node)
+
+                count = node.entries.get(entry_key, 0) + delta
+                if count > 0:
+                    node.entries[entry_key] = count
+                else:
+                    node.entries.pop(entry_key, None)
+
+                if refresh:
+                    # Bottom-up, so every parent merges already-updated children
+                    for path_node in reversed(path[1:]):
+                        self._refresh(path_node)
+
+    def remove(self, text, kind):
+        """Decrease the weight of ``text`` by one."""
+        self.add(text, kind, delta=-1)
+
+    def _refresh(self, node):
+        """Recompute a node's top-k from its own entries and its children's."""
+        best = {}
+        for (term, kind), count in node.entries.items():
+            best[(term, kind)] = count
+        for child in node.children.values():
+            for negative_count, term, kind in child.top:
+                # A term reachable through several of its words is counted once
+                if best.get((term, kind), 0) < -negative_count:
+                    best[(term, kind)] = -negative_count
+        node.top = tuple(sorted((-count, term, kind) for (term, kind), count in best.items())[:self.top_k])
+
+    def finalize(self):
+        """Compute every node's top-k after a bulk load."""
+        with self._lock:
+            stack = [(self._root, False)]
+            while stack:
+                node, children_done = stack.pop()
+                if children_done:
+                    self._refresh(node)
+                else:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in node.children.values())
+
+    def suggest(self, prefix, limit=None):
+        """
+        Return up to ``limit`` entries whose words start with ``prefix``.
+
+        Returns:
+            list: Dicts with text, type and count, heaviest first
+        """
+        node = self._root
+        for char in normalize(prefix)[:self.max_key_length]:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        top = node.top if node is not self._root else ()
+        return [
+            {'text': self._display.get((term, kind), term), 'type': kind, 'count': -negative_count}
+            for negative_count, term, kind in top[:limit or self.top_k]
+        ]
+
+class LazyIndex:
+    """
+    Holds an index built by ``builder``, built on first use and rebuilt in a
+    background thread once older than ``ttl`` seconds. Requests keep being
+    served from the previous index while a rebuild runs.
+
+    With ``version`` (a callable returning e.g. a generation counter), the
+    version is checked at most every ``check_interval`` seconds and a change
+    triggers a rebuild, so writes made through other workers show up within
+    seconds rather than after a full TTL.
+    """
+
+    def __init__(self, builder, ttl=600, version=None, check_interval=5):
+        self.builder = builder
+        self.ttl = ttl
+        self.version = version
+        self.check_interval = check_interval
+        self._index = None
+        self._built_at = 0
+        self._built_version = None
+        self._checked_at = 0
+        self._rebuilding = False
+        self._lock = threading.Lock()
+
+    @property
+    def built(self):
+        """Whether the index has been built in this process."""
+        return self._index is not None
+
+    def get(self):
+        """Return the current index, building it if this worker has none yet."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._build()
+        elif self._stale():
+            with self._lock:
+                if self._rebuilding:
+                    return self._index
+                self._rebuilding = True
+            threading.Thread(target=self._rebuild, daemon=True).start()
+        return self._index
+
+    def _stale(self):
+        now = time.monotonic()
+        if now - self._built_at > self.ttl:
+            return True
+        if self.version is None or now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        try:
+            return self.version() != self._built_version
+        except Exception as e:
+            logger.error(f"Error reading index version: {str(e)}")
+            return False
+
+    def peek(self):
+        """Return the current index without building it (None if not built)."""
+        return self._index
+
+    def invalidate(self):
+        """Make the next get() start a rebuild."""
+        self._built_at = 0
+
+    def acknowledge(self, previous, current):
+        """
+        Record that the write moving the version from ``previous`` to
+        ``current`` was applied to this worker's index in place, so the
+        version check does not rebuild it.
+
+        Nothing changes when the index was built at another version: it is
+        missing some other write and still has to be rebuilt.
+        """
+        with self._lock:
+            if self._index is not None and self._built_version == previous:
+                self._built_version = current
+
+    def refresh(self):
+        """
+        Rebuild the index now, in the calling thread, and return it.
+
+        Requests keep being served from the previous index meanwhile and do
+        not start a rebuild of their own.
+        """
+        with self._lock:
+            self._rebuilding = True
+        try:
+            self._build()
+        finally:
+            self._rebuilding = False
+        return self._index
+
+    def _build(self):
+        # Read the version first, so a write during the build triggers another one
+        version = self.version() if self.version is not None else None
+        self._index = self.builder()
+        self._built_version = version
+        self._built_at = self._checked_at = time.monotonic()
+
+    def _rebuild(self):
+        try:
+            self._build()
+        except Exception as e:
+            logger.error(f"Error rebuilding index: {str(e)}")
+            # Retry after another full TTL rather than on every request
+            self._built_at = time.monotonic()
+        finally:
+            self._rebuilding = False
@@ -0,0 +1,262 @@
+"""
+Materialized company recommendations.
+
+The top RECOMMENDATION_TOP_K companies of every student with skills or
+interests are stored in the ``recommendations`` collection (one document
+per student, keyed by registration number), with their scores, matched
+skills and a summary of each company, so reading them is one _id lookup.
+Students with neither get a document with ``no_profile`` set and no
+companies, so they are not re-ranked on every read either.
+
+Entries are kept current incrementally: a profile change re-ranks that one
+student, and a company write queues a background re-score of that one
+company against every materialized student. The re-score rebuilds this
+worker's shared TF-IDF matrix once (app.utils.recommender.company_matrix),
+which then serves both the re-score and later rankings. Scores use the IDF
+weights of the matrix current at the time, so
+scripts/materialize_recommendations.py rebuilds everything periodically to
+let them converge.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from pymongo import ReplaceOne, UpdateOne
+
+from app import db
+from app.config import Config
+from app.utils.recommender import company_frequencies, company_matrix, dot, rank_companies, student_frequencies
+from app.utils.skills import company_skill_ids, skill_taxonomy, student_skill_ids
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATIONS_COLLECTION = 'recommendations'
+
+# Company fields copied into each entry, so reads need no second query
+SUMMARY_FIELDS = ('name', 'job_title', 'job_type', 'work_place', 'location', 'stipend',
+                  'industry', 'logo_url', 'deadline')
+COMPANY_PROJECTION = {field: 1 for field in SUMMARY_FIELDS + ('requirements', 'job_description', 'skill_ids')}
+STUDENT_PROJECTION = {'registration_no': 1, 'skill_ids': 1, 'skills': 1, 'experience.skills_used': 1, 'interests': 1}
+
+# Entries stay ordered like an in-memory ranking (see pagination.page_ranked)
+ENTRY_ORDER = {'score': -1, 'company_id': -1}
+
+BATCH_SIZE = 500
+
+def student_profile(student):
+    """Return the (canonical skill IDs, interests) lists of a student document."""
+    skill_ids = student.get('skill_ids')
+    if not isinstance(skill_ids, list):
+        # Stored before the skill taxonomy existed and not backfilled yet
+        skill_ids = student_skill_ids(student)
+    interests = student.get('interests')
+    return skill_ids, interests if isinstance(interests, list) else []
+
+def matched_skills(skill_ids, company):
+    """Canonical names of the student's skills that the company requires."""
+    required = company.get('skill_ids')
+    if not isinstance(required, list):
+        required = company_skill_ids(company)
+    taxonomy = skill_taxonomy.get()
+    return [taxonomy.name(skill_id) for skill_id in skill_ids if skill_id in required]
+
+def make_entry(company, score, skill_ids):
+    """Build the stored entry for one recommended company."""
+    entry = {'company_id': company['_id'], 'score': score, 'matched_skills': matched_skills(skill_ids, company)}
+    entry.update({field: company[field] for field in SUMMARY_FIELDS if field in company})
+    return entry
+
+def _ranked_entries(student, companies=None):
+    """
+    Rank the companies for one student.
+
+    Args:
+        student (dict): Student with skills and interests
+        companies (dict, optional): Active companies by _id; read from the
+            database when not given
+
+    Returns:
+        list: Entries of the top RECOMMENDATION_TOP_K companies, or None when
+        the student has neither skills nor interests
+    """
+    skill_ids, interests = student_profile(student)
+    if not skill_ids and not interests:
+        return None
+
+    ranked = rank_companies(skill_ids, interests)[:Config.RECOMMENDATION_TOP_K]
+    if companies is None:
+        companies = {company['_id']: company for company in db.companies.find(
+            {'_id': {'$in': [company_id for company_id, _ in ranked]}, 'active': True},
+            COMPANY_PROJECTION
+        )}
+    return [make_entry(companies[company_id], score, skill_ids)
+            for company_id, score in ranked if company_id in companies]
+
+def _document(entries, updated_at):
+    """Stored document body for ranked ``entries`` (None: no skills nor interests)."""
+    if entries is None:
+        return {'companies': [], 'no_profile': True, 'updated_at': updated_at}
+    return {'companies': entries, 'updated_at': updated_at}
+
+def refresh_student(registration_no):
+    """
+    Re-rank one student and store the result.
+
+    Returns:
+        dict: The stored document, ``no_profile`` when the student has
+        neither skills nor interests, or None if the student was not found
+        (any stored document is removed)
+    """
+    collection = db[RECOMMENDATIONS_COLLECTION]
+    student = db.students.find_one({'registration_no': registration_no}, STUDENT_PROJECTION)
+    if not student:
+        collection.delete_one({'_id': registration_no})
+        return None
+
+    document = dict(_document(_ranked_entries(student), datetime.utcnow()), _id=registration_no)
+    collection.replace_one({'_id': registration_no}, document, upsert=True)
+    return document
+
+def student_changed(registration_no):
+    """Refresh a student after a profile write; errors are logged, not raised."""
+    try:
+        refresh_student(registration_no)
+    except Exception as e:
+        logger.error(f"Error refreshing recommendations for student {registration_no}: {str(e)}")
+
+def get_recommendations(registration_no):
+    """
+    Return a student's materialized recommendations, computing them on first use.
+
+    Returns:
+        dict: The stored document, or None for students without skills and interests
+    """
+    document = db[RECOMMENDATIONS_COLLECTION].find_one({'_id': registration_no})
+    if document is None:
+        document = refresh_student(registration_no)
+    return None if document is None or document.get('no_profile') else document
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Return this worker's re-score thread, created on first use (after fork)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # One thread, so re-scores of the same company apply in write order
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rescore')
+        return _executor
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def rescore_company(company_id):
+    """
+    Re-score one company column across every materialized student.
+
+    The company is read again and this worker's company matrix is rebuilt,
+    once, so both the company and the IDF weights reflect the write; later
+    rankings reuse the same matrix. Its entry is
+    removed everywhere it appears, then pushed back, in score order and
+    capped at RECOMMENDATION_TOP_K, for every student it still matches.
+    Deleted and inactive companies are only removed. Materialized students
+    are streamed in batches.
+
+    Returns:
+        int: Number of students the company scored above zero for; it is
+        only kept where it ranks in their top RECOMMENDATION_TOP_K
+    """
+    collection = db[RECOMMENDATIONS_COLLECTION]
+    pull = {'$pull': {'companies': {'company_id': company_id}}}
+
+    company = db.companies.find_one({'_id': company_id}, dict(COMPANY_PROJECTION, active=1))
+    matrix = company_matrix.refresh()
+    vector = matrix.vector(company_frequencies(company)) if company and company.get('active', True) else {}
+    if not vector:
+        collection.update_many({'companies.company_id': company_id}, pull)
+        return 0
+
+    recommended = 0
+    documents = collection.find({'no_profile': {'$ne': True}}, {'companies.company_id': 1}).batch_size(BATCH_SIZE)
+    for chunk in _chunks(documents, BATCH_SIZE):
+        listed = {document['_id'] for document in chunk
+                  if any(entry.get('company_id') == company_id for entry in document.get('companies', []))}
+        operations = []
+        students = db.students.find({'registration_no': {'$in': [document['_id'] for document in chunk]}},
+                                    STUDENT_PROJECTION)
+        for student in students:
+            skill_ids, interests = student_profile(student)
+            score = round(dot(vector, matrix.vector(student_frequencies(skill_ids, interests))), 4)
+            key = {'_id': student['registration_no']}
+            if key['_id'] in listed:
+                operations.append(UpdateOne(key, pull))
+            if score > 0:
+                recommended += 1
+                operations.append(UpdateOne(key, {'$push': {'companies': {
+                    '$each': [make_entry(company, score, skill_ids)],
+                    '$sort': ENTRY_ORDER,
+                    '$slice': Config.RECOMMENDATION_TOP_K
+                }}}))
+        if operations:
+            collection.bulk_write(operations, ordered=True)
+    return recommended
+
+def _rescore_logged(company_id):
+    try:
+        rescore_company(company_id)
+    except Exception as e:
+        logger.error(f"Error re-scoring recommendations for company {company_id}: {str(e)}")
+        # The write was acknowledged on the matrix; let requests rebuild it instead
+        company_matrix.invalidate()
+
+def company_changed(company, previous=None):
+    """
+    Queue a background re-score of a written company (see rescore_company()).
+
+    The re-score also rebuilds this worker's company matrix, so the hook
+    acknowledges the write on it (see app.utils.company_hooks).
+    """
+    get_executor().submit(_rescore_logged, company['_id'])
+
+def materialize_all():
+    """
+    Rebuild the recommendations of every student.
+
+    Returns:
+        dict: Number of students stored with recommendations, of students
+        stored without skills and interests, and of stale documents removed
+    """
+    collection = db[RECOMMENDATIONS_COLLECTION]
+    companies = {company['_id']: company for company in db.companies.find({'active': True}, COMPANY_PROJECTION)}
+    now = datetime.utcnow()
+
+    stored = 0
+    without_profile = 0
+    operations = []
+    for student in db.students.find({}, STUDENT_PROJECTION):
+        registration_no = student.get('registration_no')
+        if not registration_no:
+            continue
+        entries = _ranked_entries(student, companies)
+        if entries is None:
+            without_profile += 1
+        else:
+            stored += 1
+        operations.append(ReplaceOne({'_id': registration_no}, _document(entries, now), upsert=True))
+        if len(operations) >= BATCH_SIZE:
+            collection.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+    # Students deleted since the last run
+    removed = collection.delete_many({'updated_at': {'$lt': now}}).deleted_count
+    return {'stored': stored, 'without_profile': without_profile, 'removed': removed}
@@ -0,0 +1,182 @@
+"""
+TF-IDF recommendation engine.
+
+Active companies are embedded as sparse TF-IDF vectors over one shared
+vocabulary built from their requirement skills, job titles and
+descriptions; a student is embedded over the same vocabulary from their
+skills and interests. Skills enter the vocabulary as canonical skill IDs
+(see app.utils.skills), so "NodeJS" and "Node.js" are the same term. The company matrix is stored column-wise (term -> postings),
+so ranking every company for a student is a single sparse matrix-vector
+product that only touches the postings of the student's terms.
+"""
+import math
+from array import array
+from collections import Counter
+
+from app import db
+from app.config import Config
+from app.utils.prefix_index import LazyIndex
+from app.utils.search_cache import get_generations
+from app.utils.skills import company_skill_ids, normalize
+from app.utils.trigram_index import tokenize
+
+# Term frequency multiplier per company field; skills weigh most
+COMPANY_FIELDS = {'requirements': 2.0, 'job_title': 1.5, 'job_description': 1.0}
+COMPANY_PROJECTION = {field: 1 for field in (*COMPANY_FIELDS, 'skill_ids')}
+
+# Term frequency multiplier per student field
+SKILL_WEIGHT = 2.0
+INTEREST_WEIGHT = 1.0
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of',
+    'on', 'or', 'our', 'the', 'this', 'to', 'we', 'will', 'with', 'you', 'your'
+))
+
+def terms(text):
+    """Tokenize ``text`` for the recommendation vocabulary."""
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+def _texts(value):
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if isinstance(item, str)]
+    return []
+
+def company_frequencies(company):
+    """Weighted term frequencies of a company document; requirements count as skill IDs."""
+    frequencies = Counter()
+    for field, weight in COMPANY_FIELDS.items():
+        if field == 'requirements':
+            skill_ids = company.get('skill_ids')
+            for skill_id in skill_ids if isinstance(skill_ids, list) else company_skill_ids(company):
+                frequencies[skill_id] += weight
+            continue
+        for text in _texts(company.get(field)):
+            for term in terms(text):
+                frequencies[term] += weight
+    return frequencies
+
+def student_frequencies(skill_ids, interests):
+    """
+    Weighted term frequencies of a student's skill IDs and interests.
+
+    An interest contributes its words and its normalized form, so an
+    interest named like a skill ("Machine Learning") matches that skill.
+    """
+    frequencies = Counter()
+    for skill_id in _texts(skill_ids):
+        frequencies[skill_id] += SKILL_WEIGHT
+    for text in _texts(interests):
+        for term in set(terms(text)) | {normalize(text)} - {''}:
+            frequencies[term] += INTEREST_WEIGHT
+    return frequencies
+
+def dot(vector, other):
+    """Dot product of two sparse vectors; their cosine similarity when both are normalized."""
+    if len(other) < len(vector):
+        vector, other = other, vector
+    return sum(weight * other.get(term, 0.0) for term, weight in vector.items())
+
+def _tf(frequency):
+    # Sublinear, so a term repeated throughout a description does not dominate
+    return 1 + math.log(frequency) if frequency > 1 else frequency
+
+class TfidfMatrix:
+    """
+    L2-normalized TF-IDF rows stored as per-term postings.
+
+    ``postings[term]`` holds two parallel arrays, the row numbers of the
+    documents containing ``term`` and their weights, i.e. one sparse column
+    of the document-term matrix. Rows are ordered by ``_id`` descending, so
+    ties in score can be broken on row numbers instead of ObjectIds. The
+    matrix is immutable once built.
+    """
+
+    def __init__(self, documents):
+        """
+        Args:
+            documents (list): (_id, term frequencies) pairs
+        """
+        document_frequency = Counter()
+        for _, frequencies in documents:
+            document_frequency.update(frequencies.keys())
+        count = len(documents)
+        self.idf = {term: math.log((1 + count) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        self.ids = []
+        self.postings = {}
+        documents = sorted(documents, key=lambda document: document[0], reverse=True)
+        for row, (doc_id, frequencies) in enumerate(documents):
+            self.ids.append(doc_id)
+            for term, weight in self._normalized(frequencies).items():
+                rows, weights = self.postings.setdefault(term, (array('I'), array('d')))
+                rows.append(row)
+                weights.append(weight)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _normalized(self, frequencies):
+        weights = {term: _tf(frequency) * self.idf[term]
+                   for term, frequency in frequencies.items() if term in self.idf}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        if not norm:
+            return {}
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def vector(self, frequencies):
+        """Embed term frequencies as a normalized query vector; unknown terms are dropped."""
+        return self._normalized(frequencies)
+
+    def scores(self, vector):
+        """
+        Cosine similarity of ``vector`` with every row.
+
+        Returns:
+            list: Score per row, 0 for rows sharing no term with ``vector``
+        """
+        scores = [0.0] * len(self.ids)
+        for term, query_weight in vector.items():
+            rows, weights = self.postings[term]
+            for row, weight in zip(rows, weights):
+                scores[row] += query_weight * weight
+        return scores
+
+    def rank(self, vector):
+        """
+        Rank every matching row for ``vector``.
+
+        Returns:
+            list: (_id, score) pairs, by score then _id descending; scores are
+            rounded so they survive a round trip through a cursor
+        """
+        rounded = {row: round(score, 4) for row, score in enumerate(self.scores(vector)) if score}
+        # Rows are inserted in order and sorted() is stable, so ties stay in _id order
+        rows = sorted(rounded, key=rounded.__getitem__, reverse=True)
+        return [(self.ids[row], rounded[row]) for row in rows]
+
+def build_company_matrix():
+    """Build the TF-IDF matrix of active companies from the database."""
+    documents = [(company['_id'], company_frequencies(company))
+                 for company in db.companies.find({'active': True}, COMPANY_PROJECTION)]
+    return TfidfMatrix(documents)
+
+company_matrix = LazyIndex(build_company_matrix, ttl=Config.RECOMMENDER_INDEX_TTL,
+                           version=lambda: get_generations('companies')['companies'])
+
+def rank_companies(skills, interests):
+    """
+    Rank every active company for a student.
+
+    Args:
+        skills (list): The student's canonical skill IDs
+        interests (list): The student's interests
+
+    Returns:
+        list: (company _id, score) pairs, best first; companies sharing no
+        term with the student are left out
+    """
+    matrix = company_matrix.get()
+    return matrix.rank(matrix.vector(student_frequencies(skills, interests)))
@@ -0,0 +1,417 @@
+"""
+Relevance-ranked full-text search.
+
+Queries run against the weighted text indexes declared in
+app.models.indexes. Results are ordered by MongoDB's textScore with ``_id``
+as the tiebreaker, and cursor mode keysets on (score, _id) so a page is
+read with the same pagination parameters as any other list endpoint.
+
+search_targets() fans one query out to several collections on a bounded,
+per-process thread pool and merges the results by score.
+
+Fuzzy mode matches companies through a per-worker TrigramIndex instead, so
+misspelled terms still match; candidates are then read with one $in query.
+
+User input is never passed through as an operator: search terms are
+compiled into a bounded list of literal tokens, raw regular expressions
+are an admin-only, length-limited mode, and every query runs under a
+SEARCH_MAX_TIME_MS budget.
+"""
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app import db
+from app.config import Config
+from app.utils.pagination import (
+    decode_cursor,
+    encode_cursor,
+    estimated_count,
+    get_pagination_args,
+    keyset_filter,
+    page_ranked,
+    paginate,
+    sort_spec
+)
+from app.utils.facets import facet_counts
+from app.utils.prefix_index import LazyIndex
+from app.utils.search_cache import get_generations
+from app.utils.suggestions import requirement_skills
+from app.utils.trigram_index import TrigramIndex
+
+# Name of the relevance field added to every result
+SCORE_FIELD = 'score'
+
+# Fields matched by the admin-only regex mode, per collection
+REGEX_FIELDS = {
+    'companies': ['name', 'job_title', 'job_description', 'requirements', 'location'],
+    'announcements': ['title', 'content'],
+    'students': ['registration_no', 'name', 'email_id', 'specialization']
+}
+
+# Anything but whitespace, quotes and backslashes, which $text treats as syntax
+TERM_PATTERN = re.compile(r'[^\s"\\]+')
+
+class InvalidSearch(ValueError):
+    """Raised when a search query is empty, too long or malformed."""
+
+def literal_terms(terms):
+    """
+    Compile user input into literal search tokens.
+
+    Phrase quotes, escapes and leading ``-`` (negation in $text) are dropped,
+    duplicates removed, and the number and length of tokens bounded.
+
+    Returns:
+        list: At most SEARCH_MAX_TERMS tokens
+
+    Raises:
+        InvalidSearch: If the input is too long or holds no token
+    """
+    if len(terms) > Config.SEARCH_MAX_QUERY_LENGTH:
+        raise InvalidSearch(f"Search query must be at most {Config.SEARCH_MAX_QUERY_LENGTH} characters")
+    tokens = []
+    for token in TERM_PATTERN.findall(terms):
+        token = token.lstrip('-')[:Config.SEARCH_MAX_TERM_LENGTH]
+        if token and token not in tokens:
+            tokens.append(token)
+    if not tokens:
+        raise InvalidSearch('Search query is required')
+    return tokens[:Config.SEARCH_MAX_TERMS]
+
+def company_fuzzy_texts(company):
+    """Texts of a company matched in fuzzy mode: name, job title and requirement skills."""
+    texts = [company.get('name'), company.get('job_title')]
+    texts += requirement_skills(company.get('requirements'))
+    return [text for text in texts if isinstance(text, str)]
+
+def build_company_fuzzy_index():
+    """Build a TrigramIndex over the active companies."""
+    index = TrigramIndex(threshold=Config.FUZZY_THRESHOLD)
+    projection = {'name': 1, 'job_title': 1, 'requirements': 1}
+    for company in db.companies.find({'active': True}, projection):
+        index.add(company['_id'], company_fuzzy_texts(company))
+    return index
+
+company_fuzzy_index = LazyIndex(build_company_fuzzy_index, ttl=Config.FUZZY_INDEX_TTL,
+                                version=lambda: get_generations('companies')['companies'])
+
+def update_company_fuzzy(company, previous=None):
+    """Apply a company write to this worker's fuzzy index, if it was built."""
+    index = company_fuzzy_index.peek()
+    if index is None:
+        return
+    if company.get('active', True):
+        index.add(company['_id'], company_fuzzy_texts(company))
+    else:
+        index.remove(company['_id'])
+
+class SearchTarget:
+    """A collection covered by the global search."""
+
+    def __init__(self, name, label, filters=None, projection=None, roles=None, fuzzy_index=None):
+        self.name = name              # collection name, also the response key
+        self.label = label            # ``type`` of each result
+        self.filters = filters or {}
+        self.projection = projection
+        self.roles = roles            # None means every role
+        self.fuzzy_index = fuzzy_index  # LazyIndex used in fuzzy mode, if any
+
+    def allows(self, role):
+        """Whether a user with ``role`` may see results from this target."""
+        return self.roles is None or role in self.roles
+
+# Collections searched by the global search; each needs a text index.
+# Adding one here adds a concurrent query, not a sequential one.
+GLOBAL_SEARCH_TARGETS = [
+    SearchTarget('companies', 'company', filters={'active': True}, fuzzy_index=company_fuzzy_index),
+    SearchTarget('announcements', 'announcement'),
+    SearchTarget('students', 'student', projection={'password': 0}, roles=('admin',))
+]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Return this worker's search thread pool, created on first use (after fork)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.SEARCH_MAX_WORKERS,
+                                           thread_name_prefix='search')
+        return _executor
+
+def text_query(terms, filters=None):
+    """
+    Build a $text filter for ``terms``, combined with equality ``filters``.
+
+    Tokens containing an ``@`` (e-mail addresses) are searched as a phrase,
+    since the text tokenizer would otherwise match every address on the
+    same domain.
+
+    Raises:
+        InvalidSearch: If ``terms`` holds no usable token
+    """
+    tokens = [f'"{token}"' if '@' in token else token for token in literal_terms(terms)]
+    query = {'$text': {'$search': ' '.join(tokens)}}
+    if filters:
+        query.update(filters)
+    return query
+
+def _ranked_stages(keyset=None, skip=0, limit=None, projection=None):
+    """Stages that order scored documents by relevance and cut out one page."""
+    stages = []
+    if keyset:
+        stages.append({'$match': keyset})
+    stages.append({'$sort': dict(sort_spec(SCORE_FIELD, -1))})
+    if skip:
+        stages.append({'$skip': skip})
+    if limit:
+        stages.append({'$limit': limit})
+    if projection:
+        stages.append({'$project': projection})
+    return stages
+
+def _run_ranked(collection, query, page_stages, include_total, facets=None):
+    """
+    Run a $text query and cut one ranked page out of it.
+
+    Returns:
+        tuple: (documents, total, facet results) where total is None with
+        include_total=none and facet results None unless ``facets`` were given
+    """
+    # $text has to be the first stage; the score only exists after it
+    pipeline = [
+        {'$match': query},
+        {'$addFields': {SCORE_FIELD: {'$meta': 'textScore'}}}
+    ]
+
+    # The page runs outside $facet, so $sort and $limit combine into a top-k
+    # sort that only keeps one page in memory
+    documents = list(collection.aggregate(pipeline + page_stages, allowDiskUse=True,
+                                          maxTimeMS=Config.SEARCH_MAX_TIME_MS))
+
+    total = None
+    facet_results = None
+    if include_total == 'exact' or facets:
+        # Count and facets need no score and no sort
+        branches = dict(facets or {})
+        if include_total == 'exact':
+            branches['total'] = [{'$count': 'count'}]
+        result = next(collection.aggregate([{'$match': query}, {'$facet': branches}], allowDiskUse=True,
+                                           maxTimeMS=Config.SEARCH_MAX_TIME_MS), {})
+        if include_total == 'exact':
+            total = result['total'][0]['count'] if result.get('total') else 0
+        if facets:
+            facet_results = {name: result.get(name, []) for name in facets}
+    if include_total == 'estimated':
+        total = estimated_count(collection, query, Config.SEARCH_MAX_TIME_MS)
+    return documents, total, facet_results
+
+def search(collection, terms, filters=None, projection=None, default_per_page=10, facets=None):
+    """
+    Fetch one relevance-ranked page of documents matching ``terms``.
+
+    Args:
+        collection: The pymongo collection; it must have a text index
+        terms (str): The search terms
+        filters (dict, optional): Extra equality filters, e.g. job_type
+        projection (dict, optional): Exclusion projection applied to results
+        default_per_page (int): Page size when ``per_page`` is not given
+        facets (dict, optional): Extra $facet branches computed over all matches
+
+    Returns:
+        tuple: (documents, pagination) like app.utils.pagination.paginate();
+        each document carries its relevance in ``score``
+
+    Raises:
+        PaginationError: If the request carries invalid pagination parameters
+        InvalidSearch: If ``terms`` holds no usable token
+        pymongo.errors.ExecutionTimeout: If the query exceeds SEARCH_MAX_TIME_MS
+    """
+    page, per_page, cursor, include_total = get_pagination_args(default_per_page)
+    query = text_query(terms, filters)
+
+    keyset = None
+    if cursor:
+        value, last_id = decode_cursor(cursor, SCORE_FIELD, -1)
+        keyset = keyset_filter(SCORE_FIELD, -1, value, last_id)
+    skip = 0 if cursor else (page - 1) * per_page
+
+    page_stages = _ranked_stages(keyset, skip, per_page + 1, projection)
+    documents, total, facet_results = _run_ranked(collection, query, page_stages, include_total, facets)
+
+    has_more = len(documents) > per_page
+    documents = documents[:per_page]
+
+    next_cursor = None
+    if has_more:
+        last = documents[-1]
+        next_cursor = encode_cursor(SCORE_FIELD, -1, last[SCORE_FIELD], last['_id'])
+
+    pagination = {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'has_more': has_more,
+        'next_cursor': next_cursor
+    }
+    if facet_results is not None:
+        pagination['facets'] = facet_results
+    return documents, pagination
+
+def fuzzy_matches(collection, fuzzy_index, terms, filters=None, projection=None):
+    """
+    Rank documents of ``collection`` against ``terms`` with a trigram index.
+
+    At most FUZZY_MAX_CANDIDATES candidates are read, with a single $in
+    query that also applies ``filters``.
+
+    Returns:
+        list: Documents ordered by score, then ``_id``, both descending
+    """
+    ranked = fuzzy_index.get().search(' '.join(literal_terms(terms)), limit=Config.FUZZY_MAX_CANDIDATES)
+    if not ranked:
+        return []
+    scores = dict(ranked)
+
+    query = {'_id': {'$in': list(scores)}}
+    if filters:
+        query.update(filters)
+    documents = list(collection.find(query, projection, max_time_ms=Config.SEARCH_MAX_TIME_MS))
+    for document in documents:
+        document[SCORE_FIELD] = round(scores[document['_id']], 4)
+
+    # Same order as the (score, _id) keyset: two stable sorts
+    documents.sort(key=lambda doc: doc['_id'], reverse=True)
+    documents.sort(key=lambda doc: doc[SCORE_FIELD], reverse=True)
+    return documents
+
+def fuzzy_search(collection, fuzzy_index, terms, filters=None, projection=None, default_per_page=10,
+                 facets=None):
+    """
+    Typo-tolerant variant of search() with the same pagination contract.
+
+    The candidate set is small and fully ranked in memory, so the total is
+    always exact (None with include_total=none). Facets are computed by one
+    aggregation over the matched ids.
+    """
+    page, per_page, cursor, include_total = get_pagination_args(default_per_page)
+    documents = fuzzy_matches(collection, fuzzy_index, terms, filters, projection)
+    total = None if include_total == 'none' else len(documents)
+    matched_ids = [doc['_id'] for doc in documents]
+
+    by_id = {doc['_id']: doc for doc in documents}
+    ranked, has_more, next_cursor = page_ranked([(doc['_id'], doc[SCORE_FIELD]) for doc in documents],
+                                                page, per_page, cursor, SCORE_FIELD)
+    documents = [by_id[doc_id] for doc_id, _ in ranked]
+
+    pagination = {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'has_more': has_more,
+        'next_cursor': next_cursor
+    }
+    if facets:
+        pagination['facets'] = facet_counts(collection, {'_id': {'$in': matched_ids}}, facets,
+                                            max_time_ms=Config.SEARCH_MAX_TIME_MS)
+    return documents, pagination
+
+def regex_search(collection, pattern, filters=None, projection=None, default_per_page=10, facets=None):
+    """
+    Admin-only search with a raw, case-insensitive regular expression.
+
+    The pattern is limited to SEARCH_REGEX_MAX_LENGTH characters and the
+    queries to SEARCH_MAX_TIME_MS, so a pathological pattern fails fast
+    instead of occupying mongod. Results come in ``_id`` order, unscored.
+
+    Raises:
+        InvalidSearch: If the pattern is too long or does not compile
+        pymongo.errors.ExecutionTimeout: If a query exceeds the time budget
+    """
+    if len(pattern) > Config.SEARCH_REGEX_MAX_LENGTH:
+        raise InvalidSearch(f"Regex must be at most {Config.SEARCH_REGEX_MAX_LENGTH} characters")
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise InvalidSearch(f"Invalid regex: {str(e)}")
+
+    query = {'$or': [{field: {'$regex': pattern, '$options': 'i'}} for field in REGEX_FIELDS[collection.name]]}
+    if filters:
+        query.update(filters)
+    return paginate(collection, query, projection=projection, default_per_page=default_per_page,
+                    facets=facets, max_time_ms=Config.SEARCH_MAX_TIME_MS)
+
+def _search_target(target, terms, limit, include_total, fuzzy=False):
+    """Top ``limit`` matches and the match count of one target. Runs on the pool."""
+    if fuzzy and target.fuzzy_index is not None:
+        documents = fuzzy_matches(db[target.name], target.fuzzy_index, terms,
+                                  target.filters, target.projection)
+        return documents[:limit], (None if include_total == 'none' else len(documents))
+
+    query = text_query(terms, target.filters)
+    page_stages = _ranked_stages(limit=limit, projection=target.projection)
+    documents, total, _ = _run_ranked(db[target.name], query, page_stages, include_total)
+    return documents, total
+
+def search_targets(terms, targets, page=1, per_page=10, include_total='exact', fuzzy=False):
+    """
+    Search several collections concurrently and merge the results by score.
+
+    Every target returns its best ``page * per_page + 1`` matches, which is
+    enough to cut the requested page out of the merged ranking. Scores come
+    from differently weighted indexes, so they rank results across types only
+    approximately. In fuzzy mode, targets with a fuzzy index score by trigram
+    similarity (0 to 1) and the others keep their text search. Runs outside
+    the request context: callers resolve request arguments and permissions
+    before calling.
+
+    Args:
+        terms (str): The search terms
+        targets (list): SearchTarget instances to query
+        page (int): Page number of the merged ranking
+        per_page (int): Results per page
+        include_total (str): exact, estimated or none
+        fuzzy (bool): Use the targets' trigram indexes where available
+
+    Returns:
+        tuple: (documents, pagination) where every document carries its
+        ``type`` and pagination holds page, per_page, total, counts (per
+        target) and has_more
+
+    Raises:
+        InvalidSearch: If ``terms`` holds no usable token
+        pymongo.errors.ExecutionTimeout: If a target's query exceeds SEARCH_MAX_TIME_MS
+    """
+    # Reject unusable input before fanning out
+    literal_terms(terms)
+    limit = page * per_page + 1
+    executor = get_executor()
+    futures = [
+        (target, executor.submit(_search_target, target, terms, limit, include_total, fuzzy))
+        for target in targets
+    ]
+
+    merged = []
+    counts = {}
+    for target, future in futures:
+        documents, counts[target.name] = future.result()
+        for document in documents:
+            document['type'] = target.label
+        merged.extend(documents)
+
+    merged.sort(key=lambda doc: (-doc[SCORE_FIELD], doc['type'], str(doc['_id'])))
+    skip = (page - 1) * per_page
+
+    total = None
+    if include_total != 'none':
+        total = sum(counts.values())
+
+    return merged[skip:skip + per_page], {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'counts': counts,
+        'has_more': len(merged) > skip + per_page
+    }
@@ -0,0 +1,112 @@
+"""
+Response cache for search endpoints.
+
+Cached responses are keyed on the endpoint, the normalized query string
+and the current generation of every collection the endpoint reads. The
+generations live in MongoDB (``cache_generations``) and are bumped by the
+admin write routes, so a write makes every worker's cached results for
+that collection unreachable; they are then evicted by LRU or TTL.
+
+Each worker keeps the generations it read for GENERATION_CACHE_TTL seconds,
+so a cache hit usually costs no database round trip. In exchange, other
+workers can serve results cached before a write for that long; the worker
+that made the write sees its new generation at once.
+"""
+from functools import wraps
+
+from flask import Response, request
+from flask_jwt_extended import get_jwt_identity
+from pymongo import ReturnDocument
+
+from app import db
+from app.auth.utils import get_user_role
+from app.config import Config
+from app.utils.cache import TTLCache
+
+GENERATIONS_COLLECTION = 'cache_generations'
+
+search_cache = TTLCache(
+    max_size=Config.SEARCH_CACHE_SIZE,
+    ttl=Config.SEARCH_CACHE_TTL,
+    max_bytes=Config.SEARCH_CACHE_MAX_BYTES,
+    sizeof=lambda entry: len(entry[0])
+)
+
+# collection -> generation, as last read or bumped by this worker
+generation_cache = TTLCache(max_size=64, ttl=Config.GENERATION_CACHE_TTL)
+
+def get_generations(*names):
+    """Return the current generation of each collection in ``names`` (0 if never bumped)."""
+    generations = {name: generation_cache.get(name) for name in names}
+    missing = [name for name, generation in generations.items() if generation is None]
+    if missing:
+        for name in missing:
+            generations[name] = 0
+        for doc in db[GENERATIONS_COLLECTION].find({'_id': {'$in': missing}}):
+            generations[doc['_id']] = doc.get('generation', 0)
+        for name in missing:
+            generation_cache.set(name, generations[name])
+    return generations
+
+def bump_generation(name):
+    """
+    Invalidate cached results that read collection ``name``.
+
+    Returns:
+        int: The new generation
+    """
+    doc = db[GENERATIONS_COLLECTION].find_one_and_update(
+        {'_id': name},
+        {'$inc': {'generation': 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    generation_cache.set(name, doc['generation'])
+    return doc['generation']
+
+def normalize_query(query):
+    """Lowercase and collapse whitespace; search is case-insensitive."""
+    return ' '.join(query.lower().split())
+
+def _cache_key(collections, per_role):
+    args = sorted((key, normalize_query(value) if key == 'q' else value)
+                  for key, value in request.args.items(multi=True))
+    generations = get_generations(*collections)
+    key = (request.endpoint, tuple(args), tuple(sorted(generations.items())))
+    if per_role:
+        key += (get_user_role(get_jwt_identity()),)
+    return key
+
+def cached_search(*collections, per_role=False):
+    """
+    Cache a search view's successful responses.
+
+    Args:
+        *collections: Collections the view reads; their generations are
+            part of the cache key
+        per_role (bool): Whether the response depends on the caller's role
+
+    The decorated view must return (response, status). Only 200 responses
+    are cached, as their serialized body, so a hit costs no serialization.
+    Admin-only regex searches are never cached.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.args.get('regex', 'false').lower() == 'true':
+                return fn(*args, **kwargs)
+            key = _cache_key(collections, per_role)
+            cached = search_cache.get(key)
+            if cached is not None:
+                body, mimetype = cached
+                response = Response(body, status=200, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response, status = fn(*args, **kwargs)
+            if status == 200:
+                search_cache.set(key, (response.get_data(), response.mimetype))
+            response.headers['X-Cache'] = 'MISS'
+            return response, status
+        return wrapper
+    return decorator
@@ -0,0 +1,54 @@
+"""
+Similar-company lookups.
+
+Active companies are indexed by the token set of their requirement skills
+and job title in a per-worker MinHashLSH, so finding the postings closest
+to a company compares it with a few bucket-mates rather than scanning every
+company. Company writes update the index of the worker that handled them;
+other workers rebuild theirs when the companies generation changes.
+"""
+from app import db
+from app.config import Config
+from app.utils.minhash_index import MinHashLSH
+from app.utils.prefix_index import LazyIndex
+from app.utils.recommender import terms
+from app.utils.search_cache import get_generations
+from app.utils.suggestions import requirement_skills
+
+COMPANY_PROJECTION = {'job_title': 1, 'requirements': 1}
+
+def company_tokens(company):
+    """Token set of a company's requirement skills and job title."""
+    texts = requirement_skills(company.get('requirements'))
+    if isinstance(company.get('job_title'), str):
+        texts.append(company['job_title'])
+    return {token for text in texts for token in terms(text)}
+
+def build_similarity_index():
+    """Build a MinHashLSH over the active companies."""
+    index = MinHashLSH(num_perm=Config.SIMILARITY_NUM_PERM, bands=Config.SIMILARITY_BANDS)
+    for company in db.companies.find({'active': True}, COMPANY_PROJECTION):
+        index.add(company['_id'], company_tokens(company))
+    return index
+
+company_similarity_index = LazyIndex(build_similarity_index, ttl=Config.SIMILARITY_INDEX_TTL,
+                                     version=lambda: get_generations('companies')['companies'])
+
+def update_company_similarity(company, previous=None):
+    """Apply a company write to this worker's similarity index, if it was built."""
+    index = company_similarity_index.peek()
+    if index is None:
+        return
+    if company.get('active', True):
+        index.add(company['_id'], company_tokens(company))
+    else:
+        index.remove(company['_id'])
+
+def nearest_companies(company, limit=5):
+    """
+    Find the active companies most similar to ``company``.
+
+    Returns:
+        list: (company _id, Jaccard similarity) pairs, most similar first
+    """
+    return company_similarity_index.get().query(company_tokens(company), limit, exclude=company['_id'])
@@ -0,0 +1,286 @@
+"""
+Skill taxonomy with canonical IDs.
+
+Every skill has a canonical ID, the normalized form of its canonical name
+(lowercase, letters, digits, ``+`` and ``#`` only: "Node.js" -> "nodejs"),
+and a set of normalized aliases ("node", "nodejs"). The ``skills``
+collection holds the taxonomy; SEED_SKILLS is its initial content.
+
+Skill writes store the canonical IDs next to the free text, in
+``students.skill_ids`` (technical skills and skills used in experience) and
+``companies.skill_ids`` (requirement skills). Both arrays are covered by
+multikey indexes, so matching a skill is an exact lookup with ``$in`` or
+``$all`` instead of a case-insensitive regex scan. Skills missing from the
+taxonomy keep their normalized form as ID, so they still match themselves.
+"""
+import logging
+import re
+
+from flask import request
+from pymongo import UpdateOne
+
+from app import db
+from app.config import Config
+from app.utils.prefix_index import LazyIndex
+from app.utils.search_cache import bump_generation, get_generations
+from app.utils.suggestions import requirement_skills
+
+logger = logging.getLogger(__name__)
+
+SKILLS_COLLECTION = 'skills'
+
+BATCH_SIZE = 1000
+
+# Values of the skills_match query parameter
+SKILL_MATCH_MODES = ('all', 'any')
+
+# Characters kept by normalize(); "C", "C++" and "C#" stay distinct
+_STRIP = re.compile(r'[^a-z0-9+#]')
+
+# (canonical name, aliases) of the initial taxonomy
+SEED_SKILLS = [
+    ('Python', ['py', 'python3']),
+    ('JavaScript', ['js', 'ecmascript']),
+    ('TypeScript', ['ts']),
+    ('React', ['reactjs', 'react.js']),
+    ('Node.js', ['node', 'nodejs']),
+    ('MongoDB', ['mongo']),
+    ('SQL', []),
+    ('MySQL', []),
+    ('PostgreSQL', ['postgres']),
+    ('HTML', ['html5']),
+    ('CSS', ['css3']),
+    ('Java', []),
+    ('Spring Boot', ['spring']),
+    ('C++', ['cpp']),
+    ('C#', ['csharp', 'c sharp']),
+    ('Flutter', []),
+    ('Dart', []),
+    ('Docker', []),
+    ('Kubernetes', ['k8s']),
+    ('AWS', ['amazon web services']),
+    ('Azure', ['microsoft azure']),
+    ('GCP', ['google cloud', 'google cloud platform']),
+    ('Git', []),
+    ('CI/CD', ['continuous integration']),
+    ('Jenkins', []),
+    ('DevOps', []),
+    ('Agile', []),
+    ('Data Structures', ['dsa', 'data structures and algorithms']),
+    ('Algorithms', []),
+    ('Machine Learning', ['ml']),
+    ('Data Analysis', ['data analytics']),
+    ('TensorFlow', []),
+    ('PyTorch', ['torch']),
+    ('NLP', ['natural language processing']),
+    ('Computer Vision', []),
+    ('Blockchain', []),
+    ('IoT', ['internet of things']),
+    ('UI/UX Design', ['ui/ux', 'ux design', 'ui design']),
+    ('Figma', []),
+    ('Adobe XD', ['xd'])
+]
+
+def normalize(text):
+    """Normalized lookup key of a skill name; empty for anything but text."""
+    return _STRIP.sub('', text.lower()) if isinstance(text, str) else ''
+
+def seed_documents():
+    """SEED_SKILLS as taxonomy documents."""
+    return [{'_id': normalize(name), 'name': name, 'aliases': sorted({normalize(alias) for alias in aliases})}
+            for name, aliases in SEED_SKILLS]
+
+class InvalidSkillFilter(ValueError):
+    """Raised when the skill filter query parameters are malformed."""
+
+class Taxonomy:
+    """Alias -> canonical ID and canonical ID -> name lookups over taxonomy documents."""
+
+    def __init__(self, documents):
+        self.names = {}
+        self.aliases = {}
+        for document in documents:
+            self.names[document['_id']] = document['name']
+            self.aliases[document['_id']] = document['_id']
+            for alias in document.get('aliases', []):
+                self.aliases[alias] = document['_id']
+
+    def canonical_id(self, text):
+        """Canonical ID of a skill name, or None for an empty name."""
+        key = normalize(text)
+        return self.aliases.get(key, key) or None
+
+    def name(self, skill_id):
+        """Display name of a canonical ID."""
+        return self.names.get(skill_id, skill_id)
+
+    def ids(self, values):
+        """Distinct canonical IDs of skill names, in order."""
+        ids = []
+        for value in values:
+            skill_id = self.canonical_id(value)
+            if skill_id and skill_id not in ids:
+                ids.append(skill_id)
+        return ids
+
+    def canonical_names(self, values):
+        """
+        Distinct skill names with known skills renamed to their canonical name.
+
+        Unknown skills keep the text they were entered with, trimmed.
+        """
+        names = []
+        seen = set()
+        for value in values:
+            skill_id = self.canonical_id(value)
+            if skill_id and skill_id not in seen:
+                seen.add(skill_id)
+                names.append(self.names.get(skill_id, value.strip()))
+        return names
+
+def default_taxonomy():
+    """The seed taxonomy, for code that runs without a database."""
+    return Taxonomy(seed_documents())
+
+def build_taxonomy():
+    """Load the taxonomy from the database, on top of the seed skills."""
+    return Taxonomy(seed_documents() + list(db[SKILLS_COLLECTION].find()))
+
+skill_taxonomy = LazyIndex(build_taxonomy, ttl=Config.SKILL_TAXONOMY_TTL,
+                           version=lambda: get_generations(SKILLS_COLLECTION)[SKILLS_COLLECTION])
+
+def _strings(value):
+    if isinstance(value, str):
+        return [value]
+    return [item for item in value if isinstance(item, str)] if isinstance(value, list) else []
+
+def student_skills(student):
+    """
+    Free-text skills of a student: technical skills and skills used in experience.
+
+    ``skills`` is either a dict with a ``technical`` list or, for older
+    documents, a flat list.
+    """
+    skills = student.get('skills')
+    texts = _strings(skills.get('technical') if isinstance(skills, dict) else skills)
+    for experience in student.get('experience') or []:
+        if isinstance(experience, dict):
+            texts += _strings(experience.get('skills_used'))
+    return texts
+
+def student_skill_ids(student, taxonomy=None):
+    """Canonical IDs of a student's skills, as stored in ``skill_ids``."""
+    return (taxonomy or skill_taxonomy.get()).ids(student_skills(student))
+
+def company_skill_ids(company, taxonomy=None):
+    """Canonical IDs of a company's requirement skills, as stored in ``skill_ids``."""
+    return (taxonomy or skill_taxonomy.get()).ids(requirement_skills(company.get('requirements')))
+
+def canonical_names(values):
+    """Normalize skill names submitted by a client (see Taxonomy.canonical_names())."""
+    return skill_taxonomy.get().canonical_names(_strings(values))
+
+def skills_filter(skill_ids, match='all'):
+    """Filter on ``skill_ids`` holding all (or, with ``match='any'``, any) of ``skill_ids``."""
+    return {'skill_ids': {'$all' if match == 'all' else '$in': list(skill_ids)}}
+
+def get_skill_filter_args():
+    """
+    Read the ``skills`` (comma-separated names) and ``skills_match`` query parameters.
+
+    Names are resolved through the taxonomy, so any alias of a skill matches it.
+
+    Returns:
+        dict: Filter on ``skill_ids``, empty when no skills were requested
+
+    Raises:
+        InvalidSkillFilter: If ``skills_match`` is not one of SKILL_MATCH_MODES
+    """
+    match = request.args.get('skills_match', 'all')
+    if match not in SKILL_MATCH_MODES:
+        raise InvalidSkillFilter(f"Invalid skills_match value. Use one of: {', '.join(SKILL_MATCH_MODES)}")
+    skill_ids = skill_taxonomy.get().ids(request.args.get('skills', '').split(','))
+    return skills_filter(skill_ids, match) if skill_ids else {}
+
+def eligibility_filter(skill_ids):
+    """
+    Filter on companies whose every requirement skill is in ``skill_ids``.
+
+    The ``$in`` clause is served by the multikey index; the ``$nin`` check
+    then only runs on companies sharing at least one skill. Companies
+    without requirement skills are left out.
+    """
+    skill_ids = list(skill_ids)
+    return {'$and': [
+        {'skill_ids': {'$in': skill_ids}},
+        {'skill_ids': {'$not': {'$elemMatch': {'$nin': skill_ids}}}}
+    ]}
+
+def store_student_skill_ids(registration_no):
+    """
+    Recompute a student's ``skill_ids`` after a write to their skills or experience.
+
+    Errors are logged, not raised: the profile write itself already succeeded.
+    """
+    try:
+        student = db.students.find_one({'registration_no': registration_no}, {'skills': 1, 'experience': 1})
+        if student:
+            db.students.update_one({'_id': student['_id']}, {'$set': {'skill_ids': student_skill_ids(student)}})
+    except Exception as e:
+        logger.error(f"Error storing skill IDs for student {registration_no}: {str(e)}")
+
+def seed_taxonomy():
+    """
+    Upsert SEED_SKILLS into the taxonomy collection.
+
+    Aliases are added, never removed, so aliases added by hand survive.
+
+    Returns:
+        int: Number of seed skills
+    """
+    documents = seed_documents()
+    db[SKILLS_COLLECTION].bulk_write([
+        UpdateOne({'_id': document['_id']},
+                  {'$set': {'name': document['name']}, '$addToSet': {'aliases': {'$each': document['aliases']}}},
+                  upsert=True)
+        for document in documents
+    ], ordered=False)
+    bump_generation(SKILLS_COLLECTION)
+    return len(documents)
+
+def _backfill(collection, projection, skill_ids):
+    operations = []
+    updated = 0
+    for document in collection.find({}, projection):
+        ids = skill_ids(document)
+        if ids != document.get('skill_ids'):
+            operations.append(UpdateOne({'_id': document['_id']}, {'$set': {'skill_ids': ids}}))
+            updated += 1
+        if len(operations) >= BATCH_SIZE:
+            collection.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    return updated
+
+def backfill_skill_ids():
+    """
+    Recompute ``skill_ids`` of every student and company from the current taxonomy.
+
+    Only the ID arrays are written; the free-text skills are left as entered.
+
+    Returns:
+        dict: Number of students and companies updated
+    """
+    taxonomy = build_taxonomy()
+    return {
+        'students': _backfill(db.students, {'skills': 1, 'experience': 1, 'skill_ids': 1},
+                              lambda student: student_skill_ids(student, taxonomy)),
+        'companies': _backfill(db.companies, {'requirements': 1, 'skill_ids': 1},
+                               lambda company: company_skill_ids(company, taxonomy))
+    }
+
+def sync_skill_taxonomy():
+    """Seed the taxonomy, then backfill every ``skill_ids`` array from it."""
+    seed_taxonomy()
+    return backfill_skill_ids()
@@ -0,0 +1,60 @@
+"""
+Platform-wide counts for the admin and faculty dashboards.
+
+Each collection is counted in a single aggregation pass (``$group`` with
+conditional sums, or by ``status`` for applications) instead of one
+``count_documents`` per figure. Results are memoized per worker for
+Config.STATS_TTL seconds, and concurrent dashboards share one in-flight
+computation (see Memo), so a burst of requests costs one pass per
+collection.
+"""
+from app import db
+from app.config import Config
+from app.utils.cache import Memo
+
+def _flag(field):
+    """Aggregation expression counting documents where ``field`` is true."""
+    return {'$sum': {'$cond': [{'$eq': [f'${field}', True]}, 1, 0]}}
+
+def _grouped(collection, accumulators):
+    pipeline = [{'$group': dict({'_id': None, 'total': {'$sum': 1}}, **accumulators)}]
+    result = next(db[collection].aggregate(pipeline), None) or {}
+    return {field: result.get(field, 0) for field in ('total', *accumulators)}
+
+def count_students():
+    """``total`` and ``placed`` students."""
+    return _grouped('students', {'placed': _flag('placed')})
+
+def count_companies():
+    """``total`` and ``active`` companies."""
+    return _grouped('companies', {'active': _flag('active')})
+
+def count_applications():
+    """``total`` applications and their counts ``by_status``."""
+    by_status = {result['_id']: result['count'] for result in db.applications.aggregate([
+        {'$group': {'_id': '$status', 'count': {'$sum': 1}}}
+    ])}
+    return {'total': sum(by_status.values()), 'by_status': by_status}
+
+def count_faculty():
+    """``total`` faculty members."""
+    return {'total': db.faculty.count_documents({})}
+
+collection_stats = {
+    'students': Memo(count_students, ttl=Config.STATS_TTL),
+    'companies': Memo(count_companies, ttl=Config.STATS_TTL),
+    'applications': Memo(count_applications, ttl=Config.STATS_TTL),
+    'faculty': Memo(count_faculty, ttl=Config.STATS_TTL)
+}
+
+def get_stats(*collections):
+    """
+    Memoized counts of ``collections``.
+
+    Args:
+        *collections: Keys of ``collection_stats``
+
+    Returns:
+        dict: Collection name -> its counts
+    """
+    return {name: collection_stats[name].get() for name in collections}
@@ -0,0 +1,84 @@
+"""
+Typeahead suggestions for /api/search/suggest.
+
+Suggestions come from a per-worker PrefixIndex over active companies
+(names, job titles, locations and requirement skills) and the technical
+skills of students. Company writes through the admin routes update the
+index of the worker that handled them; other workers rebuild theirs when
+they notice the companies generation changed.
+"""
+from app import db
+from app.config import Config
+from app.utils.prefix_index import LazyIndex, PrefixIndex
+from app.utils.search_cache import get_generations
+
+COMPANY_PROJECTION = {'name': 1, 'job_title': 1, 'location': 1, 'requirements': 1, 'active': 1}
+
+def _strings(value):
+    """Flatten a string, list or list of strings into clean strings."""
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [item.strip() for item in value if isinstance(item, str) and item.strip()]
+
+def requirement_skills(requirements):
+    """
+    Extract skill names from a company's requirements.
+
+    Requirements are stored as a comma-separated string, a list of skills or
+    a document with a ``skills`` list, depending on how the company was created.
+    """
+    if isinstance(requirements, dict):
+        requirements = requirements.get('skills', [])
+    if isinstance(requirements, str):
+        requirements = requirements.split(',')
+    return _strings(requirements)
+
+def company_terms(company):
+    """Return the (text, kind) suggestions contributed by a company document."""
+    if not company or not company.get('active', True):
+        return []
+    terms = [(text, 'company') for text in _strings(company.get('name'))]
+    terms += [(text, 'job_title') for text in _strings(company.get('job_title'))]
+    terms += [(text, 'location') for text in _strings(company.get('location'))]
+    terms += [(text, 'skill') for text in requirement_skills(company.get('requirements'))]
+    return terms
+
+def build_suggest_index():
+    """Build a PrefixIndex from the database."""
+    index = PrefixIndex(top_k=Config.SUGGEST_TOP_K)
+    for company in db.companies.find({'active': True}, COMPANY_PROJECTION):
+        for text, kind in company_terms(company):
+            index.add(text, kind, refresh=False)
+    for student in db.students.find({'skills.technical': {'$exists': True}}, {'skills.technical': 1}):
+        skills = student.get('skills')
+        if isinstance(skills, dict):
+            for text in _strings(skills.get('technical')):
+                index.add(text, 'skill', refresh=False)
+    index.finalize()
+    return index
+
+suggest_index = LazyIndex(build_suggest_index, ttl=Config.SUGGEST_INDEX_TTL,
+                          version=lambda: get_generations('companies')['companies'])
+
+def update_company(company, previous=None):
+    """
+    Apply a company write to this worker's index.
+
+    Args:
+        company (dict): The company as stored after the write
+        previous (dict, optional): The company before the write
+    """
+    index = suggest_index.peek()
+    if index is None:
+        # Not built in this worker yet; the first build reads the new state
+        return
+    for text, kind in company_terms(previous):
+        index.remove(text, kind)
+    for text, kind in company_terms(company):
+        index.add(text, kind)
+
+def suggest(prefix, limit=None):
+    """Return the top suggestions for ``prefix``."""
+    return suggest_index.get().suggest(prefix, limit)
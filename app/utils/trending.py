@@ -0,0 +1,167 @@
+"""
+Trending companies from hourly application counters.
+
+Every application increments its company's counter for the hour it was made
+in (``trending_buckets``, keyed by the UTC hour). A company's trending score is the sum of its
+hourly counts, each decayed exponentially with its age (half-life
+TRENDING_HALF_LIFE_HOURS), over the last TRENDING_WINDOW_DAYS; older buckets
+expire through a TTL index. Each worker keeps the top TRENDING_TOP_N
+companies in memory and refreshes them from the buckets every
+TRENDING_REFRESH_INTERVAL seconds. Since every score decays at the same
+rate, the order does not change between refreshes and the scores are
+decayed to the time they are served.
+"""
+import logging
+import math
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from pymongo import UpdateOne
+
+from app import db
+from app.config import Config
+from app.utils.prefix_index import LazyIndex
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_COLLECTION = 'trending_buckets'
+
+# Decay rate per hour
+DECAY_RATE = math.log(2) / Config.TRENDING_HALF_LIFE_HOURS
+
+def bucket_hour(moment):
+    """
+    Start of the UTC hour of a naive local datetime.
+
+    Applications store ``applied_date`` in server local time, while bucket
+    hours and expiry times are naive UTC, like other TTL timestamps.
+    """
+    utc = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return utc.replace(minute=0, second=0, microsecond=0)
+
+def window():
+    """Time span kept in the buckets."""
+    return timedelta(days=Config.TRENDING_WINDOW_DAYS)
+
+def record_application(company_id, applied_date):
+    """
+    Count one application in its company's hourly bucket.
+
+    Errors are logged, not raised: the application itself already succeeded.
+    """
+    hour = bucket_hour(applied_date)
+    try:
+        db[BUCKETS_COLLECTION].update_one(
+            {'company_id': company_id, 'hour': hour},
+            {'$inc': {'count': 1}, '$setOnInsert': {'expires_at': hour + window()}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Error recording application for company {company_id}: {str(e)}")
+
+def backfill_buckets():
+    """
+    Rebuild the hourly buckets of the current window from the applications.
+
+    Counts are set, not incremented, so running it twice is harmless.
+    """
+    # applied_date is local time
+    since = datetime.now() - window()
+    pipeline = [
+        {'$match': {'applied_date': {'$gte': since}}},
+        {'$group': {
+            '_id': {
+                'company_id': '$company_id',
+                'hour': {'$dateToString': {'format': '%Y-%m-%dT%H', 'date': '$applied_date'}}
+            },
+            'count': {'$sum': 1}
+        }}
+    ]
+    # Local hours are summed per UTC hour, since two of them can share one
+    # when clocks go back
+    counts = Counter()
+    for bucket in db.applications.aggregate(pipeline):
+        hour = bucket_hour(datetime.strptime(bucket['_id']['hour'], '%Y-%m-%dT%H'))
+        counts[bucket['_id']['company_id'], hour] += bucket['count']
+    operations = [
+        UpdateOne(
+            {'company_id': company_id, 'hour': hour},
+            {'$set': {'count': count, 'expires_at': hour + window()}},
+            upsert=True
+        )
+        for (company_id, hour), count in counts.items()
+    ]
+    if operations:
+        db[BUCKETS_COLLECTION].bulk_write(operations, ordered=False)
+    return len(operations)
+
+def rebuild_buckets():
+    """Drop every bucket and backfill the current window again (see backfill_buckets())."""
+    db[BUCKETS_COLLECTION].delete_many({})
+    return backfill_buckets()
+
+class TrendingBoard:
+    """The top companies by decayed score, as of ``computed_at``."""
+
+    def __init__(self, entries, computed_at):
+        self.entries = entries
+        self.computed_at = computed_at
+
+    def top(self, limit):
+        """
+        Return up to ``limit`` entries with their scores decayed to now.
+
+        Returns:
+            list: Entry dicts, highest score first
+        """
+        hours = (time.time() - self.computed_at) / 3600
+        decay = math.exp(-DECAY_RATE * hours)
+        return [dict(entry, trending_score=round(entry['trending_score'] * decay, 4))
+                for entry in self.entries[:limit]]
+
+def build_trending_board():
+    """Score every company with applications in the window and keep the top ones."""
+    computed_at = time.time()
+    now = datetime.utcnow()
+    pipeline = [
+        {'$match': {'hour': {'$gte': now - window()}}},
+        {'$group': {
+            '_id': '$company_id',
+            'application_count': {'$sum': '$count'},
+            'trending_score': {'$sum': {'$multiply': ['$count', {'$exp': {
+                '$multiply': [-DECAY_RATE, {'$divide': [{'$subtract': [now, '$hour']}, 3600 * 1000]}]
+            }}]}}
+        }},
+        # Inactive companies are dropped before the cut, so the board keeps
+        # TRENDING_TOP_N companies that can be shown
+        {'$lookup': {
+            'from': 'companies',
+            'localField': '_id',
+            'foreignField': '_id',
+            'as': 'company_details'
+        }},
+        {'$unwind': '$company_details'},
+        {'$match': {'company_details.active': {'$ne': False}}},
+        {'$sort': {'trending_score': -1, '_id': 1}},
+        {'$limit': Config.TRENDING_TOP_N},
+        {'$project': {
+            '_id': 0,
+            'company_id': '$_id',
+            'company_name': '$company_details.name',
+            'job_title': '$company_details.job_title',
+            'logo': '$company_details.logo_url',
+            'application_count': 1,
+            'trending_score': 1
+        }}
+    ]
+    entries = list(db[BUCKETS_COLLECTION].aggregate(pipeline))
+    for entry in entries:
+        entry['company_id'] = str(entry['company_id'])
+    return TrendingBoard(entries, computed_at)
+
+trending_board = LazyIndex(build_trending_board, ttl=Config.TRENDING_REFRESH_INTERVAL)
+
+def trending_companies(limit=10):
+    """Return the ``limit`` companies trending most right now."""
+    return trending_board.get().top(limit)
@@ -0,0 +1,129 @@
+"""
+Trigram index for typo-tolerant matching.
+
+Documents are indexed by the distinct tokens of their text; tokens are
+indexed by their trigrams. A query token is compared only with the tokens
+sharing at least one trigram with it, so misspellings such as "kubernates"
+or "javscript" still find their documents without scanning them all.
+"""
+import re
+import threading
+from collections import defaultdict
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+
+def tokenize(text):
+    """Split ``text`` into lowercase tokens, keeping names like c++, c# and node.js whole."""
+    return [token.rstrip('.') for token in TOKEN_PATTERN.findall(str(text).lower())]
+
+def trigrams(token):
+    """Trigrams of a token, padded so that short tokens and word starts count."""
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """
+    Maps documents to tokens and tokens to trigrams.
+
+    Similarity between two tokens is the Jaccard index of their trigram
+    sets. Writers take a lock; search() takes it too, since it iterates over
+    postings that writers mutate.
+    """
+
+    def __init__(self, threshold=0.3):
+        self.threshold = threshold
+        self._doc_tokens = {}                  # doc id -> set of tokens
+        self._token_docs = defaultdict(set)    # token -> doc ids
+        self._gram_tokens = defaultdict(set)   # trigram -> tokens
+        self._token_grams = {}                 # token -> number of trigrams
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    def add(self, doc_id, texts):
+        """Index ``doc_id`` under the tokens of ``texts``, replacing what it had."""
+        tokens = {token for text in texts for token in tokenize(text)}
+        with self._lock:
+            self._remove(doc_id)
+            if not tokens:
+                return
+            self._doc_tokens[doc_id] = tokens
+            for token in tokens:
+                if token not in self._token_grams:
+                    grams = trigrams(token)
+                    self._token_grams[token] = len(grams)
+                    for gram in grams:
+                        self._gram_tokens[gram].add(token)
+                self._token_docs[token].add(doc_id)
+
+    def remove(self, doc_id):
+        """Drop ``doc_id`` from the index."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        for token in self._doc_tokens.pop(doc_id, ()):
+            docs = self._token_docs.get(token)
+            if docs is None:
+                continue
+            docs.discard(doc_id)
+            if not docs:
+                # Last document using the token: forget the token entirely
+                del self._token_docs[token]
+                del self._token_grams[token]
+                for gram in trigrams(token):
+                    grams = self._gram_tokens.get(gram)
+                    if grams is not None:
+                        grams.discard(token)
+                        if not grams:
+                            del self._gram_tokens[gram]
+
+    def similar_tokens(self, token):
+        """
+        Return indexed tokens similar to ``token``.
+
+        Returns:
+            dict: token -> similarity in (0, 1], at or above the threshold
+        """
+        query_grams = trigrams(token)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for candidate in self._gram_tokens.get(gram, ()):
+                shared[candidate] += 1
+
+        similar = {}
+        for candidate, count in shared.items():
+            similarity = count / (len(query_grams) + self._token_grams[candidate] - count)
+            if similarity >= self.threshold:
+                similar[candidate] = similarity
+        return similar
+
+    def search(self, query, limit=None):
+        """
+        Rank documents against ``query``.
+
+        A document scores, for every query token, the similarity of its
+        closest token, averaged over the query tokens.
+
+        Returns:
+            list: (doc id, score) pairs, best first
+        """
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+
+        scores = defaultdict(float)
+        with self._lock:
+            for query_token in query_tokens:
+                best = {}
+                for token, similarity in self.similar_tokens(query_token).items():
+                    for doc_id in self._token_docs[token]:
+                        if best.get(doc_id, 0) < similarity:
+                            best[doc_id] = similarity
+                for doc_id, similarity in best.items():
+                    scores[doc_id] += similarity
+
+        ranked = sorted(((doc_id, score / len(query_tokens)) for doc_id, score in scores.items()),
+                        key=lambda item: (-item[1], str(item[0])))
+        return ranked[:limit] if limit else ranked
@@ -0,0 +1,28 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+def compact_co_applications():
+    """Fold co-application counts into per-company "also applied" lists."""
+    load_dotenv()
+
+    app = create_app()
+
+    with app.app_context():
+        from app.utils.co_applications import compact, rebuild_pairs
+
+        started = time.monotonic()
+        if '--rebuild' in sys.argv:
+            pairs = rebuild_pairs()
+            print(f"Rebuilt {pairs} co-application pairs from applications")
+
+        companies = compact()
+        elapsed = time.monotonic() - started
+        print(f"Compacted neighbour lists for {companies} companies in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    compact_co_applications()
@@ -0,0 +1,39 @@
+import argparse
+import json
+import os
+import sys
+from dotenv import load_dotenv
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def evaluate_recommendations():
+    """Compare recommendation strategies offline on a synthetic population."""
+    load_dotenv()
+
+    from app.utils.evaluation import STRATEGIES, build_population, evaluate, format_report, split_holdout
+
+    parser = argparse.ArgumentParser(description=evaluate_recommendations.__doc__)
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--companies', type=int, default=2000)
+    parser.add_argument('--applications', type=int, default=200000)
+    parser.add_argument('--k', type=int, default=10, help='Length of the evaluated top-k lists')
+    parser.add_argument('--holdout', type=float, default=0.2, help="Share of each student's latest applications held out")
+    parser.add_argument('--sample', type=int, help='Evaluate this many held-out students only')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    students, companies, applications = build_population(args.students, args.companies, args.applications, args.seed)
+    train, held_out = split_holdout(applications, args.holdout)
+    if not args.json:
+        print(f"{len(students)} students, {len(companies)} companies, {len(applications)} applications "
+              f"({len(applications) - len(train)} held out from {len(held_out)} students)")
+
+    results = [
+        evaluate(STRATEGIES[name](), students, companies, train, held_out, args.k, args.sample, args.seed)
+        for name in args.strategies
+    ]
+    print(json.dumps(results, indent=2) if args.json else format_report(results))
+
+if __name__ == '__main__':
+    evaluate_recommendations()
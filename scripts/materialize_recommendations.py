@@ -0,0 +1,27 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+def materialize_recommendations():
+    """Rebuild the stored top-K company recommendations of every student."""
+    load_dotenv()
+
+    app = create_app()
+
+    with app.app_context():
+        from app.utils.recommendation_store import materialize_all
+
+        started = time.monotonic()
+        result = materialize_all()
+        elapsed = time.monotonic() - started
+
+        print(f"Stored recommendations for {result['stored']} students in {elapsed:.1f}s")
+        print(f"Marked {result['without_profile']} students without skills or interests")
+        print(f"Removed {result['removed']} stale recommendation documents")
+
+if __name__ == '__main__':
+    materialize_recommendations()
@@ -0,0 +1,24 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+def rebuild_analytics():
+    """Recompute the daily analytics rollups from the raw collections."""
+    load_dotenv()
+
+    app = create_app()
+
+    with app.app_context():
+        from app.utils.analytics import rebuild_rollups
+
+        started = time.monotonic()
+        days = rebuild_rollups()
+        elapsed = time.monotonic() - started
+        print(f"Rebuilt the analytics rollups of {days} days in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    rebuild_analytics()
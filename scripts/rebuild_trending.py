@@ -0,0 +1,25 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+def rebuild_trending():
+    """Backfill the hourly trending buckets of the current window from the applications."""
+    load_dotenv()
+
+    app = create_app()
+
+    with app.app_context():
+        from app.utils.trending import backfill_buckets, rebuild_buckets
+
+        started = time.monotonic()
+        # --rebuild drops every bucket first, e.g. buckets written on local hours
+        buckets = rebuild_buckets() if '--rebuild' in sys.argv else backfill_buckets()
+        elapsed = time.monotonic() - started
+        print(f"Wrote {buckets} trending buckets in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    rebuild_trending()
@@ -0,0 +1,29 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+def sync_skill_taxonomy():
+    """Seed the skill taxonomy and recompute the skill IDs of students and companies."""
+    load_dotenv()
+
+    app = create_app()
+
+    with app.app_context():
+        from app.utils.skills import backfill_skill_ids, seed_taxonomy
+
+        started = time.monotonic()
+        if '--no-seed' not in sys.argv:
+            skills = seed_taxonomy()
+            print(f"Seeded {skills} taxonomy skills")
+
+        updated = backfill_skill_ids()
+        elapsed = time.monotonic() - started
+        print(f"Updated skill IDs of {updated['students']} students and {updated['companies']} companies "
+              f"in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    sync_skill_taxonomy()
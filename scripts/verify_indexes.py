@@ -0,0 +1,35 @@
+import os
+import sys
+from dotenv import load_dotenv
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+def verify_indexes():
+    """Check that every canonical route query is served by an index."""
+    load_dotenv()
+    
+    app = create_app()
+    
+    with app.app_context():
+        from app.models.indexes import ensure_indexes, verify_query_plans
+        
+        if '--create' in sys.argv:
+            ensure_indexes()
+            print("Registry indexes created")
+        
+        failures = 0
+        for result in verify_query_plans():
+            status = 'OK' if result['ok'] else 'COLLSCAN'
+            print(f"{status:9} {result['name']:32} {result['collection']:15} {' > '.join(result['stages'])}")
+            if not result['ok']:
+                failures += 1
+        
+        if failures:
+            print(f"Error: {failures} canonical queries fall back to a collection scan")
+            sys.exit(1)
+        
+        print("All canonical queries use an index")
+
+if __name__ == '__main__':
+    verify_indexes()
@@ -0,0 +1,43 @@
+"""
+Shared fixtures.
+
+Importing the ``app`` package runs create_app(), which connects to MongoDB
+and creates the upload directories. The tests exercise the utility modules
+only, so ``app`` is replaced with a bare package whose ``db`` is an
+in-memory mongomock database, before any of them is imported.
+"""
+import os
+import sys
+import types
+
+import mongomock
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_package = types.ModuleType('app')
+_package.__path__ = [os.path.join(ROOT, 'app')]
+_package.db = mongomock.MongoClient().get_database('test_portal')
+sys.modules['app'] = _package
+
+@pytest.fixture
+def db():
+    """The in-memory database, emptied after each test."""
+    yield _package.db
+    for name in _package.db.list_collection_names():
+        _package.db.drop_collection(name)
+
+@pytest.fixture
+def flask_app():
+    """A bare Flask app for request contexts."""
+    return Flask(__name__)
+
+@pytest.fixture
+def jwt_app(flask_app):
+    """A bare Flask app that issues and verifies access tokens."""
+    flask_app.config['JWT_SECRET_KEY'] = 'test-jwt-secret-key-of-32-bytes!'
+    JWTManager(flask_app)
+    return flask_app
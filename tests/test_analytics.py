@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+
+from app.utils.analytics import (
+    ROLLUP_COLLECTION,
+    company_totals,
+    day_keys,
+    rebuild_rollups,
+    rollup_application,
+    rollup_status_change,
+    window_totals
+)
+
+APPLIED = datetime(2024, 3, 1, 10, 0)
+
+def _day(db, key):
+    return db[ROLLUP_COLLECTION].find_one({'_id': key}) or {}
+
+def _nonzero(counts):
+    return {key: value for key, value in (counts or {}).items() if value}
+
+def _apply(db, student_id, company_id, department, applied_date=APPLIED):
+    application = {'student_id': student_id, 'company_id': company_id, 'status': 'pending',
+                   'applied_date': applied_date}
+    application['_id'] = db.applications.insert_one(dict(application)).inserted_id
+    rollup_application(application, {'department': department})
+    return application
+
+def _change(db, application, status, changed_at):
+    previous = db.applications.find_one_and_update(
+        {'_id': application['_id']}, {'$set': {'status': status, 'status_updated_date': changed_at}}
+    )
+    rollup_status_change(previous, status, changed_at)
+
+def test_day_keys_cover_the_range():
+    assert day_keys(datetime(2024, 2, 28, 18, 0), datetime(2024, 3, 1, 9, 0)) == ['2024-02-28', '2024-02-29',
+                                                                                  '2024-03-01']
+
+def test_applications_increment_their_day(db):
+    company_id = ObjectId()
+    _apply(db, '221300001', company_id, 'B.Tech CSE')
+    _apply(db, '221300002', company_id, 'B.Tech CSE')
+    _apply(db, '221300001', ObjectId(), None)
+
+    day = _day(db, '2024-03-01')
+    assert day['applications'] == 3
+    assert day['status'] == {'pending': 3}
+    assert day['companies'][str(company_id)] == 2
+    # Department names are field names, so dots are replaced
+    assert day['departments'] == {'B_Tech CSE': 2, 'unknown': 1}
+    assert window_totals(APPLIED, APPLIED)['active_students'] == 2
+
+def test_status_changes_move_between_statuses_and_days(db):
+    application = _apply(db, '221300001', ObjectId(), 'CSE')
+    _change(db, application, 'approved', APPLIED + timedelta(days=2))
+    _change(db, application, 'rejected', APPLIED + timedelta(days=5))
+
+    assert _nonzero(_day(db, '2024-03-01')['status']) == {'rejected': 1}
+    # Only the current status counts, on the day it was set
+    assert _nonzero(_day(db, '2024-03-03').get('status_changes')) == {}
+    assert _nonzero(_day(db, '2024-03-06')['status_changes']) == {'rejected': 1}
+
+def test_live_rollups_match_a_rebuild(db):
+    departments = {f'2213000{student}': 'CSE' if student % 2 else 'ECE' for student in range(4)}
+    db.students.insert_many([{'registration_no': registration_no, 'department': department}
+                             for registration_no, department in departments.items()])
+    applications = [_apply(db, f'2213000{index % 4}', ObjectId(), departments[f'2213000{index % 4}'],
+                           APPLIED + timedelta(days=index % 3)) for index in range(9)]
+    for index, application in enumerate(applications):
+        for step, status in enumerate(['interview', 'approved', 'rejected'][:index % 4]):
+            _change(db, application, status, APPLIED + timedelta(days=3 + step, hours=index))
+
+    def snapshot():
+        return {document['_id']: {field: _nonzero(document.get(field))
+                                  for field in ('status', 'status_changes', 'companies', 'departments')}
+                | {'applications': document.get('applications', 0), 'students': document.get('students', {})}
+                for document in db[ROLLUP_COLLECTION].find()}
+
+    live = {key: day for key, day in snapshot().items() if any(day.values())}
+    rebuild_rollups()
+    assert snapshot() == live
+
+def test_company_totals_sum_every_day(db):
+    popular, other, rare = ObjectId(), ObjectId(), ObjectId()
+    for day, company_id in enumerate([popular, other, popular, rare, popular, other]):
+        _apply(db, f'2213000{day}', company_id, 'CSE', APPLIED + timedelta(days=day % 3))
+
+    assert company_totals(2) == [{'company_id': str(popular), 'application_count': 3},
+                                 {'company_id': str(other), 'application_count': 2}]
+    assert len(company_totals(10)) == 3
@@ -0,0 +1,82 @@
+import pytest
+from flask_jwt_extended import create_access_token, verify_jwt_in_request
+
+from app.auth.utils import create_user_token, get_token_role, get_user_role, invalidate_user_role, role_cache
+from app.routes.api.auth.auth_routes import auth_bp
+from app.utils.db_management import clear_database
+
+REGISTRATION_NO = '221300001'
+
+@pytest.fixture(autouse=True)
+def empty_role_cache():
+    role_cache.clear()
+    yield
+    role_cache.clear()
+
+def _authorized(app, token):
+    """Request context carrying ``token``, already verified."""
+    context = app.test_request_context('/', headers={'Authorization': f'Bearer {token}'})
+    context.push()
+    verify_jwt_in_request()
+    return context
+
+def test_role_claim_is_used_before_the_database(jwt_app, db):
+    db.students.insert_one({'registration_no': REGISTRATION_NO})
+    with jwt_app.app_context():
+        token = create_user_token(REGISTRATION_NO, 'faculty')
+
+    context = _authorized(jwt_app, token)
+    try:
+        assert get_user_role() == 'faculty'
+        assert get_token_role('someone-else') is None
+        assert len(role_cache) == 0
+    finally:
+        context.pop()
+
+def test_legacy_admin_claim_falls_back_to_is_admin(jwt_app):
+    with jwt_app.app_context():
+        token = create_access_token(identity='admin-1', additional_claims={'is_admin': True})
+
+    context = _authorized(jwt_app, token)
+    try:
+        assert get_token_role('admin-1') == 'admin'
+        assert get_user_role() == 'admin'
+    finally:
+        context.pop()
+
+def test_tokens_without_a_role_are_resolved_once_and_cached(jwt_app, db):
+    db.faculty.insert_one({'faculty_id': 'F1'})
+    with jwt_app.app_context():
+        token = create_access_token(identity='F1')
+
+    context = _authorized(jwt_app, token)
+    try:
+        assert get_token_role('F1') is None
+        assert get_user_role() == 'faculty'
+        assert role_cache.get('F1') == 'faculty'
+
+        # The cache answers until the role is invalidated
+        db.faculty.delete_one({'faculty_id': 'F1'})
+        db.admin.insert_one({'admin_id': 'F1'})
+        assert get_user_role() == 'faculty'
+        invalidate_user_role('F1')
+        assert get_user_role() == 'admin'
+    finally:
+        context.pop()
+
+def test_signup_drops_a_cached_role(jwt_app, db):
+    jwt_app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    role_cache.set(REGISTRATION_NO, 'faculty')
+
+    response = jwt_app.test_client().post('/api/auth/signup', json={
+        'registration_no': REGISTRATION_NO, 'email': 'student@example.com', 'password': 'secret123'
+    })
+
+    assert response.status_code == 201
+    assert role_cache.get(REGISTRATION_NO) is None
+
+def test_clear_database_empties_the_role_cache(db):
+    role_cache.set(REGISTRATION_NO, 'student')
+    success, _ = clear_database()
+    assert success
+    assert len(role_cache) == 0
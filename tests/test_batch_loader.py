@@ -0,0 +1,36 @@
+import pytest
+
+from app.utils.batch_loader import BatchLoader, get_loader
+
+@pytest.fixture
+def companies(db):
+    db.companies.insert_many([{'_id': index, 'name': f'Company {index}', 'job_title': 'Engineer',
+                               'job_description': 'Long text'} for index in range(5)])
+    return db.companies
+
+def test_batch_loader_resolves_queued_keys_in_one_query(companies):
+    loader = BatchLoader('companies', ('name',))
+    loader.want([0, 1])
+
+    found = loader.load_many([2, 3, 99])
+    assert sorted(found) == [2, 3]
+    assert found[2] == {'_id': 2, 'name': 'Company 2'}
+    assert loader.queries == 1
+
+    # Queued, loaded and missing keys are all memoized
+    assert loader.load(0)['name'] == 'Company 0'
+    assert loader.load(99) is None
+    assert loader.queries == 1
+
+    assert loader.load(4)['name'] == 'Company 4'
+    assert loader.queries == 2
+
+def test_loaders_are_request_scoped(flask_app, companies):
+    with flask_app.test_request_context('/'):
+        loader = get_loader('companies')
+        assert get_loader('companies') is loader
+        loader.load(1)
+    with flask_app.test_request_context('/'):
+        assert get_loader('companies') is not loader
+        with pytest.raises(KeyError):
+            get_loader('unknown')
@@ -0,0 +1,51 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.cache import Memo
+
+def test_memo_reuses_the_value_until_it_expires():
+    calls = []
+    memo = Memo(lambda: calls.append(1) or len(calls), ttl=60)
+
+    assert memo.get() == 1
+    assert memo.get() == 1
+    memo.invalidate()
+    assert memo.get() == 2
+    assert memo.stats()['hits'] == 1 and memo.stats()['misses'] == 2
+
+def test_memo_is_single_flight():
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return 'value'
+
+    memo = Memo(slow, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(memo.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+def test_memo_does_not_store_errors():
+    outcomes = iter([RuntimeError('down'), 'up'])
+
+    def flaky():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    memo = Memo(flaky, ttl=60)
+    with pytest.raises(RuntimeError):
+        memo.get()
+    assert memo.get() == 'up'
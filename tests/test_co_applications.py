@@ -0,0 +1,63 @@
+import pytest
+from bson.objectid import ObjectId
+
+from app.config import Config
+from app.utils.co_applications import (
+    PAIRS_COLLECTION,
+    blend,
+    combine_neighbours,
+    count_pairs,
+    rank_neighbours,
+    record_co_application,
+    rebuild_pairs
+)
+
+def test_count_pairs_counts_both_orders_once_per_student():
+    pairs = count_pairs([{'a', 'b', 'c'}, {'a', 'b'}, {'c'}])
+    assert pairs == {('a', 'b'): 2, ('b', 'a'): 2, ('a', 'c'): 1, ('c', 'a'): 1, ('b', 'c'): 1, ('c', 'b'): 1}
+
+def test_rank_neighbours_uses_cosine_similarity():
+    applicants = {'a': 4, 'popular': 100, 'niche': 1, 'ghost': 0}
+    ranked = rank_neighbours('a', [('popular', 4), ('niche', 1), ('ghost', 3), ('zero', 0)], applicants, top_k=5)
+
+    # 1 / sqrt(4 * 1) beats 4 / sqrt(4 * 100); companies without applicants are left out
+    assert ranked == [{'company_id': 'niche', 'count': 1, 'score': 0.5},
+                      {'company_id': 'popular', 'count': 4, 'score': 0.2}]
+    assert rank_neighbours('a', [('popular', 4), ('niche', 1)], applicants, top_k=1)[0]['company_id'] == 'niche'
+
+def test_combine_neighbours_sums_and_normalizes():
+    lists = [
+        [{'company_id': 'x', 'score': 0.5}, {'company_id': 'y', 'score': 0.2}, {'company_id': 'b', 'score': 0.9}],
+        [{'company_id': 'y', 'score': 0.6}, {'company_id': 'a', 'score': 0.9}]
+    ]
+    scores = combine_neighbours(lists, ['a', 'b'])
+    assert scores == {'y': pytest.approx(1.0), 'x': pytest.approx(0.625)}
+    assert combine_neighbours([], ['a']) == {}
+
+def test_blend_weights_both_scores_and_breaks_ties_on_id():
+    ranked = blend({'a': 1.0, 'b': 0.5}, {'b': 1.0, 'c': 0.5}, weight=0.5)
+    assert ranked == [('b', 0.75), ('a', 0.5), ('c', 0.25)]
+    assert blend({'a': 0.4, 'b': 0.4}, {}, weight=0) == [('b', 0.4), ('a', 0.4)]
+    assert blend({'a': 1.0}, {}) == [('a', round(1 - Config.BLEND_COLLABORATIVE_WEIGHT, 4))]
+
+def _pairs(db):
+    return {(pair['company_id'], pair['other_id']): pair['count'] for pair in db[PAIRS_COLLECTION].find()}
+
+def test_recorded_pairs_match_a_rebuild(db):
+    first, second, third = ObjectId(), ObjectId(), ObjectId()
+    applied = []
+    for company_id in (first, second, third):
+        db.applications.insert_one({'student_id': '221300001', 'company_id': company_id})
+        record_co_application(company_id, list(applied))
+        applied.append(company_id)
+    # Older routes pushed string IDs, and a repeated ID counts once
+    db.applications.insert_one({'student_id': '221300002', 'company_id': second})
+    record_co_application(second, [str(first), str(first)])
+    db.applications.insert_one({'student_id': '221300002', 'company_id': first})
+
+    live = _pairs(db)
+    assert live[(first, second)] == live[(second, first)] == 2
+    assert live[(third, first)] == 1
+
+    rebuild_pairs()
+    assert _pairs(db) == live
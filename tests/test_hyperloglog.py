@@ -0,0 +1,31 @@
+import pytest
+
+from app.utils.hyperloglog import HyperLogLog, register_of, standard_error
+
+def test_hyperloglog_small_counts_are_exact():
+    sketch = HyperLogLog()
+    for value in range(50):
+        sketch.add(value)
+        sketch.add(value)
+    assert sketch.count() == 50
+    assert HyperLogLog().count() == 0
+
+def test_hyperloglog_large_counts_stay_within_error():
+    sketch = HyperLogLog()
+    for value in range(20000):
+        sketch.add(f'S{value}')
+    assert abs(sketch.count() - 20000) <= 20000 * 4 * standard_error()
+
+def test_hyperloglog_merge_counts_the_union():
+    monday, tuesday, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    for value in range(3000):
+        monday.add(value)
+        both.add(value)
+    for value in range(2000, 6000):
+        tuesday.add(value)
+        both.add(value)
+
+    merged = HyperLogLog(monday.registers)
+    merged.merge(tuesday.registers)
+    assert merged.registers == both.registers
+    assert register_of('S1') == register_of('S1')
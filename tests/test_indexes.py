@@ -0,0 +1,79 @@
+from app.models import indexes
+from app.models.indexes import INDEXES, RETIRED_INDEXES, _plan_stages, ensure_indexes, verify_query_plans
+
+def _names(collection):
+    return set(collection.index_information()) - {'_id_'}
+
+def test_ensure_indexes_builds_the_registry(db):
+    ensure_indexes()
+    for collection_name, models in INDEXES.items():
+        assert _names(db[collection_name]) == {model.document['name'] for model in models}
+
+def test_ensure_indexes_drops_retired_indexes_only(db):
+    db.notifications.create_index([('recipient_id', 1), ('timestamp', -1)], name='recipient_timestamp')
+    db.announcements.create_index([('date', -1)], name='date')
+    db.announcements.create_index([('author', 1)], name='author')
+    db.applications.create_index([('applied_date', 1), ('status', 1), ('status_updated_date', 1)],
+                                 name='applied_date_status')
+
+    ensure_indexes()
+    ensure_indexes()
+
+    assert 'recipient_timestamp' not in _names(db.notifications)
+    assert _names(db.announcements) >= {'date_id', 'author'}
+    assert 'date' not in _names(db.announcements)
+    assert 'applied_date_status' not in _names(db.applications)
+
+def test_retired_indexes_are_not_registered():
+    for collection_name, names in RETIRED_INDEXES.items():
+        registered = {model.document['name'] for model in INDEXES.get(collection_name, [])}
+        assert not registered & set(names)
+
+def test_plan_stages_walks_nested_plans():
+    plan = {
+        'stage': 'SUBPLAN',
+        'inputStage': {
+            'stage': 'OR',
+            'inputStages': [
+                {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': 'status_id'}},
+                {'stage': 'COLLSCAN', 'filter': {'status': {'$eq': 'pending'}}}
+            ]
+        }
+    }
+    assert _plan_stages(plan) == ['SUBPLAN', 'OR', 'FETCH', 'IXSCAN', 'COLLSCAN']
+    assert _plan_stages({}) == []
+
+class _ExplainedCursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def limit(self, count):
+        return self
+
+    def sort(self, sort):
+        return self
+
+    def explain(self):
+        return {'queryPlanner': {'winningPlan': self.plan}}
+
+class _ExplainedCollection:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def find(self, query_filter):
+        return _ExplainedCursor(self.plan)
+
+def test_verify_query_plans_flags_collection_scans(monkeypatch):
+    monkeypatch.setattr(indexes, 'db', {
+        'indexed': _ExplainedCollection({'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN'}}),
+        'scanned': _ExplainedCollection({'stage': 'SORT', 'inputStage': {'stage': 'COLLSCAN'}})
+    })
+    monkeypatch.setattr(indexes, 'CANONICAL_QUERIES', [
+        ('fast', 'indexed', {'a': 1}, None),
+        ('slow', 'scanned', {'b': 1}, [('b', 1)])
+    ])
+
+    results = {result['name']: result for result in verify_query_plans()}
+    assert results['fast']['ok'] is True
+    assert results['slow'] == {'name': 'slow', 'collection': 'scanned', 'stages': ['SORT', 'COLLSCAN'],
+                               'ok': False}
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import migrations
+from app.models.migrations import (
+    LOCK_DOC_ID,
+    MIGRATIONS_COLLECTION,
+    _record_version,
+    acquire_migration_lock,
+    get_schema_version,
+    release_migration_lock,
+    run_migrations
+)
+
+def _lock(db):
+    return db[MIGRATIONS_COLLECTION].find_one({'_id': LOCK_DOC_ID})
+
+def test_second_owner_is_refused(db):
+    assert acquire_migration_lock('web-1:10')
+    assert not acquire_migration_lock('web-2:20')
+    # The holder may take it again
+    assert acquire_migration_lock('web-1:10')
+    assert _lock(db)['owner'] == 'web-1:10'
+
+    release_migration_lock('web-2:20')
+    assert _lock(db) is not None
+    release_migration_lock('web-1:10')
+    assert acquire_migration_lock('web-2:20')
+
+def test_expired_lock_is_taken_over(db):
+    db[MIGRATIONS_COLLECTION].insert_one({'_id': LOCK_DOC_ID, 'owner': 'web-1:10',
+                                          'expires_at': datetime.utcnow() - timedelta(seconds=1)})
+    assert acquire_migration_lock('web-2:20')
+    lock = _lock(db)
+    assert lock['owner'] == 'web-2:20'
+    assert lock['expires_at'] > datetime.utcnow()
+
+@pytest.fixture
+def steps(monkeypatch):
+    """Four recording steps in place of the real migrations."""
+    applied = []
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [
+        (version, f'step {version}', lambda version=version: applied.append(version)) for version in range(1, 5)
+    ])
+    monkeypatch.setattr(migrations, 'LATEST_VERSION', 4)
+    monkeypatch.setattr(migrations, '_lock_owner', lambda: 'web-1:10')
+    return applied
+
+def test_rerun_resumes_after_the_last_recorded_step(db, steps):
+    _record_version(1, 'step 1')
+    _record_version(2, 'step 2')
+
+    assert run_migrations() == 4
+    assert steps == [3, 4]
+    assert get_schema_version() == 4
+    assert _lock(db) is None
+
+    assert run_migrations() == 4
+    assert steps == [3, 4]
+
+def test_failed_step_is_retried_by_the_next_run(db, steps, monkeypatch):
+    def broken():
+        raise RuntimeError('index build failed')
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS[:2] + [(3, 'step 3', broken)]
+                        + migrations.MIGRATIONS[3:])
+    with pytest.raises(RuntimeError):
+        run_migrations()
+    assert steps == [1, 2]
+    assert get_schema_version() == 2
+    assert _lock(db) is None
+
+def test_held_lock_skips_the_run(db, steps):
+    assert acquire_migration_lock('web-2:20')
+    assert run_migrations() == 0
+    assert steps == []
+
+def test_holder_stops_when_its_lock_is_taken_over(db, steps, monkeypatch):
+    def stolen():
+        steps.append(2)
+        db[MIGRATIONS_COLLECTION].update_one({'_id': LOCK_DOC_ID}, {'$set': {'owner': 'web-2:20'}})
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', migrations.MIGRATIONS[:1] + [(2, 'step 2', stolen)]
+                        + migrations.MIGRATIONS[2:])
+    assert run_migrations() == 2
+    assert steps == [1, 2]
+    assert _lock(db)['owner'] == 'web-2:20'
@@ -0,0 +1,23 @@
+import pytest
+
+from app.utils.minhash_index import MinHashLSH, jaccard
+
+def test_minhash_finds_near_duplicates():
+    index = MinHashLSH()
+    base = {f'token{i}' for i in range(20)}
+    index.add('same', base)
+    index.add('close', base - {'token0'} | {'other'})
+    index.add('far', {f'word{i}' for i in range(20)})
+
+    results = index.query(base, exclude='same')
+    assert results[0][0] == 'close'
+    assert results[0][1] == pytest.approx(jaccard(base, base - {'token0'} | {'other'}))
+    assert 'far' not in dict(results)
+
+    index.remove('close')
+    assert index.query(base, exclude='same') == []
+    assert len(index) == 2
+
+def test_minhash_rejects_uneven_bands():
+    with pytest.raises(ValueError):
+        MinHashLSH(num_perm=10, bands=3)
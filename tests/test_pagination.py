@@ -0,0 +1,143 @@
+from datetime import datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+from app.utils.pagination import (
+    InvalidCursor,
+    PaginationError,
+    decode_cursor,
+    encode_cursor,
+    get_pagination_args,
+    keyset_filter,
+    page_count,
+    page_ranked,
+    paginate
+)
+
+def test_cursor_round_trip():
+    last_id = ObjectId()
+    moment = datetime(2024, 5, 17, 9, 30)
+    token = encode_cursor('posted_date', -1, moment, last_id)
+
+    assert '=' not in token
+    assert decode_cursor(token, 'posted_date', -1) == (moment, last_id)
+
+@pytest.mark.parametrize('token', ['not a cursor', '!!!', encode_cursor('name', 1, 'a', 1)[:-4]])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, 'name', 1)
+
+def test_cursor_of_another_sort_is_rejected():
+    token = encode_cursor('name', 1, 'Acme', ObjectId())
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, 'name', -1)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, 'deadline', 1)
+
+def test_keyset_filter_on_id_only():
+    last_id = ObjectId()
+    assert keyset_filter('_id', 1, last_id, last_id) == {'_id': {'$gt': last_id}}
+    assert keyset_filter('_id', -1, last_id, last_id) == {'_id': {'$lt': last_id}}
+
+def test_keyset_filter_descending_keeps_missing_values():
+    assert keyset_filter('score', -1, 5, 9) == {'$or': [
+        {'score': {'$lt': 5}},
+        {'score': 5, '_id': {'$lt': 9}},
+        {'score': None}
+    ]}
+
+def test_keyset_filter_after_a_null_value():
+    assert keyset_filter('score', 1, None, 9) == {'$or': [
+        {'score': None, '_id': {'$gt': 9}},
+        {'score': {'$ne': None}}
+    ]}
+    assert keyset_filter('score', -1, None, 9) == {'score': None, '_id': {'$lt': 9}}
+
+def test_page_count():
+    assert page_count(None, 10) is None
+    assert page_count(0, 10) == 0
+    assert page_count(21, 10) == 3
+
+def test_invalid_include_total(flask_app):
+    with flask_app.test_request_context('/?include_total=sometimes'):
+        with pytest.raises(PaginationError):
+            get_pagination_args()
+
+def test_page_ranked_cursor_walk_matches_pages():
+    ranked = [(doc_id, score) for doc_id, score in
+              sorted(((i, float(i % 4)) for i in range(11)), key=lambda pair: (pair[1], pair[0]), reverse=True)]
+
+    walked = []
+    cursor = None
+    while True:
+        page, has_more, cursor = page_ranked(ranked, 1, 3, cursor)
+        walked += page
+        if not has_more:
+            break
+    assert walked == ranked
+
+    page, has_more, _ = page_ranked(ranked, 4, 3)
+    assert page == ranked[9:] and not has_more
+
+def _walk(flask_app, collection, sort_field, direction, query=None, per_page=3):
+    """Follow next_cursor from the first page to the last; return the _ids in order."""
+    seen = []
+    cursor = None
+    while True:
+        args = {'per_page': per_page, 'include_total': 'none'}
+        if cursor:
+            args['cursor'] = cursor
+        with flask_app.test_request_context('/', query_string=args):
+            documents, pagination = paginate(collection, query or {}, sort_field, direction)
+        assert pagination['total'] is None
+        seen += [document['_id'] for document in documents]
+        cursor = pagination['next_cursor']
+        if not cursor:
+            return seen
+
+@pytest.fixture
+def jobs(db):
+    """Companies with repeated, null and missing stipends."""
+    stipends = [300, 100, None, 200, 100, 300, None, 100, 200, 400]
+    for index, stipend in enumerate(stipends):
+        document = {'_id': index, 'active': index % 2 == 0}
+        if stipend is not None or index % 3:
+            document['stipend'] = stipend
+        db.companies.insert_one(document)
+    return db.companies
+
+@pytest.mark.parametrize('direction', [1, -1])
+def test_cursor_walk_visits_every_document_once_in_order(flask_app, jobs, direction):
+    documents = list(jobs.find())
+    # Missing and null stipends sort before every number ascending
+    expected = sorted(documents, key=lambda document: (document.get('stipend') is not None,
+                                                       document.get('stipend') or 0, document['_id']))
+    if direction == -1:
+        expected.reverse()
+
+    assert _walk(flask_app, jobs, 'stipend', direction) == [document['_id'] for document in expected]
+
+def test_cursor_walk_respects_the_filter(flask_app, jobs):
+    assert _walk(flask_app, jobs, '_id', 1, {'active': True}) == [0, 2, 4, 6, 8]
+
+def test_page_mode_exact_total_and_facets(flask_app, jobs):
+    facets = {'by_active': [{'$group': {'_id': '$active', 'count': {'$sum': 1}}}]}
+    with flask_app.test_request_context('/?page=2&per_page=4'):
+        documents, pagination = paginate(jobs, {}, '_id', 1, facets=facets)
+
+    assert [document['_id'] for document in documents] == [4, 5, 6, 7]
+    assert pagination['total'] == 10
+    assert pagination['has_more'] is True
+    assert {row['_id']: row['count'] for row in pagination['facets']['by_active']} == {True: 5, False: 5}
+
+    # The cursor of a page-mode response continues where the page ended
+    with flask_app.test_request_context('/', query_string={'per_page': 4, 'cursor': pagination['next_cursor']}):
+        documents, pagination = paginate(jobs, {}, '_id', 1)
+    assert [document['_id'] for document in documents] == [8, 9]
+    assert pagination['has_more'] is False and pagination['next_cursor'] is None
+
+def test_estimated_total(flask_app, jobs):
+    with flask_app.test_request_context('/?include_total=estimated&per_page=2'):
+        _, pagination = paginate(jobs, {'active': False}, '_id', 1)
+    assert pagination['total'] == 5
@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import pytest
+from bson.objectid import ObjectId
+
+from app.utils import recommendation_store, recommender
+from app.utils.prefix_index import LazyIndex
+from app.utils.recommendation_store import (
+    RECOMMENDATIONS_COLLECTION,
+    get_recommendations,
+    materialize_all,
+    rescore_company
+)
+
+@pytest.fixture
+def builds(monkeypatch):
+    """A fresh company matrix that records every build."""
+    built = []
+
+    def builder():
+        built.append(1)
+        return recommender.build_company_matrix()
+
+    matrix = LazyIndex(builder, ttl=600)
+    monkeypatch.setattr(recommender, 'company_matrix', matrix)
+    monkeypatch.setattr(recommendation_store, 'company_matrix', matrix)
+    return built
+
+def _student(db, registration_no, skill_ids):
+    db.students.insert_one({'registration_no': registration_no, 'skill_ids': skill_ids, 'interests': []})
+
+def _company(db, skill_ids, **fields):
+    company = {'_id': ObjectId(), 'name': 'Acme', 'job_title': 'Engineer', 'skill_ids': skill_ids,
+               'active': True, **fields}
+    db.companies.insert_one(company)
+    return company
+
+def test_students_without_a_profile_are_ranked_once(db, builds, monkeypatch):
+    _company(db, ['python'])
+    _student(db, '221300001', [])
+    refreshed = []
+    refresh_student = recommendation_store.refresh_student
+    monkeypatch.setattr(recommendation_store, 'refresh_student',
+                        lambda registration_no: refreshed.append(registration_no) or refresh_student(registration_no))
+
+    assert get_recommendations('221300001') is None
+    assert get_recommendations('221300001') is None
+    assert refreshed == ['221300001']
+    assert db[RECOMMENDATIONS_COLLECTION].find_one({'_id': '221300001'})['no_profile'] is True
+
+    # A profile write replaces the marker
+    db.students.update_one({'registration_no': '221300001'}, {'$set': {'skill_ids': ['python']}})
+    recommendation_store.student_changed('221300001')
+    assert len(get_recommendations('221300001')['companies']) == 1
+
+def test_unknown_students_are_not_stored(db, builds):
+    assert get_recommendations('221399999') is None
+    assert db[RECOMMENDATIONS_COLLECTION].count_documents({}) == 0
+
+def test_materialize_all_marks_students_without_a_profile(db, builds):
+    _company(db, ['python'])
+    _student(db, '221300001', ['python'])
+    _student(db, '221300002', [])
+    db[RECOMMENDATIONS_COLLECTION].insert_one({'_id': '221300003', 'companies': [],
+                                                 'updated_at': datetime(2024, 1, 1)})
+
+    assert materialize_all() == {'stored': 1, 'without_profile': 1, 'removed': 1}
+    assert get_recommendations('221300002') is None
+    assert db[RECOMMENDATIONS_COLLECTION].count_documents({}) == 2
+
+def test_rescore_rebuilds_the_shared_matrix_once(db, builds):
+    _student(db, '221300001', ['python'])
+    _company(db, ['python'])
+    get_recommendations('221300001')
+    assert len(builds) == 1
+
+    company = _company(db, ['python', 'docker'], name='Globex')
+    assert rescore_company(company['_id']) == 1
+    assert len(builds) == 2
+    # Rankings reuse the matrix built by the re-score
+    assert company['_id'] in dict(recommender.rank_companies(['python'], []))
+    assert len(builds) == 2
+
+    entries = get_recommendations('221300001')['companies']
+    assert {entry['name'] for entry in entries} == {'Acme', 'Globex'}
+
+def test_rescore_removes_inactive_companies(db, builds):
+    _student(db, '221300001', ['python'])
+    company = _company(db, ['python'])
+    get_recommendations('221300001')
+
+    db.companies.update_one({'_id': company['_id']}, {'$set': {'active': False}})
+    assert rescore_company(company['_id']) == 0
+    assert get_recommendations('221300001')['companies'] == []
@@ -0,0 +1,29 @@
+import pytest
+
+from app.utils.recommender import TfidfMatrix, company_frequencies, dot, student_frequencies
+
+def test_tfidf_rank_orders_by_score_then_id():
+    matrix = TfidfMatrix([
+        (1, {'python': 1, 'django': 1}),
+        (2, {'python': 1, 'django': 1}),
+        (3, {'java': 1}),
+        (4, {'python': 1})
+    ])
+    ranked = matrix.rank(matrix.vector({'python': 1, 'django': 1, 'cobol': 1}))
+
+    assert [doc_id for doc_id, _ in ranked] == [2, 1, 4]
+    assert ranked[0][1] == pytest.approx(1.0)
+    assert ranked[2][1] < ranked[0][1]
+    assert matrix.vector({'cobol': 3}) == {}
+
+def test_company_requirements_count_as_skill_ids():
+    frequencies = company_frequencies({'skill_ids': ['python'], 'job_title': 'Data Engineer',
+                                       'job_description': 'You will build pipelines with our team'})
+    assert frequencies['python'] == 2.0
+    assert frequencies['data'] == 1.5
+    assert 'with' not in frequencies and 'our' not in frequencies
+
+def test_student_interests_match_skills_of_the_same_name():
+    frequencies = student_frequencies(['python'], ['Machine Learning'])
+    assert frequencies == {'python': 2.0, 'machine': 1.0, 'learning': 1.0, 'machinelearning': 1.0}
+    assert dot({'a': 0.6, 'b': 0.8}, {'b': 1.0}) == pytest.approx(0.8)
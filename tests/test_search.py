@@ -0,0 +1,17 @@
+import pytest
+
+from app.config import Config
+from app.utils.search import InvalidSearch, literal_terms
+
+def test_literal_terms_strip_query_syntax():
+    assert literal_terms('"data science" -python python \\ ') == ['data', 'science', 'python']
+
+def test_literal_terms_are_bounded():
+    terms = literal_terms(' '.join(f'term{i}' for i in range(Config.SEARCH_MAX_TERMS + 5)))
+    assert len(terms) == Config.SEARCH_MAX_TERMS
+    assert literal_terms('x' * (Config.SEARCH_MAX_TERM_LENGTH + 10)) == ['x' * Config.SEARCH_MAX_TERM_LENGTH]
+
+@pytest.mark.parametrize('terms', ['', '  "" - ', 'x' * (Config.SEARCH_MAX_QUERY_LENGTH + 1)])
+def test_literal_terms_reject_empty_and_long_queries(terms):
+    with pytest.raises(InvalidSearch):
+        literal_terms(terms)
@@ -0,0 +1,130 @@
+import time
+
+import pytest
+from flask import jsonify, request
+
+from app.utils.prefix_index import LazyIndex
+from app.utils.search_cache import (
+    GENERATIONS_COLLECTION,
+    bump_generation,
+    cached_search,
+    generation_cache,
+    get_generations,
+    search_cache
+)
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    search_cache.clear()
+    generation_cache.clear()
+    yield
+    search_cache.clear()
+    generation_cache.clear()
+
+@pytest.fixture
+def calls(flask_app, db):
+    """Requests that reached the view, by query."""
+    seen = []
+
+    @cached_search('companies')
+    def companies():
+        seen.append(request.args.get('q'))
+        if request.args.get('q') == 'broken':
+            return jsonify({'error': 'failed'}), 500
+        return jsonify({'results': [request.args.get('q')]}), 200
+
+    flask_app.add_url_rule('/search', 'companies', companies)
+    return seen
+
+def test_repeated_queries_are_served_from_the_cache(flask_app, calls):
+    client = flask_app.test_client()
+    first = client.get('/search?q=Python')
+    second = client.get('/search?q=%20python%20')
+
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_json() == first.get_json()
+    assert calls == ['Python']
+
+def test_errors_and_regex_searches_are_not_cached(flask_app, calls):
+    client = flask_app.test_client()
+    assert client.get('/search?q=broken').status_code == 500
+    assert client.get('/search?q=broken').status_code == 500
+    client.get('/search?q=py.*&regex=true')
+    client.get('/search?q=py.*&regex=true')
+    assert calls == ['broken', 'broken', 'py.*', 'py.*']
+
+def test_a_bumped_generation_invalidates_cached_results(flask_app, calls):
+    client = flask_app.test_client()
+    client.get('/search?q=python')
+    bump_generation('companies')
+    assert client.get('/search?q=python').headers['X-Cache'] == 'MISS'
+    bump_generation('announcements')
+    assert client.get('/search?q=python').headers['X-Cache'] == 'HIT'
+    assert calls == ['python', 'python']
+
+def test_generations_are_read_once_per_ttl(db, monkeypatch):
+    reads = []
+    find = db[GENERATIONS_COLLECTION].find
+
+    def counted(query=None, *args, **kwargs):
+        # Bumps find their document too; only count generation reads
+        if '$in' in str(query):
+            reads.append(query)
+        return find(query, *args, **kwargs)
+
+    monkeypatch.setattr(db[GENERATIONS_COLLECTION], 'find', counted)
+
+    assert get_generations('companies', 'skills') == {'companies': 0, 'skills': 0}
+    assert get_generations('companies') == {'companies': 0}
+    assert len(reads) == 1
+
+    # A bump in this worker is seen at once, without a read
+    assert bump_generation('companies') == 1
+    assert get_generations('companies', 'skills') == {'companies': 1, 'skills': 0}
+    assert len(reads) == 1
+
+    # A bump in another worker is seen once the local copy expires
+    db[GENERATIONS_COLLECTION].update_one({'_id': 'skills'}, {'$inc': {'generation': 1}}, upsert=True)
+    assert get_generations('skills') == {'skills': 0}
+    generation_cache.clear()
+    assert get_generations('skills', 'companies') == {'skills': 1, 'companies': 1}
+    assert len(reads) == 2
+
+def _company_index(builds):
+    return LazyIndex(lambda: builds.append(1) or len(builds), ttl=600,
+                     version=lambda: get_generations('companies')['companies'], check_interval=0)
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 2
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_a_new_generation_rebuilds_lazy_indexes(db):
+    builds = []
+    index = _company_index(builds)
+    assert index.get() == 1
+
+    bump_generation('companies')
+    index.get()
+    assert _wait_for(lambda: index.peek() == 2)
+    assert index.get() == 2 and len(builds) == 2
+
+def test_acknowledged_writes_do_not_rebuild(db):
+    builds = []
+    index = _company_index(builds)
+    index.get()
+
+    generation = bump_generation('companies')
+    index.acknowledge(generation - 1, generation)
+    index.get()
+    time.sleep(0.05)
+    assert builds == [1]
+
+    # The index missed the first of these writes, so it is rebuilt anyway
+    bump_generation('companies')
+    generation = bump_generation('companies')
+    index.acknowledge(generation - 1, generation)
+    index.get()
+    assert _wait_for(lambda: len(builds) == 2)
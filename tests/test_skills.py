@@ -0,0 +1,70 @@
+import pytest
+
+from app.utils.skills import (
+    InvalidSkillFilter,
+    company_skill_ids,
+    default_taxonomy,
+    eligibility_filter,
+    get_skill_filter_args,
+    normalize,
+    skills_filter,
+    student_skill_ids
+)
+
+@pytest.mark.parametrize('text, key', [
+    ('Node.js', 'nodejs'),
+    ('  NODE JS ', 'nodejs'),
+    ('C++', 'c++'),
+    ('C#', 'c#'),
+    ('C', 'c'),
+    ('UI/UX Design', 'uiuxdesign'),
+    (None, ''),
+    (42, '')
+])
+def test_normalize(text, key):
+    assert normalize(text) == key
+
+def test_aliases_resolve_to_canonical_ids():
+    taxonomy = default_taxonomy()
+    assert taxonomy.ids(['node', 'NodeJS', 'Node.js', 'k8s', 'Rust', '', '  ']) == ['nodejs', 'kubernetes', 'rust']
+    assert taxonomy.canonical_names(['reactjs', ' Rust ', 'React']) == ['React', 'Rust']
+    assert taxonomy.name('nodejs') == 'Node.js'
+
+def test_student_and_company_skill_ids():
+    taxonomy = default_taxonomy()
+    student = {'skills': {'technical': ['py', 'Docker']},
+               'experience': [{'skills_used': ['python3', 'k8s']}, 'not an entry']}
+    assert student_skill_ids(student, taxonomy) == ['python', 'docker', 'kubernetes']
+    # Older documents store skills as a flat list
+    assert student_skill_ids({'skills': ['JS']}, taxonomy) == ['javascript']
+    assert company_skill_ids({'requirements': 'Python, Node, Docker'}, taxonomy) == ['python', 'nodejs', 'docker']
+
+@pytest.fixture
+def companies(db):
+    db.companies.insert_many([
+        {'_id': 'backend', 'skill_ids': ['python', 'docker']},
+        {'_id': 'scripting', 'skill_ids': ['python']},
+        {'_id': 'platform', 'skill_ids': ['python', 'kubernetes']},
+        {'_id': 'open', 'skill_ids': []}
+    ])
+    return db.companies
+
+def _ids(collection, query):
+    return sorted(document['_id'] for document in collection.find(query))
+
+def test_eligibility_requires_every_company_skill(companies):
+    assert _ids(companies, eligibility_filter(['python', 'docker', 'react'])) == ['backend', 'scripting']
+    assert _ids(companies, eligibility_filter(['docker'])) == []
+
+def test_skills_filter_modes(companies):
+    assert _ids(companies, skills_filter(['python', 'kubernetes'])) == ['platform']
+    assert _ids(companies, skills_filter(['docker', 'kubernetes'], 'any')) == ['backend', 'platform']
+
+def test_skill_filter_args_resolve_aliases(flask_app, db):
+    with flask_app.test_request_context('/?skills=py, k8s&skills_match=any'):
+        assert get_skill_filter_args() == {'skill_ids': {'$in': ['python', 'kubernetes']}}
+    with flask_app.test_request_context('/'):
+        assert get_skill_filter_args() == {}
+    with flask_app.test_request_context('/?skills=py&skills_match=most'):
+        with pytest.raises(InvalidSkillFilter):
+            get_skill_filter_args()
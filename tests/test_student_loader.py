@@ -0,0 +1,81 @@
+import pytest
+from flask import jsonify
+from flask_jwt_extended import create_access_token, jwt_required
+
+from app.auth.utils import get_current_student, student_fields
+
+REGISTRATION_NO = '221300001'
+
+@pytest.fixture
+def queries(db, monkeypatch):
+    """Projections of every student lookup, in order."""
+    db.students.insert_one({'registration_no': REGISTRATION_NO, 'name': 'Asha', 'password': b'hash',
+                            'skills': {'technical': ['Python']}, 'companies': {'applied': []},
+                            'cv': 'cv.pdf'})
+    projections = []
+    find_one = db.students.find_one
+
+    def counted(query, projection=None, *args, **kwargs):
+        projections.append(dict(projection or {}))
+        return find_one(query, projection, *args, **kwargs)
+
+    monkeypatch.setattr(db.students, 'find_one', counted)
+    return projections
+
+@pytest.fixture
+def client(jwt_app):
+    with jwt_app.app_context():
+        token = create_access_token(identity=REGISTRATION_NO)
+    client = jwt_app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
+
+def _route(app, view, path='/view'):
+    app.add_url_rule(path, view.__name__, jwt_required()(view))
+
+def test_later_callers_only_fetch_missing_fields(jwt_app, client, queries):
+    def view():
+        first = get_current_student('name')
+        second = get_current_student('name', 'skills')
+        third = get_current_student('skills')
+        assert first is second is third
+        return jsonify(sorted(third))
+
+    _route(jwt_app, view)
+    assert client.get('/view').get_json() == ['_id', 'name', 'skills']
+    assert queries == [{'name': 1}, {'skills': 1}]
+
+def test_a_caller_without_fields_gets_the_full_document(jwt_app, client, queries):
+    def view():
+        get_current_student('companies')
+        student = get_current_student()
+        get_current_student('cv')
+        return jsonify(sorted(student))
+
+    _route(jwt_app, view)
+    assert client.get('/view').get_json() == ['_id', 'companies', 'cv', 'name', 'registration_no', 'skills']
+    assert queries == [{'companies': 1}, {'password': 0}]
+
+def test_declared_fields_are_loaded_with_the_first_call(jwt_app, client, queries):
+    @student_fields('skills', 'cv')
+    def view():
+        get_current_student('name')
+        student = get_current_student()
+        return jsonify(sorted(student))
+
+    _route(jwt_app, view)
+    assert client.get('/view').get_json() == ['_id', 'cv', 'name', 'skills']
+    assert len(queries) == 1
+    assert queries[0] == {'name': 1, 'skills': 1, 'cv': 1}
+
+def test_unknown_student_is_looked_up_once(jwt_app, client, queries, db):
+    db.students.delete_many({})
+
+    def view():
+        assert get_current_student('name') is None
+        assert get_current_student('skills') is None
+        return jsonify([])
+
+    _route(jwt_app, view)
+    assert client.get('/view').status_code == 200
+    assert len(queries) == 1
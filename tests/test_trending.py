@@ -0,0 +1,92 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import Config
+from app.utils.trending import (
+    BUCKETS_COLLECTION,
+    TrendingBoard,
+    backfill_buckets,
+    bucket_hour,
+    build_trending_board,
+    record_application,
+    window
+)
+
+HALF_LIFE = Config.TRENDING_HALF_LIFE_HOURS
+
+@pytest.fixture
+def kolkata(monkeypatch):
+    """Run with the server clock at UTC+05:30."""
+    monkeypatch.setenv('TZ', 'Asia/Kolkata')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def _buckets(db):
+    return {(bucket['company_id'], bucket['hour']): bucket for bucket in db[BUCKETS_COLLECTION].find()}
+
+def test_bucket_hours_are_utc(kolkata):
+    assert bucket_hour(datetime(2024, 3, 1, 10, 45)) == datetime(2024, 3, 1, 5, 0)
+    assert bucket_hour(datetime(2024, 3, 1, 5, 10)) == datetime(2024, 2, 29, 23, 0)
+
+def test_applications_increment_their_hourly_bucket(db, kolkata):
+    applied = datetime(2024, 3, 1, 10, 45)
+    record_application('acme', applied)
+    record_application('acme', applied + timedelta(minutes=10))
+    record_application('acme', applied + timedelta(hours=1))
+
+    buckets = _buckets(db)
+    first = buckets['acme', datetime(2024, 3, 1, 5, 0)]
+    assert first['count'] == 2
+    assert first['expires_at'] == datetime(2024, 3, 1, 5, 0) + window()
+    assert buckets['acme', datetime(2024, 3, 1, 6, 0)]['count'] == 1
+
+def test_backfill_matches_live_counts_and_can_rerun(db):
+    now = datetime.now().replace(minute=30)
+    applications = [('acme', now), ('acme', now - timedelta(minutes=20)), ('globex', now - timedelta(hours=5)),
+                    ('acme', now - window() - timedelta(days=1))]
+    for company_id, applied_date in applications:
+        db.applications.insert_one({'company_id': company_id, 'applied_date': applied_date})
+        record_application(company_id, applied_date)
+    live = {key: bucket['count'] for key, bucket in _buckets(db).items()
+            if bucket['hour'] >= bucket_hour(now) - window()}
+
+    db[BUCKETS_COLLECTION].delete_many({})
+    assert backfill_buckets() == 2
+    assert backfill_buckets() == 2
+    assert {key: bucket['count'] for key, bucket in _buckets(db).items()} == live
+
+def _bucket(db, company_id, hours_ago, count):
+    hour = bucket_hour(datetime.now()) - timedelta(hours=hours_ago)
+    db[BUCKETS_COLLECTION].insert_one({'company_id': company_id, 'hour': hour, 'count': count,
+                                       'expires_at': hour + window()})
+
+def test_scores_halve_every_half_life(db):
+    old = db.companies.insert_one({'name': 'Old', 'active': True}).inserted_id
+    new = db.companies.insert_one({'name': 'New', 'active': True}).inserted_id
+    _bucket(db, old, 2 * HALF_LIFE, 4)
+    _bucket(db, new, 0, 2)
+
+    entries = build_trending_board().entries
+    assert [entry['company_name'] for entry in entries] == ['New', 'Old']
+    assert [entry['application_count'] for entry in entries] == [2, 4]
+    # Time elapsed in the current hour decays both scores alike and cancels out
+    ratio = entries[1]['trending_score'] / entries[0]['trending_score']
+    assert ratio == pytest.approx(0.5, rel=1e-3)
+
+def test_inactive_companies_do_not_take_board_slots(db, monkeypatch):
+    monkeypatch.setattr(Config, 'TRENDING_TOP_N', 1)
+    closed = db.companies.insert_one({'name': 'Closed', 'active': False}).inserted_id
+    open_ = db.companies.insert_one({'name': 'Open', 'active': True}).inserted_id
+    _bucket(db, closed, 0, 10)
+    _bucket(db, open_, 0, 1)
+
+    assert [entry['company_name'] for entry in build_trending_board().entries] == ['Open']
+
+def test_served_scores_decay_since_the_board_was_computed():
+    entries = [{'company_id': 'acme', 'trending_score': 8.0}, {'company_id': 'globex', 'trending_score': 2.0}]
+    board = TrendingBoard(entries, time.time() - HALF_LIFE * 3600)
+    assert board.top(1) == [{'company_id': 'acme', 'trending_score': 4.0}]
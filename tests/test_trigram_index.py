@@ -0,0 +1,24 @@
+from app.utils.trigram_index import TrigramIndex, tokenize, trigrams
+
+def test_tokenize_keeps_technology_names_whole():
+    assert tokenize('C++, Node.js and C# devs.') == ['c++', 'node.js', 'and', 'c#', 'devs']
+    assert trigrams('go') == {'  g', ' go', 'go '}
+
+def test_trigram_index_tolerates_typos():
+    index = TrigramIndex(threshold=0.3)
+    index.add('ops', ['Kubernetes engineer'])
+    index.add('web', ['JavaScript developer'])
+
+    assert index.search('kubernates')[0][0] == 'ops'
+    assert index.search('javscript')[0][0] == 'web'
+    assert index.search('zzz') == []
+
+def test_trigram_index_forgets_removed_documents():
+    index = TrigramIndex()
+    index.add('ops', ['Kubernetes'])
+    index.add('ops', ['Docker'])
+    assert index.similar_tokens('kubernetes') == {}
+
+    index.remove('ops')
+    assert index.search('docker') == []
+    assert len(index) == 0